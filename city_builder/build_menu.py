@@ -0,0 +1,84 @@
+# Elite 1984 City Builder - Build Menu List (search, filter, scrolling)
+
+from typing import Any, Dict, List, Tuple
+
+# Filter tabs, cycled with Tab or by clicking the filter label
+MENU_FILTERS = ("All", "Power", "Housing", "Industry", "Other")
+
+
+def spec_category(spec: Dict[str, Any]) -> str:
+    """The filter tab a building belongs to, from what it produces."""
+    if spec.get("power_gen", 0) > 0:
+        return "Power"
+    if spec.get("population_cap", 0) > 0:
+        return "Housing"
+    if spec.get("ore_prod", 0) > 0:
+        return "Industry"
+    return "Other"
+
+
+class BuildMenuList:
+    """
+    Rows of the build menu: the available building types narrowed by a search query and a
+    category filter, and a scroll position. Rows are laid out once per catalog (i.e. per rank
+    change or spec reload) and per query/filter edit; drawing touches only the visible slice and
+    hit-testing is index arithmetic on the row height, so the cost does not grow with the catalog.
+    """
+    def __init__(self, row_height: int, visible_rows: int):
+        self.row_height = row_height
+        self.visible_rows = max(1, visible_rows)
+        self.query = ""
+        self.filter_index = 0
+        self.scroll = 0 # Index of the first visible row
+        self._source = None # The available-specs dict the entries were built from
+        self._entries: List[Tuple[str, Dict[str, Any], str, str]] = [] # (type_id, spec, search text, category)
+        self.rows: List[Tuple[str, Dict[str, Any]]] = [] # Entries passing the query and filter, in catalog order
+
+    @property
+    def filter_name(self) -> str:
+        return MENU_FILTERS[self.filter_index]
+
+    def set_catalog(self, available: Dict[str, Dict[str, Any]]) -> bool:
+        """Lays out rows for a new set of available specs. Returns False if `available` is already shown."""
+        if available is self._source: # The catalog shares one dict per rank, so identity means unchanged
+            return False
+        self._source = available
+        self._entries = [(type_id, spec, f"{spec['name']} {type_id}".lower(), spec_category(spec))
+                         for type_id, spec in available.items()]
+        self._layout()
+        return True
+
+    def set_query(self, query: str) -> None:
+        if query != self.query:
+            self.query = query
+            self._layout()
+
+    def cycle_filter(self) -> str:
+        self.filter_index = (self.filter_index + 1) % len(MENU_FILTERS)
+        self._layout()
+        return self.filter_name
+
+    def _layout(self) -> None:
+        terms = self.query.lower().split()
+        category = None if self.filter_index == 0 else self.filter_name
+        self.rows = [(type_id, spec) for type_id, spec, text, entry_category in self._entries
+                     if (category is None or entry_category == category) and all(term in text for term in terms)]
+        self.scroll_by(0) # Re-clamp to the new row count
+
+    def scroll_by(self, rows: int) -> None:
+        max_scroll = max(0, len(self.rows) - self.visible_rows)
+        self.scroll = min(max(self.scroll + rows, 0), max_scroll)
+
+    def visible(self) -> range:
+        """Indexes into `rows` currently on screen."""
+        return range(self.scroll, min(self.scroll + self.visible_rows, len(self.rows)))
+
+    def row_at(self, offset_y: int) -> int | None:
+        """The row index under a y offset from the top of the list area, or None."""
+        if offset_y < 0:
+            return None
+        slot = offset_y // self.row_height
+        index = self.scroll + slot
+        if slot >= self.visible_rows or index >= len(self.rows):
+            return None
+        return index
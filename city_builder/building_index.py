@@ -0,0 +1,133 @@
+# Elite 1984 City Builder - Building Indexes (per type and per operational state)
+
+from typing import Dict, Iterable, List
+
+from city_builder.buildings import Building
+
+# Building stats kept as running sums, per type and city-wide
+INDEXED_STATS = ("power_generation", "power_consumption", "population_capacity", "ore_production",
+                 "pollution", "upkeep", "value")
+_STAT_SLOTS = {stat: i for i, stat in enumerate(INDEXED_STATS)}
+
+
+class BuildingIndex:
+    """
+    Incrementally maintained views of a city's buildings: buildings by type, the offline set,
+    and per-type counts and stat sums (over all buildings and over operational ones). The City
+    updates it on placement, removal, stat reloads and operational flips, so every query here
+    is O(1) (or O(result) for the building lists) instead of a scan of City.buildings.
+    """
+    def __init__(self):
+        self._by_type: Dict[str, Dict[Building, None]] = {} # type -> ordered set
+        self._offline: Dict[Building, None] = {}
+        self._operational_counts: Dict[str, int] = {}
+        self._totals: Dict[str, List[int]] = {} # type -> sums in INDEXED_STATS order
+        self._operational_totals: Dict[str, List[int]] = {}
+        self._city_totals = [0] * len(INDEXED_STATS)
+        self._city_operational_totals = [0] * len(INDEXED_STATS)
+        self._count = 0
+
+    @staticmethod
+    def _stats(building: Building) -> List[int]:
+        return [getattr(building, stat) for stat in INDEXED_STATS]
+
+    @staticmethod
+    def _accumulate(sums: List[int], values: List[int], sign: int) -> None:
+        for i, value in enumerate(values):
+            sums[i] += sign * value
+
+    def add(self, building: Building) -> None:
+        """Indexes a building with its current stats and operational status."""
+        type_name = building.type
+        members = self._by_type.get(type_name)
+        if members is None:
+            members = self._by_type[type_name] = {}
+            self._operational_counts[type_name] = 0
+            self._totals[type_name] = [0] * len(INDEXED_STATS)
+            self._operational_totals[type_name] = [0] * len(INDEXED_STATS)
+        members[building] = None
+        self._count += 1
+        values = self._stats(building)
+        self._accumulate(self._totals[type_name], values, 1)
+        self._accumulate(self._city_totals, values, 1)
+        if building.is_operational:
+            self._operational_counts[type_name] += 1
+            self._accumulate(self._operational_totals[type_name], values, 1)
+            self._accumulate(self._city_operational_totals, values, 1)
+        else:
+            self._offline[building] = None
+
+    def remove(self, building: Building) -> None:
+        """Un-indexes a building; its stats must be the ones it was added with."""
+        type_name = building.type
+        members = self._by_type[type_name]
+        del members[building]
+        self._count -= 1
+        values = self._stats(building)
+        self._accumulate(self._totals[type_name], values, -1)
+        self._accumulate(self._city_totals, values, -1)
+        if building.is_operational:
+            self._operational_counts[type_name] -= 1
+            self._accumulate(self._operational_totals[type_name], values, -1)
+            self._accumulate(self._city_operational_totals, values, -1)
+        else:
+            del self._offline[building]
+        if not members:
+            del self._by_type[type_name], self._operational_counts[type_name]
+            del self._totals[type_name], self._operational_totals[type_name]
+
+    def set_operational(self, building: Building, operational: bool) -> None:
+        """Sets building.is_operational, moving it between the operational and offline tallies."""
+        if building.is_operational == operational:
+            return
+        building.is_operational = operational
+        type_name = building.type
+        sign = 1 if operational else -1
+        values = self._stats(building)
+        self._operational_counts[type_name] += sign
+        self._accumulate(self._operational_totals[type_name], values, sign)
+        self._accumulate(self._city_operational_totals, values, sign)
+        if operational:
+            del self._offline[building]
+        else:
+            self._offline[building] = None
+
+    # Queries
+
+    def types(self) -> List[str]:
+        """Building types with at least one placed building, in first-placed order."""
+        return list(self._by_type)
+
+    def of_type(self, building_type: str) -> Iterable[Building]:
+        """The placed buildings of a type, in placement order (a live view; do not modify)."""
+        return self._by_type.get(building_type, {}).keys()
+
+    def offline(self) -> Iterable[Building]:
+        """Buildings shut down by a power shortage (a live view; do not modify)."""
+        return self._offline.keys()
+
+    def count(self, building_type: str | None = None, operational: bool | None = None) -> int:
+        """Number of buildings, optionally of one type and/or only operational (True) or offline (False)."""
+        if building_type is None:
+            total, on = self._count, self._count - len(self._offline)
+        else:
+            total = len(self._by_type.get(building_type, ()))
+            on = self._operational_counts.get(building_type, 0)
+        if operational is None:
+            return total
+        return on if operational else total - on
+
+    def total(self, stat: str, building_type: str | None = None, operational_only: bool = False) -> int:
+        """
+        Sum of one of INDEXED_STATS (e.g. "ore_production") over all buildings or one type,
+        optionally only the operational ones.
+        """
+        slot = _STAT_SLOTS[stat]
+        if building_type is None:
+            sums = self._city_operational_totals if operational_only else self._city_totals
+        else:
+            table = self._operational_totals if operational_only else self._totals
+            sums = table.get(building_type)
+            if sums is None:
+                return 0
+        return sums[slot]
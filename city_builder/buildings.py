@@ -1,29 +1,45 @@
 # Elite 1984 City Builder - Buildings Logic
 
 from typing import Tuple, Dict, Any
-from city_builder.config import BUILDING_SPECS
+from city_builder.catalog import get_catalog
 
 class Building:
     """
     Represents a single building in the city.
     """
     def __init__(self, building_type: str, position: Tuple[int, int]):
-        if building_type not in BUILDING_SPECS:
-            raise ValueError(f"Unknown building type: {building_type}")
-
-        self.spec = BUILDING_SPECS[building_type]
         self.type: str = building_type
-        self.name: str = self.spec["name"]
         self.position: Tuple[int, int] = position  # Grid coordinates (x, y)
-        self.cost: int = self.spec["cost"]
-        self.power_generation: int = self.spec.get("power_gen", 0)
-        self.power_consumption: int = self.spec.get("power_con", 0)
-        self.population_capacity: int = self.spec.get("population_cap", 0)
-        self.ore_production: int = self.spec.get("ore_prod", 0) # Example for future use
-        self.size: Tuple[int, int] = self.spec["size"] # (width, height) in grid units
-        self.char: str = self.spec["char"]
-        self.value: int = self.spec["value"]
+        self.load_stats()
+        self.size: Tuple[int, int] = get_catalog().sizes[self.type_id] # (width, height) in grid units
         self.is_operational: bool = True # Can be turned off by power shortage
+        self.building_id: int | None = None # Assigned by the City it is placed in
+
+    def load_stats(self) -> None:
+        """
+        (Re)reads this building's stats from the compiled catalog, e.g. after the specs were reloaded.
+        The footprint size is fixed at construction, since the building already occupies the grid.
+        """
+        catalog = get_catalog()
+        type_id = catalog.type_ids.get(self.type)
+        if type_id is None:
+            raise ValueError(f"Unknown building type: {self.type}")
+
+        stats = catalog.stats
+        self.type_id: int = type_id
+        self.spec = catalog.specs[type_id]
+        self.name: str = catalog.names[type_id]
+        self.cost: int = catalog.costs[type_id]
+        self.power_generation: int = stats["power_gen"][type_id]
+        self.power_consumption: int = stats["power_con"][type_id]
+        self.population_capacity: int = stats["population_cap"][type_id]
+        self.ore_production: int = stats["ore_prod"][type_id] # Example for future use
+        self.pollution: int = stats["pollution"][type_id]
+        self.production_interval: int = stats["production_interval"][type_id] # Ticks per ore_prod yield
+        self.upkeep: int = stats["upkeep"][type_id] # Credits charged every upkeep_interval ticks
+        self.upkeep_interval: int = stats["upkeep_interval"][type_id]
+        self.char: str = catalog.chars[type_id]
+        self.value: int = catalog.values[type_id]
 
     def __str__(self) -> str:
         return f"{self.name} at {self.position}"
@@ -48,29 +64,30 @@ class Building:
 
     def to_dict(self) -> Dict[str, Any]:
         """Serializes building data to a dictionary for saving."""
-        return {
+        data = {
             "type": self.type,
             "position_x": self.position[0],
             "position_y": self.position[1],
             "is_operational": self.is_operational, # Save operational state
         }
+        if self.building_id is not None: # Kept so undo history and replays still find the building
+            data["building_id"] = self.building_id
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Building':
         """Deserializes building data from a dictionary for loading."""
         building = cls(data["type"], (data["position_x"], data["position_y"]))
         building.is_operational = data.get("is_operational", True)
+        building.building_id = data.get("building_id")
         return building
 
 def get_available_buildings(current_rank: int) -> Dict[str, Dict[str, Any]]:
     """
     Returns a dictionary of building specs that are available at the current city rank.
+    The dictionary is precomputed and shared, so callers must not modify it.
     """
-    available = {}
-    for type_id, spec in BUILDING_SPECS.items():
-        if spec["unlock_rank"] <= current_rank:
-            available[type_id] = spec
-    return available
+    return get_catalog().available(current_rank)
 
 # Example usage:
 if __name__ == "__main__":
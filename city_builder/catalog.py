@@ -0,0 +1,91 @@
+# Elite 1984 City Builder - Compiled Building Catalog
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Tuple
+
+from city_builder.config import BUILDING_SPECS, CITY_RANKS
+from city_builder.specs import OPTIONAL_SPEC_STATS, SpecError, validate_building_spec, validate_ranks
+
+# Validation errors share one type whether raised while loading the data files or compiling
+CatalogError = SpecError
+
+
+class BuildingCatalog:
+    """
+    Building specs and city ranks compiled into lookup tables: integer type ids, one tuple per
+    stat indexed by type id, the building set available at each rank, and sorted rank thresholds
+    for binary search. Built once from BUILDING_SPECS / CITY_RANKS and validated on the way
+    unless the tables are known to be valid already.
+    """
+    def __init__(self, building_specs: Dict[str, Dict[str, Any]], city_ranks: Dict[int, Dict[str, Any]],
+                 validate: bool = True):
+        if validate:
+            validate_ranks(city_ranks)
+            for type_name, spec in building_specs.items():
+                validate_building_spec(type_name, spec)
+        self.rank_levels: Tuple[int, ...] = tuple(sorted(city_ranks))
+        self.rank_thresholds: Tuple[int, ...] = tuple(city_ranks[level]["value_needed"] for level in self.rank_levels)
+        self.rank_names: Dict[int, str] = {level: city_ranks[level]["name"] for level in self.rank_levels}
+
+        # Buildings: type ids follow the spec table's order
+        self.type_names: Tuple[str, ...] = tuple(building_specs)
+        self.type_ids: Dict[str, int] = {name: type_id for type_id, name in enumerate(self.type_names)}
+        self.specs: Tuple[Dict[str, Any], ...] = tuple(building_specs.values())
+        self.names: Tuple[str, ...] = tuple(spec["name"] for spec in self.specs)
+        self.costs: Tuple[int, ...] = tuple(spec["cost"] for spec in self.specs)
+        self.sizes: Tuple[Tuple[int, int], ...] = tuple(tuple(spec["size"]) for spec in self.specs)
+        self.chars: Tuple[str, ...] = tuple(spec["char"] for spec in self.specs)
+        self.unlock_ranks: Tuple[int, ...] = tuple(spec["unlock_rank"] for spec in self.specs)
+        self.values: Tuple[int, ...] = tuple(spec["value"] for spec in self.specs)
+        self.stats: Dict[str, Tuple[int, ...]] = {
+            key: tuple(spec.get(key, default) for spec in self.specs) for key, default in OPTIONAL_SPEC_STATS.items()
+        }
+
+        # Unlock lists per rank, and type ids sorted by unlock rank so that the set available at
+        # any rank is a prefix found by binary search
+        self.unlocks_at: Dict[int, List[str]] = {level: [] for level in self.rank_levels}
+        for type_name, unlock_rank in zip(self.type_names, self.unlock_ranks):
+            self.unlocks_at.setdefault(unlock_rank, []).append(type_name)
+        self._unlock_order: List[int] = sorted(range(len(self.specs)), key=lambda i: (self.unlock_ranks[i], i))
+        self._sorted_unlock_ranks: List[int] = [self.unlock_ranks[i] for i in self._unlock_order]
+        self._available: Dict[int, Dict[str, Dict[str, Any]]] = {} # prefix length -> available specs
+        for level in self.rank_levels:
+            self.available(level) # Precompute every rank's build menu
+
+    def available(self, rank_level: int) -> Dict[str, Dict[str, Any]]:
+        """Specs unlocked at `rank_level`, in spec-table order. The returned dict is shared; do not modify it."""
+        count = bisect_right(self._sorted_unlock_ranks, rank_level)
+        available = self._available.get(count)
+        if available is None:
+            type_ids = sorted(self._unlock_order[:count])
+            available = self._available[count] = {self.type_names[i]: self.specs[i] for i in type_ids}
+        return available
+
+    def rank_for_value(self, city_value: int) -> int:
+        """Highest rank level whose value_needed is met, by binary search over the thresholds."""
+        index = bisect_right(self.rank_thresholds, city_value) - 1
+        return self.rank_levels[index] if index >= 0 else self.rank_levels[0]
+
+
+_catalog: BuildingCatalog | None = None
+
+
+def compile_catalog(validate: bool = True) -> BuildingCatalog:
+    """
+    (Re)compiles the catalog from the current BUILDING_SPECS and CITY_RANKS. Every change to
+    those tables (adding, removing or editing a spec or rank) must be followed by a call to this;
+    until then get_catalog() keeps serving the previous compile.
+    """
+    global _catalog
+    _catalog = BuildingCatalog(BUILDING_SPECS, CITY_RANKS, validate)
+    return _catalog
+
+
+def get_catalog() -> BuildingCatalog:
+    """Returns the catalog from the last compile_catalog() call."""
+    if _catalog is None:
+        return compile_catalog()
+    return _catalog
+
+
+compile_catalog(validate=False) # The data files were validated when they were loaded
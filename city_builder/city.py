@@ -1,34 +1,80 @@
 # Elite 1984 City Builder - City Logic
 
-from typing import List, Tuple, Dict, Any
+from typing import Iterable, List, Tuple, Dict, Any
 from city_builder.buildings import Building
+from city_builder.building_index import BuildingIndex
+from city_builder.events import (
+    EventBus, BuildingAdded, BuildingRemoved, BuildingStatsChanged, OperationalChanged, ResourcesChanged, RankUp
+)
+from city_builder.catalog import get_catalog
+from city_builder.power_grid import PowerNetworks
+from city_builder.logistics import LogisticsNetwork
+from city_builder.scheduler import EventScheduler, PRODUCTION, UPKEEP
 from city_builder.config import (
     INITIAL_CREDITS, INITIAL_POWER, INITIAL_POPULATION, INITIAL_ORE,
-    CITY_RANKS, GRID_WIDTH, GRID_HEIGHT
+    POPULATION_GROWTH_RATE, CITY_RANKS, GRID_WIDTH, GRID_HEIGHT, POWER_NETWORK_MODE, FIELDS_ENABLED,
+    LOGISTICS_ENABLED, TERRAIN_SEED
 )
 
+# Totals reported by ResourcesChanged events
+RESOURCE_FIELDS = ("credits", "population", "ore", "net_power", "max_population_capacity", "city_value")
+
+
 class City:
     """
     Manages the state of the player's city, including resources, buildings, and rank.
     """
-    def __init__(self):
+    def __init__(self, power_network_mode: bool = POWER_NETWORK_MODE, fields_enabled: bool = FIELDS_ENABLED,
+                 logistics_enabled: bool = LOGISTICS_ENABLED, terrain_seed: int | None = TERRAIN_SEED):
         self.buildings: List[Building] = []
+        self.buildings_by_id: Dict[int, Building] = {}
+        self._next_building_id: int = 1
+        self.index = BuildingIndex() # Per-type and per-state counts and stat sums, see count()/total()
         self.credits: int = INITIAL_CREDITS
         self.population: int = INITIAL_POPULATION
+        self.population_growth_rate: float = POPULATION_GROWTH_RATE
         self.ore: int = INITIAL_ORE
         # Power related
         self.total_power_generation: int = 0
         self.total_power_consumption: int = 0
         self.net_power: int = INITIAL_POWER # Net power available to the city
+        self.power_import: int = 0 # Power bought from (+) or sold to (-) other cities of a Region (city-wide pool only)
 
         self.max_population_capacity: int = 0
         self.city_value: int = 0
+        self._buildings_value: int = 0 # Sum of building values, refreshed with the power balance
         self.current_rank_level: int = 0
         self.current_rank_name: str = CITY_RANKS[0]["name"]
+        self.tick_count: int = 0 # Number of update_resources() calls so far
+        self.version: int = 0 # Bumped whenever the set of buildings or their stats change
+        self.scheduler = EventScheduler() # Per-building production/upkeep events, keyed by due tick
+        self.events = EventBus() # Change events for the UI, sound and stats layers
+        self._published_resources: Tuple[int, ...] | None = None # RESOURCE_FIELDS as last reported
 
         # Grid to keep track of occupied cells for faster collision detection
         self.grid: List[List[Building | None]] = [[None for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
 
+        # Per-network connectivity; None means the single city-wide power pool
+        self.power_networks: PowerNetworks | None = PowerNetworks() if power_network_mode else None
+
+        # Density/pollution/land-value fields; numpy is only imported when they are enabled
+        self.fields = None
+        if fields_enabled:
+            from city_builder.fields import FieldModel
+            self.fields = FieldModel(GRID_WIDTH, GRID_HEIGHT)
+
+        # Distance field from habitats; discounts mine output by haul distance
+        self.logistics: LogisticsNetwork | None = LogisticsNetwork(GRID_WIDTH, GRID_HEIGHT) if logistics_enabled else None
+
+        # Water, rock and ore richness per tile (cached per seed); numpy is only imported when enabled
+        self.terrain = None
+        if terrain_seed is not None:
+            from city_builder.terrain import Terrain
+            self.terrain = Terrain.load(terrain_seed, GRID_WIDTH, GRID_HEIGHT)
+
+        # Per-tick history for graphs (metrics.MetricsHistory); attached by the game loop, not saved
+        self.metrics = None
+
         self.update_resources() # Initial calculation
 
     def add_building(self, building_type: str, position: Tuple[int, int]) -> Tuple[bool, str]:
@@ -44,24 +90,13 @@ class City:
         if self.credits < temp_building.cost:
             return False, "Not enough credits."
 
-        # Check grid boundaries and collision
-        pos_x, pos_y = position
-        size_w, size_h = temp_building.size
-        if not (0 <= pos_x < GRID_WIDTH and 0 <= pos_y < GRID_HEIGHT and
-                0 <= pos_x + size_w -1 < GRID_WIDTH and 0 <= pos_y + size_h -1 < GRID_HEIGHT):
-            return False, "Building out of bounds."
-
-        for x_offset in range(size_w):
-            for y_offset in range(size_h):
-                if self.grid[pos_x + x_offset][pos_y + y_offset] is not None:
-                    return False, "Space already occupied."
+        placement_error = self._placement_error(temp_building)
+        if placement_error:
+            return False, placement_error
 
         # Place building
         self.credits -= temp_building.cost
-        self.buildings.append(temp_building)
-        for x_offset in range(size_w):
-            for y_offset in range(size_h):
-                self.grid[pos_x + x_offset][pos_y + y_offset] = temp_building
+        self._attach_building(temp_building)
 
         self.update_resources()
         return True, f"{temp_building.name} placed."
@@ -71,159 +106,431 @@ class City:
         Removes a building from the city at the given grid position.
         Refunds a portion of the cost.
         """
-        building_to_remove = None
-        for b in self.buildings:
-            # Check if the given position is within the building's footprint
-            bx, by = b.position
-            bw, bh = b.size
-            if bx <= position[0] < bx + bw and by <= position[1] < by + bh:
-                building_to_remove = b
-                break
-
+        building_to_remove = self.building_at(position)
         if not building_to_remove:
             return False, "No building at that position."
 
-        # Clear from grid
-        bx, by = building_to_remove.position
-        bw, bh = building_to_remove.size
-        for x_offset in range(bw):
-            for y_offset in range(bh):
-                if 0 <= bx + x_offset < GRID_WIDTH and 0 <= by + y_offset < GRID_HEIGHT:
-                    self.grid[bx + x_offset][by + y_offset] = None
-
-        self.buildings.remove(building_to_remove)
-        self.credits += building_to_remove.cost // 2 # Refund 50%
+        self._detach_building(building_to_remove)
+        refund = self.refund_for(building_to_remove)
+        self.credits += refund
         self.update_resources()
-        return True, f"{building_to_remove.name} removed. {building_to_remove.cost // 2} credits refunded."
+        return True, f"{building_to_remove.name} removed. {refund} credits refunded."
+
+    @staticmethod
+    def refund_for(building: Building) -> int:
+        """Credits returned when `building` is removed."""
+        return building.cost // 2 # Refund 50%
+
+    def restore_building(self, building: Building, credit_delta: int = 0) -> Tuple[bool, str]:
+        """
+        Puts an existing building object back on the map and applies `credit_delta`, without charging
+        its cost or running a tick (derived totals are recalculated). Used by undo/redo.
+        """
+        if self.credits + credit_delta < 0:
+            return False, "Not enough credits."
+        if building.building_id in self.buildings_by_id:
+            return False, f"Building id {building.building_id} is already in use."
+        placement_error = self._placement_error(building)
+        if placement_error:
+            return False, placement_error
+        self.credits += credit_delta
+        self._attach_building(building)
+        self.recalculate()
+        return True, f"{building.name} restored."
+
+    def withdraw_building(self, building_id: int, credit_delta: int = 0) -> Tuple[bool, str]:
+        """
+        Takes the building with `building_id` off the map and applies `credit_delta`, without a
+        refund or a tick (derived totals are recalculated). Used by undo/redo.
+        """
+        building = self.buildings_by_id.get(building_id)
+        if building is None:
+            return False, "Building no longer exists."
+        self._detach_building(building)
+        self.credits += credit_delta
+        self.recalculate()
+        return True, f"{building.name} withdrawn."
+
+    def _placement_error(self, building: Building) -> str | None:
+        """Returns why `building` cannot go at its position (bounds or collision), or None if it fits."""
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        if not (0 <= pos_x < GRID_WIDTH and 0 <= pos_y < GRID_HEIGHT and
+                0 <= pos_x + size_w -1 < GRID_WIDTH and 0 <= pos_y + size_h -1 < GRID_HEIGHT):
+            return "Building out of bounds."
+        if self.terrain is not None:
+            terrain_error = self.terrain.placement_error(building.position, building.size, building.ore_production > 0)
+            if terrain_error:
+                return terrain_error
+
+        for x_offset in range(size_w):
+            for y_offset in range(size_h):
+                if self.grid[pos_x + x_offset][pos_y + y_offset] is not None:
+                    return "Space already occupied."
+        return None
 
+    def building_at(self, position: Tuple[int, int]) -> Building | None:
+        """Returns the building whose footprint covers the grid position, if any."""
+        pos_x, pos_y = position
+        if 0 <= pos_x < GRID_WIDTH and 0 <= pos_y < GRID_HEIGHT:
+            return self.grid[pos_x][pos_y]
+        return None
+
+    def _attach_building(self, building: Building) -> None:
+        """Registers an already validated building in the building list, grid and power networks."""
+        self.version += 1
+        if building.building_id is None: # Restored buildings keep the id they had
+            building.building_id = self._next_building_id
+            self._next_building_id += 1
+        self.buildings.append(building)
+        self.buildings_by_id[building.building_id] = building
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        for x_offset in range(size_w):
+            for y_offset in range(size_h):
+                if 0 <= pos_x + x_offset < GRID_WIDTH and 0 <= pos_y + y_offset < GRID_HEIGHT:
+                    self.grid[pos_x + x_offset][pos_y + y_offset] = building
+        if self.power_networks is not None:
+            self.power_networks.add(building, self._neighbors(building))
+        self._track_stats(building)
+        self.events.emit(BuildingAdded(building))
+
+    def _track_stats(self, building: Building) -> None:
+        """Registers the parts of a building's state that depend on its spec stats: index, events, fields, logistics."""
+        self.index.add(building)
+        if building.ore_production:
+            self.scheduler.schedule(building, PRODUCTION, self.tick_count + building.production_interval, building.production_interval)
+        if building.upkeep:
+            self.scheduler.schedule(building, UPKEEP, self.tick_count + building.upkeep_interval, building.upkeep_interval)
+        if self.fields is not None:
+            self.fields.add_building(building)
+        if self.logistics is not None:
+            self.logistics.add_building(building)
+
+    def _restore_schedule(self, schedule: List[List[Any]]) -> None:
+        """Replaces the freshly scheduled events of loaded buildings with their saved due ticks."""
+        rescheduled = set()
+        for building_id, kind, due in schedule:
+            building = self.buildings_by_id.get(building_id)
+            if building is None or kind not in (PRODUCTION, UPKEEP):
+                continue
+            if building_id not in rescheduled:
+                self.scheduler.cancel(building)
+                rescheduled.add(building_id)
+            interval = building.production_interval if kind == PRODUCTION else building.upkeep_interval
+            self.scheduler.schedule(building, kind, due, interval)
+
+    def _untrack_stats(self, building: Building) -> None:
+        self.index.remove(building)
+        self.scheduler.cancel(building)
+        if self.fields is not None:
+            self.fields.remove_building(building)
+        if self.logistics is not None:
+            self.logistics.remove_building(building)
+            self.logistics.forget(building)
+
+    def _detach_building(self, building: Building) -> None:
+        """Removes a building from the grid, building list and power networks."""
+        self.version += 1
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        for x_offset in range(size_w):
+            for y_offset in range(size_h):
+                if 0 <= pos_x + x_offset < GRID_WIDTH and 0 <= pos_y + y_offset < GRID_HEIGHT:
+                    self.grid[pos_x + x_offset][pos_y + y_offset] = None
+        self.buildings.remove(building)
+        del self.buildings_by_id[building.building_id]
+        if self.power_networks is not None:
+            self.power_networks.remove(building, self._neighbors)
+        self._untrack_stats(building)
+        self.events.emit(BuildingRemoved(building))
+
+    def refresh_building_types(self, building_types: Iterable[str], renumbered: bool = False) -> int:
+        """
+        Re-reads the stats of every building of the given types after their specs changed, re-registers
+        just those buildings' events, field emissions and logistics, then recomputes the derived totals.
+        Pass renumbered=True when types were added or removed, so every building's type id is refreshed.
+        Returns the number of buildings updated.
+        """
+        building_types = set(building_types)
+        if renumbered:
+            type_ids = get_catalog().type_ids
+            for building in self.buildings:
+                building.type_id = type_ids[building.type]
+        affected = [b for b in self.buildings if b.type in building_types]
+        self.version += 1
+        for building in affected:
+            self._untrack_stats(building) # Uses the old stats, e.g. to subtract old emissions
+            building.load_stats()
+            self._track_stats(building)
+            self.events.emit(BuildingStatsChanged(building))
+        self.current_rank_name = get_catalog().rank_names.get(self.current_rank_level, self.current_rank_name)
+        self.recalculate()
+        return len(affected)
+
+    def _neighbors(self, building: Building) -> Iterable[Building]:
+        """Returns the distinct buildings orthogonally touching `building`'s footprint."""
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        edge_tiles = [(x, pos_y - 1) for x in range(pos_x, pos_x + size_w)]
+        edge_tiles += [(x, pos_y + size_h) for x in range(pos_x, pos_x + size_w)]
+        edge_tiles += [(pos_x - 1, y) for y in range(pos_y, pos_y + size_h)]
+        edge_tiles += [(pos_x + size_w, y) for y in range(pos_y, pos_y + size_h)]
+        found: Dict[Building, None] = {}
+        for x, y in edge_tiles:
+            if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+                neighbor = self.grid[x][y]
+                if neighbor is not None:
+                    found[neighbor] = None
+        return found
 
     def update_resources(self) -> None:
         """
         Recalculates all resource totals, power status, population capacity, and city value.
         This should be called after any change to buildings or periodically.
         """
-        self.total_power_generation = INITIAL_POWER # Base power
-        self.total_power_consumption = 0
-        self.max_population_capacity = 0
-        current_city_value = 0
+        self.advance_ticks(1)
+
+    def advance_ticks(self, count: int) -> None:
+        """
+        Runs `count` simulation ticks; the result is identical to calling update_resources() that
+        many times. Buildings cannot change during the batch, so the power balance and capacity
+        (the O(buildings) part of a tick) are computed once and each tick only costs its due
+        events, growth, income and the rank check.
+        """
+        if count <= 0:
+            return
+        self._update_power_and_capacity()
+        powered = self.net_power >= 0
+        capacity = self.max_population_capacity
+
+        for _ in range(count):
+            self.tick_count += 1
+            self._process_due_events()
+
+            # Population growth (simple model for now)
+            if powered: # Only grow if there's power
+                if self.population < capacity:
+                    growth = (capacity - self.population) * self.population_growth_rate # Grow by a fraction of remaining capacity
+                    self.population += max(0, int(growth)) # Ensure at least 0 growth, and integer population
+                elif self.population > capacity:
+                    self.population = capacity # Cap population
+
+            # Credits income (simple model: 1 credit per person per update cycle)
+            if powered:
+                self.credits += self.population
+
+            if self.fields is not None:
+                self.fields.tick(self.tick_count)
+
+            self._update_city_value()
+            self.update_rank()
+
+            if self.metrics is not None:
+                self.metrics.record(self)
+        self._publish_resources()
+
+    def _process_due_events(self) -> None:
+        """Applies the production and upkeep events due by the current tick."""
+        logistics = self.logistics
+        for kind, building, occurrences in self.scheduler.drain(self.tick_count):
+            if kind == PRODUCTION:
+                if logistics is not None:
+                    output = logistics.effective_ore_production(building) # Discounted by haul distance
+                else:
+                    output = building.get_ore_production()
+                if self.terrain is not None:
+                    output = self.terrain.scale_output(building, output) # Richness of the deposit
+                self.ore += output * occurrences
+            elif kind == UPKEEP:
+                self.credits -= building.upkeep * occurrences
+
+    def recalculate(self) -> None:
+        """
+        Recomputes power, population capacity, city value and rank from the current buildings
+        without advancing the simulation (no production, growth or income).
+        """
+        self._update_power_and_capacity()
+        self._update_city_value()
+        self.update_rank()
+        self._publish_resources()
+
+    def _publish_resources(self) -> None:
+        """Emits one ResourcesChanged with every total that moved since the last one."""
+        current = (self.credits, self.population, self.ore, self.net_power, self.max_population_capacity, self.city_value)
+        previous = self._published_resources
+        if current == previous:
+            return
+        self._published_resources = current
+        if previous is not None:
+            self.events.emit(ResourcesChanged({name: (old, new) for name, old, new in zip(RESOURCE_FIELDS, previous, current)
+                                               if old != new}))
+
+    def _update_power_and_capacity(self) -> None:
+        """Determines operational status from the power balance, then the power totals and population capacity."""
+        if self.power_networks is None:
+            generation, consumption = self._balance_power(self.buildings, INITIAL_POWER + self.power_import)
+        else:
+            # Each network balances on its own generators; there is no shared base supply
+            generation = consumption = 0
+            stats = self.power_networks.stats
+            stats.clear()
+            for root, members in self.power_networks.items():
+                network_gen, network_con = self._balance_power(members, 0, by_position=True)
+                stats[root] = (network_gen, network_con)
+                generation += network_gen
+                consumption += network_con
+
+        self.total_power_generation = generation
+        self.total_power_consumption = consumption
+        self.net_power = generation - consumption
+
+        # Capacity and value from the index's running sums (non-operational buildings add no capacity)
+        self.max_population_capacity = self.index.total("population_capacity", operational_only=True)
+        self._buildings_value = self.index.total("value")
+
+    def _balance_power(self, buildings: Iterable[Building], base_generation: int, by_position: bool = False) -> Tuple[int, int]:
+        """
+        Sets the operational status of `buildings`, which share one power supply, and returns the
+        (generation, consumption) of the operational ones. With by_position, consumers drawing the
+        same power are shed in position order rather than list order.
+        """
+        buildings = list(buildings)
+        total_generation, total_consumption, shed = City.plan_power(buildings, base_generation, by_position)
+        set_operational, emit = self.index.set_operational, self.events.emit
+        for building in buildings:
+            operational = building not in shed
+            if building.is_operational != operational: # Only flips are applied and reported
+                set_operational(building, operational)
+                emit(OperationalChanged(building, operational))
+        return total_generation, total_consumption
+
+    @staticmethod
+    def plan_power(buildings: Iterable[Building], base_generation: int,
+                   by_position: bool = False) -> Tuple[int, int, set]:
+        """
+        Works out which of `buildings` (sharing one power supply) a shortage would shut down, without
+        changing them. Returns (generation, consumption, shed) where the totals cover the buildings
+        left operational and shed is the set of buildings turned off.
+        """
+        total_generation = base_generation
+        total_consumption = 0
 
-        # First pass: determine operational status based on power
-        # Assume all buildings are operational initially for calculation
-        for building in self.buildings:
-            building.is_operational = True # Reset for recalculation
-            self.total_power_generation += building.power_generation
-            self.total_power_consumption += building.power_consumption
+        # First pass: totals with every building operational
+        for building in buildings:
+            total_generation += building.power_generation
+            total_consumption += building.power_consumption
 
-        self.net_power = self.total_power_generation - self.total_power_consumption
+        net_power = total_generation - total_consumption
+        shed = set()
 
-        if self.net_power < 0:
+        if net_power < 0:
             # Power shortage: start turning off non-essential buildings
             # This is a simple approach: turn off consumers one by one until power is balanced or all are off.
             # A more sophisticated approach might prioritize certain buildings.
-            sorted_consumers = sorted([b for b in self.buildings if b.power_consumption > 0 and b.power_generation == 0],
-                                      key=lambda b: b.power_consumption, reverse=True) # Heaviest consumers first
+            if by_position:
+                sort_key = lambda b: (-b.power_consumption, b.position)
+            else:
+                sort_key = lambda b: -b.power_consumption # Heaviest consumers first (stable: list order breaks ties)
+            sorted_consumers = sorted([b for b in buildings if b.power_consumption > 0 and b.power_generation == 0],
+                                      key=sort_key)
 
-            temp_net_power = self.net_power
+            temp_net_power = net_power
             for building in sorted_consumers:
                 if temp_net_power < 0:
-                    building.is_operational = False
+                    shed.add(building)
                     # Recalculate consumption without this building
                     temp_net_power += building.power_consumption # Add back its consumption
+                    total_consumption -= building.power_consumption # Shed consumers are pure consumers
                 else:
                     break
 
-            # Recalculate actual totals with non-operational buildings
-            self.total_power_generation = INITIAL_POWER
-            self.total_power_consumption = 0
-            for building in self.buildings:
-                if building.is_operational:
-                    self.total_power_generation += building.power_generation
-                    self.total_power_consumption += building.power_consumption
-                # else: power gen/con is 0 if not operational
-            self.net_power = self.total_power_generation - self.total_power_consumption
-
-
-        # Second pass: calculate capacities and value based on operational status
-        for building in self.buildings:
-            current_city_value += building.value
-            if building.is_operational:
-                self.max_population_capacity += building.get_population_capacity()
-                # Add ore production here if implemented
-                self.ore += building.get_ore_production() # If per-tick
-            # else: non-operational buildings don't contribute these
-
-        # Population growth (simple model for now)
-        if self.net_power >= 0: # Only grow if there's power
-            if self.population < self.max_population_capacity:
-                growth = (self.max_population_capacity - self.population) * 0.01 # Grow by 1% of remaining capacity
-                self.population += max(0, int(growth)) # Ensure at least 0 growth, and integer population
-            elif self.population > self.max_population_capacity:
-                self.population = self.max_population_capacity # Cap population
-
-        # Credits income (simple model: 1 credit per person per update cycle)
-        if self.net_power >= 0:
-            self.credits += self.population
-
-        self.city_value = current_city_value + self.credits + (self.population * 10) + (self.ore * 2) # Example valuation
+        return total_generation, total_consumption, shed
 
-        self.update_rank()
+    def fork(self) -> 'CityFork':
+        """
+        Returns a copy-on-write what-if view of this city: it shares the buildings and grid, copies
+        only what its own changes touch, and never modifies this city. See preview.CityFork.
+        """
+        from city_builder.preview import CityFork
+        return CityFork(self)
+
+    def preview_add(self, building_type: str, position: Tuple[int, int]) -> 'PlacementPreview':
+        """Projects the effect of placing a building (power, capacity, shed consumers) without side effects."""
+        fork = self.fork()
+        success, message = fork.add_building(building_type, position)
+        return fork.preview(success, message)
+
+    def _update_city_value(self) -> None:
+        self.city_value = self._buildings_value + self.credits + (self.population * 10) + (self.ore * 2) # Example valuation
 
     def update_rank(self) -> None:
-        """Updates the city's rank based on its value."""
-        new_rank_level = self.current_rank_level
-        for rank_level, rank_info in CITY_RANKS.items():
-            if self.city_value >= rank_info["value_needed"]:
-                if rank_level > new_rank_level:
-                    new_rank_level = rank_level
-            else:
-                # Ranks are ordered, so if we don't meet this one, we won't meet higher ones
-                break
+        """Updates the city's rank based on its value. Ranks are never lost."""
+        catalog = get_catalog()
+        new_rank_level = catalog.rank_for_value(self.city_value) # Binary search over the thresholds
 
-        if new_rank_level != self.current_rank_level:
+        if new_rank_level > self.current_rank_level:
             self.current_rank_level = new_rank_level
-            self.current_rank_name = CITY_RANKS[self.current_rank_level]["name"]
-            # Potentially trigger an event or message about ranking up
+            self.current_rank_name = catalog.rank_names[self.current_rank_level]
+            self.events.emit(RankUp(self.current_rank_level, self.current_rank_name))
 
     def to_dict(self) -> Dict[str, Any]:
         """Serializes city data to a dictionary for saving."""
-        return {
+        data = {
             "buildings": [b.to_dict() for b in self.buildings],
             "credits": self.credits,
             "population": self.population,
             "ore": self.ore,
             "current_rank_level": self.current_rank_level,
+            "tick_count": self.tick_count,
+            "next_building_id": self._next_building_id,
+            # Due tick of each pending production/upkeep event, so intervals above 1 keep their phase
+            "schedule": sorted([b.building_id, kind, due] for b, kind, due in self.scheduler.pending()),
             # Net power, capacities, etc., are recalculated on load based on buildings
         }
+        if self.power_networks is not None:
+            data["power_network_mode"] = True
+        if self.fields is not None:
+            data["fields_enabled"] = True
+        if self.logistics is not None:
+            data["logistics_enabled"] = True
+        if self.terrain is not None:
+            data["terrain_seed"] = self.terrain.seed
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'City':
         """Deserializes city data from a dictionary for loading."""
-        city = cls()
+        city = cls(power_network_mode=data.get("power_network_mode", POWER_NETWORK_MODE),
+                   fields_enabled=data.get("fields_enabled", FIELDS_ENABLED),
+                   logistics_enabled=data.get("logistics_enabled", LOGISTICS_ENABLED),
+                   terrain_seed=data.get("terrain_seed", TERRAIN_SEED))
         city.credits = data.get("credits", INITIAL_CREDITS)
         city.population = data.get("population", INITIAL_POPULATION)
         city.ore = data.get("ore", INITIAL_ORE)
         city.current_rank_level = data.get("current_rank_level", 0)
         city.current_rank_name = CITY_RANKS[city.current_rank_level]["name"]
-
-        city.buildings = [] # Clear default buildings if any
-        city.grid = [[None for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)] # Reset grid
+        city.tick_count = data.get("tick_count", 0)
+        # Saved ids are kept; buildings from older saves without one are numbered after them
+        saved_ids = [b["building_id"] for b in data.get("buildings", []) if isinstance(b.get("building_id"), int)]
+        city._next_building_id = max([data.get("next_building_id", 1)] + [i + 1 for i in saved_ids])
 
         for building_data in data.get("buildings", []):
             try:
                 building = Building.from_dict(building_data)
-                city.buildings.append(building)
+                if not isinstance(building.building_id, int) or building.building_id in city.buildings_by_id:
+                    building.building_id = None # Missing or duplicate id: assign a fresh one
                 # Populate grid - assumes no load-time collisions from save file
-                pos_x, pos_y = building.position
-                size_w, size_h = building.size
-                for x_offset in range(size_w):
-                    for y_offset in range(size_h):
-                        if 0 <= pos_x + x_offset < GRID_WIDTH and 0 <= pos_y + y_offset < GRID_HEIGHT:
-                             city.grid[pos_x + x_offset][pos_y + y_offset] = building
+                city._attach_building(building)
             except ValueError as e:
                 print(f"Warning: Could not load building: {e}")
+        if "schedule" in data:
+            city._restore_schedule(data["schedule"])
 
 
-        city.update_resources() # Recalculate all derived stats
+        city.recalculate() # Recalculate all derived stats without running a tick
+        if city.fields is not None:
+            city.fields.update()
         return city
 
 # Example usage:
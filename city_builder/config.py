@@ -1,5 +1,7 @@
 # Elite 1984 City Builder - Configuration File
 
+from city_builder.specs import load_specs
+
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -17,54 +19,50 @@ INITIAL_CREDITS = 10000
 INITIAL_POWER = 100
 INITIAL_POPULATION = 0
 INITIAL_ORE = 500
+POPULATION_GROWTH_RATE = 0.01 # Fraction of the remaining capacity that moves in each tick
 
 TILE_SIZE = 32 # pixels
 GRID_WIDTH = SCREEN_WIDTH // TILE_SIZE
 GRID_HEIGHT = (SCREEN_HEIGHT - 100) // TILE_SIZE # Reserve space for UI
 
-# Game progression
-CITY_RANKS = {
-    0: {"name": "Outpost", "value_needed": 0},
-    1: {"name": "Hamlet", "value_needed": 5000},
-    2: {"name": "Village", "value_needed": 20000},
-    3: {"name": "Town", "value_needed": 100000},
-    4: {"name": "City", "value_needed": 500000},
-    5: {"name": "Metropolis", "value_needed": 2000000},
-}
+# Power networks: when enabled, power only flows between touching buildings (bridged by conduits)
+# and each network balances its own supply and demand instead of sharing one city-wide pool.
+POWER_NETWORK_MODE = False
+
+# Spatial fields (requires numpy): per-tile population density, pollution and land value
+FIELDS_ENABLED = False
+FIELD_UPDATE_INTERVAL = 10 # Ticks between field recomputations
+FIELD_DIFFUSION_RADIUS = 3 # Tiles; emissions spread up to twice this far
+LAND_VALUE_BASE = 100
+LAND_VALUE_PER_DENSITY = 4.0
+LAND_VALUE_PER_POLLUTION = 10.0
+
+# Logistics: mine output is discounted by the walking distance to the nearest habitat
+LOGISTICS_ENABLED = False
+LOGISTICS_MAX_DISTANCE = 20 # Tiles; mines this far from any habitat produce nothing
+
+# Terrain (requires numpy): seeded water, rock and ore richness; None keeps the map featureless
+TERRAIN_SEED = None
+TERRAIN_CACHE_DIR = "city_builder_terrain" # Generated maps cached per seed and size
+
+# Regions: cities simulated side by side trade ore and spare power between ticks (see region.py)
+REGION_ORE_RESERVE = 500 # Ore a city keeps; stock above it is sold, a shortfall below it is bought
+REGION_ORE_PRICE = 3 # Credits per unit of ore
+REGION_POWER_PRICE = 2 # Credits per unit of power, paid every tick it is imported
+# Local server (see server.py): bots and tools drive a City over JSON lines on localhost or a Unix socket
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_TICK_MS = 1000 # Interval between simulation ticks; 0 only ticks on "tick" commands
+SERVER_MAX_LINE = 1 << 20 # Longest accepted request line, in bytes
+SERVER_PUSH_BUFFER = 64 * 1024 # Unsent bytes above which a client's tick updates are coalesced
+
+# Print how long each startup phase took (imports, init, first frame, audio) to the console
+STARTUP_REPORT = False
+
+# Developer mode (also enabled with `--dev` on the command line): edits to the data files are
+# picked up while the game runs and applied to the placed buildings
+DEV_MODE = False
 
-# Building types - will be expanded
-BUILDING_SPECS = {
-    "SOLAR_PANEL": {
-        "name": "Solar Panel",
-        "cost": 500,
-        "power_gen": 50, # Generates power
-        "power_con": 0,  # Consumes power
-        "size": (1, 1), # Grid units
-        "char": "S", # Character for simple map display
-        "unlock_rank": 0,
-        "value": 300,
-    },
-    "HABITAT_SMALL": {
-        "name": "Small Habitat",
-        "cost": 1000,
-        "power_gen": 0,
-        "power_con": 10,
-        "population_cap": 50,
-        "size": (2, 2),
-        "char": "H",
-        "unlock_rank": 0,
-        "value": 800,
-    },
-    "ORE_MINE_BASIC": {
-        "name": "Basic Ore Mine",
-        "cost": 1500,
-        "power_gen": 0,
-        "power_con": 20, # Consumes power to operate
-        "ore_prod": 5,   # Produces 5 ore per tick when operational
-        "size": (2, 2),
-        "char": "M",
-        "unlock_rank": 1, # Unlocks a bit later
-        "value": 1000,
-    },
-    # More buildings to be added here
-}
+# Game progression and building types, loaded from city_builder/data (ranks.json and buildings*.json
+# or .toml files; see specs.py for the schema). Parsed tables are cached until a data file changes.
+BUILDING_SPECS, CITY_RANKS = load_specs()
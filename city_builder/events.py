@@ -0,0 +1,70 @@
+# Elite 1984 City Builder - City Change Events
+
+from typing import Dict, List, NamedTuple, Tuple, Type
+
+from city_builder.buildings import Building
+
+
+class BuildingAdded(NamedTuple):
+    building: Building
+
+
+class BuildingRemoved(NamedTuple):
+    building: Building
+
+
+class BuildingStatsChanged(NamedTuple):
+    """A placed building's stats were re-read, e.g. after a spec reload."""
+    building: Building
+
+
+class OperationalChanged(NamedTuple):
+    building: Building
+    operational: bool
+
+
+class ResourcesChanged(NamedTuple):
+    """The city totals that changed since the previous ResourcesChanged: name -> (old, new)."""
+    changes: Dict[str, Tuple[int, int]]
+
+
+class RankUp(NamedTuple):
+    level: int
+    name: str
+
+
+class Subscription:
+    """One subscriber's queue. Events accumulate until drain() hands them over as a batch."""
+    def __init__(self, kinds: Tuple[Type, ...]):
+        self.kinds = kinds # Empty: every kind
+        self._queue: List[NamedTuple] = []
+
+    def drain(self) -> List[NamedTuple]:
+        """Returns the events queued since the last drain, oldest first."""
+        batch, self._queue = self._queue, []
+        return batch
+
+
+class EventBus:
+    """
+    Delivers a City's change events to subscribers through per-subscriber queues, so each layer
+    (renderer, sound, stats) drains one batch per frame or tick and reacts only to what changed.
+    Emitting with no subscribers costs one check.
+    """
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+
+    def subscribe(self, *kinds: Type) -> Subscription:
+        """Starts queueing events of the given classes (all events if none are given)."""
+        subscription = Subscription(kinds)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def emit(self, event: NamedTuple) -> None:
+        for subscription in self._subscriptions:
+            if not subscription.kinds or isinstance(event, subscription.kinds):
+                subscription._queue.append(event)
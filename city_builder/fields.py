@@ -0,0 +1,122 @@
+# Elite 1984 City Builder - Spatial Fields (population density, pollution, land value)
+
+from typing import Tuple
+
+import numpy as np
+
+from city_builder.buildings import Building
+from city_builder.config import (
+    FIELD_DIFFUSION_RADIUS, FIELD_UPDATE_INTERVAL,
+    LAND_VALUE_BASE, LAND_VALUE_PER_DENSITY, LAND_VALUE_PER_POLLUTION
+)
+
+
+def _box_blur_rows(a: np.ndarray, radius: int) -> np.ndarray:
+    """Mean over a (2 * radius + 1)-wide window along axis 0, zero-padded, via cumulative sums."""
+    n = a.shape[0]
+    padded = np.zeros((n + 2 * radius + 1,) + a.shape[1:], dtype=np.float64)
+    padded[radius + 1:radius + 1 + n] = a
+    sums = np.cumsum(padded, axis=0)
+    return ((sums[2 * radius + 1:] - sums[:n]) / (2 * radius + 1)).astype(np.float32)
+
+
+def diffuse(source: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Spreads a per-tile source with a separable tent kernel (two box-blur passes per axis).
+    Output tiles depend only on sources within 2 * radius tiles.
+    """
+    out = source
+    for _ in range(2):
+        out = _box_blur_rows(out, radius) # Along x
+        out = _box_blur_rows(out.T, radius).T # Along y
+    return out
+
+
+class FieldModel:
+    """
+    Per-tile density, pollution and land-value arrays matching City.grid (indexed [x][y]).
+
+    Habitats emit density (their population capacity spread over their footprint), buildings with
+    a "pollution" spec emit pollution, and both diffuse over the map. Emissions are stamped into
+    source arrays as buildings are placed or removed; the diffused fields are refreshed every
+    `update_interval` ticks, recomputing only the area reachable from the changed tiles.
+    """
+    def __init__(self, width: int, height: int, radius: int = FIELD_DIFFUSION_RADIUS,
+                 update_interval: int = FIELD_UPDATE_INTERVAL):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.reach = 2 * radius # Kernel reach of diffuse()
+        self.update_interval = update_interval
+
+        self.density_source = np.zeros((width, height), dtype=np.float32)
+        self.pollution_source = np.zeros((width, height), dtype=np.float32)
+        self.density = np.zeros((width, height), dtype=np.float32)
+        self.pollution = np.zeros((width, height), dtype=np.float32)
+        self.land_value = np.full((width, height), LAND_VALUE_BASE, dtype=np.float32)
+
+        self._dirty: Tuple[int, int, int, int] | None = None # (x0, y0, x1, y1), exclusive ends
+        self.updates = 0 # Number of recomputations actually performed
+
+    def _stamp(self, building: Building, sign: int) -> None:
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        x0, y0 = max(0, pos_x), max(0, pos_y)
+        x1, y1 = min(self.width, pos_x + size_w), min(self.height, pos_y + size_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        tiles = size_w * size_h
+        if building.population_capacity:
+            self.density_source[x0:x1, y0:y1] += sign * building.population_capacity / tiles
+        if building.pollution:
+            self.pollution_source[x0:x1, y0:y1] += sign * building.pollution / tiles
+        self._mark_dirty(x0, y0, x1, y1)
+
+    def add_building(self, building: Building) -> None:
+        self._stamp(building, 1)
+
+    def remove_building(self, building: Building) -> None:
+        self._stamp(building, -1)
+
+    def _mark_dirty(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        if self._dirty is None:
+            self._dirty = (x0, y0, x1, y1)
+        else:
+            dx0, dy0, dx1, dy1 = self._dirty
+            self._dirty = (min(dx0, x0), min(dy0, y0), max(dx1, x1), max(dy1, y1))
+
+    def tick(self, tick_count: int) -> None:
+        """Called once per simulation tick; recomputes dirty areas every `update_interval` ticks."""
+        if tick_count % self.update_interval == 0:
+            self.update()
+
+    def update(self) -> bool:
+        """Recomputes the fields around changed tiles. Returns False if nothing was dirty."""
+        if self._dirty is None:
+            return False
+        x0, y0, x1, y1 = self._dirty
+        self._dirty = None
+        reach = self.reach
+
+        # Output window: every tile a changed source can influence
+        ox0, oy0 = max(0, x0 - reach), max(0, y0 - reach)
+        ox1, oy1 = min(self.width, x1 + reach), min(self.height, y1 + reach)
+        # Source window: every source that influences the output window
+        sx0, sy0 = max(0, ox0 - reach), max(0, oy0 - reach)
+        sx1, sy1 = min(self.width, ox1 + reach), min(self.height, oy1 + reach)
+        inner = (slice(ox0 - sx0, ox1 - sx0), slice(oy0 - sy0, oy1 - sy0))
+        window = (slice(ox0, ox1), slice(oy0, oy1))
+
+        self.density[window] = diffuse(self.density_source[sx0:sx1, sy0:sy1], self.radius)[inner]
+        self.pollution[window] = diffuse(self.pollution_source[sx0:sx1, sy0:sy1], self.radius)[inner]
+        land_value = (LAND_VALUE_BASE + LAND_VALUE_PER_DENSITY * self.density[window]
+                      - LAND_VALUE_PER_POLLUTION * self.pollution[window])
+        np.maximum(land_value, 0, out=self.land_value[window])
+        self.updates += 1
+        return True
+
+    def land_value_at(self, position: Tuple[int, int]) -> float:
+        return float(self.land_value[position])
+
+    def mean_land_value(self) -> float:
+        return float(self.land_value.mean())
@@ -0,0 +1,89 @@
+# Elite 1984 City Builder - Spec Hot Reload (developer mode)
+
+import os
+import time
+from typing import Dict, Tuple
+
+from city_builder.catalog import compile_catalog
+from city_builder.city import City
+from city_builder.config import BUILDING_SPECS, CITY_RANKS
+from city_builder.specs import DATA_DIR, SpecError, load_specs, source_files
+
+POLL_INTERVAL = 0.5 # Seconds between mtime checks
+
+
+class SpecReloader:
+    """
+    Watches the spec data files by polling their modification times and, when one changes,
+    swaps the new definitions into BUILDING_SPECS / CITY_RANKS and refreshes only the placed
+    buildings whose type changed. A poll between checks costs one clock read; a check costs
+    one stat() per data file.
+    """
+    def __init__(self, data_dir: str = DATA_DIR, poll_interval: float = POLL_INTERVAL):
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self._last_check = time.monotonic()
+        self._stamps = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) of every data file, keyed by name."""
+        stamps = {}
+        for name in source_files(self.data_dir):
+            try:
+                stat = os.stat(os.path.join(self.data_dir, name))
+            except OSError:
+                continue # Removed between listing and stat; picked up next check
+            stamps[name] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def poll(self, now: float | None = None) -> bool:
+        """Returns True when a data file was added, removed or modified since the last check."""
+        now = time.monotonic() if now is None else now
+        if now - self._last_check < self.poll_interval:
+            return False
+        self._last_check = now
+        stamps = self._snapshot()
+        if stamps == self._stamps:
+            return False
+        self._stamps = stamps
+        return True
+
+    def reload(self, city: City) -> Tuple[bool, str]:
+        """
+        Loads the data files and applies them to the live tables and `city`.
+        Invalid files leave the current specs untouched. Returns (success, message).
+        """
+        try:
+            new_specs, new_ranks = load_specs(self.data_dir)
+        except (OSError, SpecError, ValueError, TypeError, AttributeError) as e:
+            # Any parse or validation failure in a half-edited file is a failed reload, never a crash
+            return False, f"Spec reload failed: {e}"
+
+        in_use = set(city.index.types())
+        removed = [t for t in BUILDING_SPECS if t not in new_specs and t in in_use]
+        if removed:
+            return False, f"Spec reload failed: {', '.join(removed)} still placed in the city"
+
+        changed = {t for t, spec in new_specs.items() if BUILDING_SPECS.get(t) != spec}
+        renumbered = list(new_specs) != list(BUILDING_SPECS)
+        for type_name in changed & set(BUILDING_SPECS):
+            # Update in place: placed buildings hold a reference to their spec dict
+            BUILDING_SPECS[type_name].clear()
+            BUILDING_SPECS[type_name].update(new_specs[type_name])
+        if renumbered:
+            table = {t: BUILDING_SPECS.get(t, spec) for t, spec in new_specs.items()}
+            BUILDING_SPECS.clear()
+            BUILDING_SPECS.update(table)
+        if new_ranks != CITY_RANKS:
+            CITY_RANKS.clear()
+            CITY_RANKS.update(new_ranks)
+        compile_catalog(validate=False) # load_specs already validated
+
+        updated = city.refresh_building_types(changed & in_use, renumbered)
+        return True, f"Specs reloaded: {len(changed)} type(s) changed, {updated} building(s) updated"
+
+    def check(self, city: City) -> Tuple[bool, str] | None:
+        """poll() and reload() in one call; returns None when nothing changed."""
+        if self.poll():
+            return self.reload(city)
+        return None
@@ -0,0 +1,220 @@
+# Elite 1984 City Builder - Engine Instrumentation
+
+import functools
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from city_builder import save_load
+from city_builder.city import City
+
+METRIC_PREFIX = "city_builder"
+
+# (owner, attribute, metric name) for every instrumented engine hot path
+HOT_PATHS: List[Tuple[Any, str, str]] = [
+    (City, "add_building", "city_add_building"),
+    (City, "remove_building", "city_remove_building"),
+    (City, "update_resources", "city_update_resources"),
+    (City, "advance_ticks", "city_advance_ticks"),
+    (City, "update_rank", "city_update_rank"),
+    (City, "to_dict", "city_to_dict"),
+    (City, "from_dict", "city_from_dict"),
+    (save_load, "save_game", "save_game"),
+    (save_load, "load_game", "load_game"),
+]
+
+
+class OperationMetrics:
+    """Accumulated timings and allocation deltas for one engine operation."""
+    __slots__ = ("calls", "total_seconds", "max_seconds", "alloc_bytes", "max_alloc_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.alloc_bytes = 0 # Net traced bytes, summed over calls (only with allocation tracking)
+        self.max_alloc_bytes = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+            "max_seconds": self.max_seconds,
+            "alloc_bytes": self.alloc_bytes,
+            "max_alloc_bytes": self.max_alloc_bytes,
+        }
+
+
+class EngineInstrumentation:
+    """
+    Records call counts, cumulative/max latency and allocation deltas for the engine hot paths.
+
+    While disabled the original functions are in place, so instrumentation costs nothing.
+    enable() swaps timing wrappers onto the owning class/module and disable() restores them.
+    Callers that bound a function by name before enable() (e.g. `from save_load import save_game`)
+    keep calling the unwrapped original.
+    """
+    def __init__(self, hot_paths: List[Tuple[Any, str, str]] = HOT_PATHS):
+        self.hot_paths = hot_paths
+        self.metrics: Dict[str, OperationMetrics] = {}
+        self.gauges: Dict[str, float] = {}
+        self.enabled = False
+        self.track_allocations = False
+        self._originals: List[Tuple[Any, str, Any]] = []
+        self._started_tracemalloc = False
+
+    def enable(self, track_allocations: bool = False) -> None:
+        """Installs the timing wrappers. Allocation tracking starts tracemalloc, which is much slower."""
+        if self.enabled:
+            return
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        for owner, attribute, metric_name in self.hot_paths:
+            original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+            self._originals.append((owner, attribute, original))
+            if isinstance(original, classmethod):
+                wrapped = classmethod(self._wrap(original.__func__, metric_name))
+            elif isinstance(original, staticmethod):
+                wrapped = staticmethod(self._wrap(original.__func__, metric_name))
+            else:
+                wrapped = self._wrap(original, metric_name)
+            setattr(owner, attribute, wrapped)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Restores the original functions. Recorded metrics are kept until reset()."""
+        if not self.enabled:
+            return
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = False
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.disable()
+        return False
+
+    def reset(self) -> None:
+        # Zero in place: installed wrappers hold references to these objects
+        for m in self.metrics.values():
+            m.__init__()
+        self.gauges.clear()
+
+    def _wrap(self, func: Callable, metric_name: str) -> Callable:
+        metrics = self.metrics.setdefault(metric_name, OperationMetrics())
+        perf_counter = time.perf_counter
+
+        if self.track_allocations:
+            get_traced_memory = tracemalloc.get_traced_memory
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                alloc_before = get_traced_memory()[0]
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    alloc_delta = get_traced_memory()[0] - alloc_before
+                    metrics.calls += 1
+                    metrics.total_seconds += elapsed
+                    if elapsed > metrics.max_seconds:
+                        metrics.max_seconds = elapsed
+                    metrics.alloc_bytes += alloc_delta
+                    if alloc_delta > metrics.max_alloc_bytes:
+                        metrics.max_alloc_bytes = alloc_delta
+            return wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                metrics.calls += 1
+                metrics.total_seconds += elapsed
+                if elapsed > metrics.max_seconds:
+                    metrics.max_seconds = elapsed
+        return wrapper
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Records a point-in-time value (e.g. building count) to export alongside the operation metrics."""
+        self.gauges[name] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a plain-dict copy of all metrics, safe to keep or serialize."""
+        return {
+            "operations": {name: m.to_dict() for name, m in self.metrics.items()},
+            "gauges": dict(self.gauges),
+        }
+
+    def to_prometheus(self) -> str:
+        """Formats the metrics in the Prometheus text exposition format."""
+        families = [
+            ("calls_total", "counter", "Number of calls per engine operation.", "calls"),
+            ("seconds_total", "counter", "Cumulative wall time spent per engine operation.", "total_seconds"),
+            ("max_seconds", "gauge", "Slowest single call per engine operation.", "max_seconds"),
+            ("alloc_bytes_total", "counter", "Net traced allocation delta per engine operation.", "alloc_bytes"),
+            ("max_alloc_bytes", "gauge", "Largest single-call allocation delta per engine operation.", "max_alloc_bytes"),
+        ]
+        lines = []
+        operations = sorted(self.metrics.items())
+        for suffix, metric_type, help_text, field in families:
+            metric = f"{METRIC_PREFIX}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for name, m in operations:
+                lines.append(f'{metric}{{op="{name}"}} {getattr(m, field)}')
+        for name, value in sorted(self.gauges.items()):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filepath: str) -> bool:
+        """
+        Writes the Prometheus text dump to `filepath`. The file is replaced atomically so
+        scrapers (e.g. a node_exporter textfile collector) never see a partial dump.
+        """
+        temp_path = filepath + ".tmp"
+        try:
+            directory = os.path.dirname(filepath)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(temp_path, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(temp_path, filepath)
+            return True
+        except OSError as e:
+            print(f"Error writing metrics to {filepath}: {e}")
+        return False
+
+
+# Shared instance used by headless soak runs
+instrumentation = EngineInstrumentation()
+
+
+# Example usage:
+if __name__ == "__main__":
+    instrumentation.enable()
+    city = City()
+    for i in range(20):
+        city.add_building("SOLAR_PANEL", (i, 0))
+        city.update_resources()
+    City.from_dict(city.to_dict())
+    instrumentation.set_gauge("buildings", len(city.buildings))
+    instrumentation.disable()
+    print(instrumentation.to_prometheus())
@@ -0,0 +1,174 @@
+# Elite 1984 City Builder - Logistics (distance from mines to habitats)
+
+import heapq
+from typing import Dict, List, Tuple
+
+from city_builder.buildings import Building
+from city_builder.config import LOGISTICS_MAX_DISTANCE
+
+UNREACHABLE = 1 << 30
+
+
+class LogisticsNetwork:
+    """
+    Keeps a multi-source BFS distance field from every resource sink (buildings with population
+    capacity) over the grid. Haulers walk over empty tiles; other buildings block them.
+    Mine output is discounted by the walking distance to the nearest sink.
+
+    The field is repaired incrementally when buildings change: new sinks and freed tiles relax
+    distances outward, while removed sinks and new obstacles only invalidate the part of the BFS
+    tree that passed through them before it is re-grown from its boundary.
+    """
+    def __init__(self, width: int, height: int, max_distance: int = LOGISTICS_MAX_DISTANCE):
+        self.width = width
+        self.height = height
+        self.max_distance = max_distance
+        cells = width * height
+        self.dist: List[int] = [UNREACHABLE] * cells
+        self.parent: List[int] = [-1] * cells # Next cell towards the nearest sink; -1 for sinks/unreached
+        self.passable: List[bool] = [True] * cells
+        self.version = 0 # Bumped on every change; invalidates cached mine outputs
+        self._output_cache: Dict[Building, Tuple[int, int]] = {} # building -> (version, output)
+
+    def _cells(self, building: Building) -> List[int]:
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        return [x * self.height + y
+                for x in range(max(0, pos_x), min(self.width, pos_x + size_w))
+                for y in range(max(0, pos_y), min(self.height, pos_y + size_h))]
+
+    def _neighbors(self, cell: int) -> List[int]:
+        x, y = divmod(cell, self.height)
+        result = []
+        if x > 0:
+            result.append(cell - self.height)
+        if x < self.width - 1:
+            result.append(cell + self.height)
+        if y > 0:
+            result.append(cell - 1)
+        if y < self.height - 1:
+            result.append(cell + 1)
+        return result
+
+    @staticmethod
+    def is_sink(building: Building) -> bool:
+        return building.population_capacity > 0
+
+    def add_building(self, building: Building) -> None:
+        cells = self._cells(building)
+        if self.is_sink(building):
+            # Sink tiles become sources; a sink's tiles were empty, so nothing is invalidated
+            heap = []
+            for cell in cells:
+                self.dist[cell] = 0
+                self.parent[cell] = -1
+                heap.append((0, cell))
+            self._propagate(heap)
+        else:
+            for cell in cells:
+                self.passable[cell] = False
+            self._invalidate(cells)
+        self._changed()
+
+    def remove_building(self, building: Building) -> None:
+        cells = self._cells(building)
+        for cell in cells:
+            self.passable[cell] = True
+        if self.is_sink(building):
+            self._invalidate(cells) # Also re-seeds the freed tiles as ordinary ground
+        else:
+            self._reseed(cells)
+        self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+
+    def _invalidate(self, roots: List[int]) -> None:
+        """Clears every cell whose shortest path ran through `roots`, then re-grows them from their boundary."""
+        dist, parent = self.dist, self.parent
+        subtree = list(roots)
+        in_subtree = set(roots)
+        index = 0
+        while index < len(subtree):
+            cell = subtree[index]
+            index += 1
+            for neighbor in self._neighbors(cell):
+                if parent[neighbor] == cell and neighbor not in in_subtree:
+                    in_subtree.add(neighbor)
+                    subtree.append(neighbor)
+        for cell in subtree:
+            dist[cell] = UNREACHABLE
+            parent[cell] = -1
+        self._reseed(subtree)
+
+    def _reseed(self, cells: List[int]) -> None:
+        """Gives passable `cells` a distance from their settled neighbours, then propagates outward."""
+        dist, parent, passable = self.dist, self.parent, self.passable
+        heap = []
+        for cell in cells:
+            if not passable[cell]:
+                continue
+            best, best_parent = dist[cell], parent[cell]
+            for neighbor in self._neighbors(cell):
+                if passable[neighbor] and dist[neighbor] + 1 < best:
+                    best, best_parent = dist[neighbor] + 1, neighbor
+            if best < dist[cell]:
+                dist[cell], parent[cell] = best, best_parent
+            if dist[cell] < UNREACHABLE:
+                heap.append((dist[cell], cell))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _propagate(self, heap: List[Tuple[int, int]]) -> None:
+        """Unit-weight Dijkstra from the seeded cells, only visiting cells whose distance improves."""
+        dist, parent, passable = self.dist, self.parent, self.passable
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d > dist[cell]:
+                continue
+            for neighbor in self._neighbors(cell):
+                if passable[neighbor] and d + 1 < dist[neighbor]:
+                    dist[neighbor] = d + 1
+                    parent[neighbor] = cell
+                    heapq.heappush(heap, (d + 1, neighbor))
+
+    def distance_at(self, position: Tuple[int, int]) -> int:
+        """Walking distance from a tile to the nearest sink (UNREACHABLE if none)."""
+        return self.dist[position[0] * self.height + position[1]]
+
+    def distance_to_sink(self, building: Building) -> int:
+        """Steps from the edge of `building`'s footprint to the nearest sink tile."""
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        best = UNREACHABLE
+        edge = [(x, pos_y - 1) for x in range(pos_x, pos_x + size_w)]
+        edge += [(x, pos_y + size_h) for x in range(pos_x, pos_x + size_w)]
+        edge += [(pos_x - 1, y) for y in range(pos_y, pos_y + size_h)]
+        edge += [(pos_x + size_w, y) for y in range(pos_y, pos_y + size_h)]
+        for x, y in edge:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                d = self.dist[x * self.height + y]
+                if d < best:
+                    best = d
+        return best + 1 if best < UNREACHABLE else UNREACHABLE
+
+    def output_factor(self, building: Building) -> float:
+        """1.0 next to a sink, falling linearly to 0 at max_distance or when no sink is reachable."""
+        distance = self.distance_to_sink(building)
+        if distance >= UNREACHABLE:
+            return 0.0
+        return max(0.0, 1.0 - (distance - 1) / self.max_distance)
+
+    def effective_ore_production(self, building: Building) -> int:
+        """A building's ore output after the distance discount, cached until the field changes."""
+        if not building.is_operational or not building.ore_production:
+            return 0
+        cached = self._output_cache.get(building)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        output = int(building.ore_production * self.output_factor(building))
+        self._output_cache[building] = (self.version, output)
+        return output
+
+    def forget(self, building: Building) -> None:
+        self._output_cache.pop(building, None)
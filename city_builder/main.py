@@ -1,44 +1,75 @@
 # Elite 1984 City Builder - Main Game File
 
+import time
+_IMPORT_START = time.perf_counter() # Origin of the startup report
+
 import pygame as pg
 import os # For sound file paths
+import sys
 
 from city_builder.city import City
 from city_builder.ui import UIManager
 from city_builder.sound import SoundManager
+from city_builder.profiler import FrameProfiler, StartupTimer
+from city_builder.replay import SessionRecorder
+from city_builder.hot_reload import SpecReloader
+from city_builder.undo import UndoHistory
+from city_builder.speed import SimulationClock, SPEED_MODES
+from city_builder.events import RankUp
 from city_builder.config import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE, BLACK, BUILDING_SPECS, WHITE
+    SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE, BLACK, BUILDING_SPECS, WHITE, DEV_MODE, STARTUP_REPORT
 )
 from city_builder.save_load import save_game, load_game
 
+try:
+    from city_builder.metrics import MetricsHistory
+except ImportError: # numpy is optional; without it there are no history graphs
+    MetricsHistory = None
+
 # Helper function to get asset paths
 def get_asset_path(*path_segments):
     base_dir = os.path.dirname(__file__) # Directory of main.py
     return os.path.join(base_dir, "assets", *path_segments)
 
 
+def load_sounds(sound_manager: SoundManager) -> None:
+    """Opens the audio device and starts decoding the sound effects in the background."""
+    sound_manager.preload({ # Paths are relative to the assets folder
+        "ui_click": get_asset_path("sounds", "ui_click.wav"),
+        "build_place": get_asset_path("sounds", "build_place.wav"),
+        "error": get_asset_path("sounds", "error.wav"), # Example error sound
+    })
+    sound_manager.configure("build_place", voice_limit=1, cooldown_ms=80) # Drag-building places many in quick succession
+
+
 def main():
-    pg.init()
-    pg.mixer.pre_init(44100, -16, 2, 512) # Initialize mixer with good defaults
-    pg.mixer.init() # Initialize mixer
+    startup = StartupTimer(_IMPORT_START)
+    startup.mark("imports")
+    # Only the subsystems the first frame needs; audio is opened once that frame is on screen
+    pg.display.init()
+    pg.font.init()
 
     screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pg.display.set_caption("Elite City Builder")
     clock = pg.time.Clock()
 
     city = City()
-    ui_manager = UIManager(screen, city)
-    sound_manager = SoundManager()
-
-    # Load sounds (paths are relative to the assets folder)
-    sound_manager.load_sound("ui_click", get_asset_path("sounds", "ui_click.wav"))
-    sound_manager.load_sound("build_place", get_asset_path("sounds", "build_place.wav"))
-    sound_manager.load_sound("error", get_asset_path("sounds", "error.wav")) # Example error sound
+    profiler = FrameProfiler() # F3 toggles the overlay, F4 exports a CSV trace
+    ui_manager = UIManager(screen, city, profiler)
+    recorder = SessionRecorder() # F9 starts/stops recording a replayable session
+    history = UndoHistory() # Ctrl+Z / Ctrl+Y; a drag-build undoes as one action
+    drag_grid_pos = None # Last tile placed on while drag-building (left button held)
+    metrics = MetricsHistory() if MetricsHistory is not None else None # G cycles the history graphs
+    city.metrics = ui_manager.metrics = metrics
+    rank_events = city.events.subscribe(RankUp) # Announced with a message and a sound
+    sound_manager = SoundManager() # Sounds are loaded after the first frame, see load_sounds()
+    spec_reloader = SpecReloader() if DEV_MODE or "--dev" in sys.argv else None # Live data-file edits
+    startup.mark("init")
 
     # Game state variables
     running = True
-    game_tick_timer = 0
-    time_per_tick = 1000  # ms, so 1 game update per second
+    time_per_tick = 1000  # ms, so 1 game update per second at 1x
+    sim_clock = SimulationClock(time_per_tick) # Space pauses, 1-5 pick Paused/1x/4x/16x/Max
 
     # For displaying messages briefly
     message_display_timer = 0
@@ -54,7 +85,7 @@ def main():
 
     while running:
         dt = clock.tick(60)  # Delta time in milliseconds, cap at 60 FPS
-        game_tick_timer += dt
+        profiler.begin_frame()
         if message_text and message_display_timer > 0:
             message_display_timer -= dt
             if message_display_timer <= 0:
@@ -62,89 +93,190 @@ def main():
 
 
         mouse_pos = pg.mouse.get_pos()
-        mouse_grid_pos = (mouse_pos[0] // TILE_SIZE, mouse_pos[1] // TILE_SIZE)
+        mouse_grid_pos = ui_manager.screen_to_grid(mouse_pos) # World tile, offset by the camera
+        over_map = mouse_pos[1] // TILE_SIZE < city.grid_height # Not on the bottom UI panel
 
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                running = False
+        with profiler.section("events"):
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    running = False
 
-            if event.type == pg.KEYDOWN:
-                if event.key == pg.K_ESCAPE:
-                    if ui_manager.build_menu_active:
-                        ui_manager.toggle_build_menu()
-                        sound_manager.play("ui_click")
-                    else:
-                        ui_manager.selected_building_type = None # Cancel placement
-                        sound_manager.play("ui_click")
-                elif event.key == pg.K_b:
-                    ui_manager.toggle_build_menu()
-                    sound_manager.play("ui_click")
-                elif event.key == pg.K_s and pg.key.get_mods() & pg.KMOD_CTRL: # Ctrl+S to Save
-                    if save_game(city):
-                        message_text = "Game Saved!"
+                if event.type == pg.KEYDOWN:
+                    if ui_manager.handle_key_build_menu(event):
+                        pass # Typed into the focused build menu search box, or scrolled it
+                    elif event.key == pg.K_ESCAPE:
+                        if ui_manager.build_menu_active:
+                            ui_manager.toggle_build_menu()
+                            sound_manager.play("ui_click")
+                        else:
+                            ui_manager.selected_building_type = None # Cancel placement
+                            sound_manager.play("ui_click")
+                    elif event.key == pg.K_F3:
+                        profiler.toggle()
+                    elif event.key == pg.K_F4:
+                        if not profiler.enabled:
+                            message_text = "Enable the profiler (F3) before exporting."
+                        else:
+                            trace_path = profiler.export_csv()
+                            message_text = f"Profiler trace saved to {trace_path}" if trace_path else "Error Saving Profiler Trace!"
                         message_display_timer = MESSAGE_DURATION
-                    else:
-                        message_text = "Error Saving Game!"
+                    elif event.key == pg.K_F9:
+                        if recorder.is_recording:
+                            recorder.stop()
+                            message_text = f"Recording saved to {recorder.filepath}"
+                        else:
+                            replay_path = recorder.start(city, history=history)
+                            message_text = "Recording session..." if replay_path else "Error Starting Recording!"
                         message_display_timer = MESSAGE_DURATION
-                elif event.key == pg.K_l and pg.key.get_mods() & pg.KMOD_CTRL: # Ctrl+L to Load
-                    loaded_c = load_game()
-                    if loaded_c:
-                        city = loaded_c
-                        # Re-patch grid dimensions for the new city instance
-                        city.grid_width = SCREEN_WIDTH // TILE_SIZE
-                        city.grid_height = (SCREEN_HEIGHT - 80) // TILE_SIZE
-                        ui_manager.city = city # Update UIManager's reference
-                        message_text = "Game Loaded!"
+                    elif event.key == pg.K_SPACE:
+                        sim_clock.toggle_pause()
+                        message_text = f"Speed: {sim_clock.label}"
                         message_display_timer = MESSAGE_DURATION
-                    else:
-                        message_text = "Error Loading Game or No Save!"
+                    elif pg.K_1 <= event.key < pg.K_1 + len(SPEED_MODES):
+                        sim_clock.set_mode(event.key - pg.K_1)
+                        message_text = f"Speed: {sim_clock.label}"
                         message_display_timer = MESSAGE_DURATION
-
-
-            if event.type == pg.MOUSEBUTTONDOWN:
-                if event.button == 1: # Left click
-                    if ui_manager.build_menu_active:
-                        clicked_on_menu_item = ui_manager.handle_click_build_menu(mouse_pos)
-                        if clicked_on_menu_item : # Includes selecting an item or closing
-                             sound_manager.play("ui_click")
-                    elif ui_manager.selected_building_type:
-                        # Check if mouse is within the game grid area (not on the bottom UI panel)
-                        if mouse_grid_pos[1] < city.grid_height : # grid_height is number of rows
-                            success, msg = city.add_building(ui_manager.selected_building_type, mouse_grid_pos)
-                            message_text = msg
-                            message_display_timer = MESSAGE_DURATION
-                            if success:
-                                sound_manager.play("build_place")
-                                # Optionally, keep selected_building_type to place multiple
-                                # ui_manager.selected_building_type = None
-                            else:
-                                sound_manager.play("error")
+                    elif event.key == pg.K_g:
+                        if metrics is None:
+                            message_text = "History graphs need numpy."
+                        else:
+                            tier = ui_manager.cycle_graph_tier()
+                            message_text = f"History graph: per {tier}" if tier else "History graph off"
+                        message_display_timer = MESSAGE_DURATION
+                    elif event.key == pg.K_h:
+                        if not ui_manager.overlays_available:
+                            message_text = "Heatmap overlays need numpy."
                         else:
-                            message_text = "Cannot build on UI panel area."
+                            overlay = ui_manager.cycle_overlay()
+                            message_text = f"Overlay: {overlay}" if overlay else "Overlay off"
+                        message_display_timer = MESSAGE_DURATION
+                    elif event.key == pg.K_m:
+                        if ui_manager.toggle_minimap():
+                            sound_manager.play("ui_click")
+                        else:
+                            message_text = "The minimap needs numpy."
                             message_display_timer = MESSAGE_DURATION
-                            sound_manager.play("error")
-                    else: # No menu, no building selected - potentially for selecting existing building later
-                        pass
-                elif event.button == 3: # Right click - for cancelling placement or deleting
-                    if ui_manager.selected_building_type:
-                        ui_manager.selected_building_type = None # Cancel placement
+                    elif event.key == pg.K_b:
+                        ui_manager.toggle_build_menu()
                         sound_manager.play("ui_click")
-                    else: # Try to remove building
-                        # Check if mouse is within the game grid area
-                        if mouse_grid_pos[1] < city.grid_height:
-                            success, msg = city.remove_building(mouse_grid_pos)
-                            message_text = msg
+                    elif event.key == pg.K_s and pg.key.get_mods() & pg.KMOD_CTRL: # Ctrl+S to Save
+                        recorder.save()
+                        if save_game(city):
+                            message_text = "Game Saved!"
+                            message_display_timer = MESSAGE_DURATION
+                        else:
+                            message_text = "Error Saving Game!"
                             message_display_timer = MESSAGE_DURATION
-                            if success:
-                                sound_manager.play("ui_click") # Or a dedicated "sell/destroy" sound
+                    elif event.key == pg.K_z and pg.key.get_mods() & pg.KMOD_CTRL: # Ctrl+Z to Undo
+                        success, message_text = history.undo(city)
+                        recorder.undo()
+                        message_display_timer = MESSAGE_DURATION
+                        sound_manager.play("ui_click" if success else "error")
+                    elif event.key == pg.K_y and pg.key.get_mods() & pg.KMOD_CTRL: # Ctrl+Y to Redo
+                        success, message_text = history.redo(city)
+                        recorder.redo()
+                        message_display_timer = MESSAGE_DURATION
+                        sound_manager.play("ui_click" if success else "error")
+                    elif event.key == pg.K_l and pg.key.get_mods() & pg.KMOD_CTRL: # Ctrl+L to Load
+                        loaded_c = load_game()
+                        if loaded_c:
+                            city = loaded_c
+                            recorder.load(city)
+                            history.clear()
+                            if metrics is not None:
+                                metrics.clear() # The history belonged to the previous city
+                                city.metrics = metrics
+                            # Re-patch grid dimensions for the new city instance
+                            city.grid_width = SCREEN_WIDTH // TILE_SIZE
+                            city.grid_height = (SCREEN_HEIGHT - 80) // TILE_SIZE
+                            ui_manager.attach_city(city) # Update UIManager's reference and event subscription
+                            rank_events = city.events.subscribe(RankUp)
+                            message_text = "Game Loaded!"
+                            message_display_timer = MESSAGE_DURATION
+                        else:
+                            message_text = "Error Loading Game or No Save!"
+                            message_display_timer = MESSAGE_DURATION
+
+
+                if event.type == pg.MOUSEWHEEL and ui_manager.build_menu_active:
+                    ui_manager.scroll_build_menu(-event.y)
+
+                if event.type == pg.MOUSEBUTTONDOWN:
+                    if event.button == 1: # Left click
+                        if ui_manager.build_menu_active:
+                            clicked_on_menu_item = ui_manager.handle_click_build_menu(mouse_pos)
+                            if clicked_on_menu_item : # Includes selecting an item or closing
+                                 sound_manager.play("ui_click")
+                        elif ui_manager.handle_click_minimap(mouse_pos): # Jumps the camera
+                            sound_manager.play("ui_click")
+                        elif ui_manager.selected_building_type:
+                            # Check if mouse is within the game grid area (not on the bottom UI panel)
+                            if over_map:
+                                # Start a drag-build: every placement until the button is released is one undo step
+                                history.begin_batch()
+                                recorder.begin_batch()
+                                drag_grid_pos = mouse_grid_pos
+                                success, msg = history.place(city, ui_manager.selected_building_type, mouse_grid_pos)
+                                recorder.place(ui_manager.selected_building_type, mouse_grid_pos)
+                                message_text = msg
+                                message_display_timer = MESSAGE_DURATION
+                                if success:
+                                    sound_manager.play("build_place")
+                                    # Optionally, keep selected_building_type to place multiple
+                                    # ui_manager.selected_building_type = None
+                                else:
+                                    sound_manager.play("error")
                             else:
+                                message_text = "Cannot build on UI panel area."
+                                message_display_timer = MESSAGE_DURATION
                                 sound_manager.play("error")
+                        else: # No menu, no building selected - potentially for selecting existing building later
+                            pass
+                    elif event.button == 3: # Right click - for cancelling placement or deleting
+                        if ui_manager.selected_building_type:
+                            ui_manager.selected_building_type = None # Cancel placement
+                            sound_manager.play("ui_click")
+                        else: # Try to remove building
+                            # Check if mouse is within the game grid area
+                            if over_map:
+                                success, msg = history.remove(city, mouse_grid_pos)
+                                recorder.remove(mouse_grid_pos)
+                                message_text = msg
+                                message_display_timer = MESSAGE_DURATION
+                                if success:
+                                    sound_manager.play("ui_click") # Or a dedicated "sell/destroy" sound
+                                else:
+                                    sound_manager.play("error")
 
+                if event.type == pg.MOUSEMOTION and drag_grid_pos is not None and ui_manager.selected_building_type:
+                    drag_pos = ui_manager.screen_to_grid(event.pos)
+                    if drag_pos != drag_grid_pos and event.pos[1] // TILE_SIZE < city.grid_height:
+                        drag_grid_pos = drag_pos
+                        success, _ = history.place(city, ui_manager.selected_building_type, drag_pos)
+                        recorder.place(ui_manager.selected_building_type, drag_pos)
+                        if success:
+                            sound_manager.play("build_place") # Voice-limited, so a fast drag stays one sound
 
-        # Game logic updates (once per second)
-        if game_tick_timer >= time_per_tick:
-            city.update_resources()
-            game_tick_timer -= time_per_tick # Reset timer for next tick
+                if event.type == pg.MOUSEBUTTONUP and event.button == 1 and drag_grid_pos is not None:
+                    history.end_batch()
+                    recorder.end_batch()
+                    drag_grid_pos = None
+
+
+        if spec_reloader is not None:
+            reload_result = spec_reloader.check(city)
+            if reload_result is not None:
+                message_text = reload_result[1]
+                message_display_timer = MESSAGE_DURATION
+
+        # Game logic updates: ticks owed at the current speed, batched and within the frame's budget
+        with profiler.section("update_resources"):
+            sim_clock.advance(city, dt, lambda count: recorder.tick(city, count))
+        ui_manager.sim_status = sim_clock.status_text()
+        for rank_up in rank_events.drain(): # Batched: at most the last rank reached this frame is shown
+            message_text = f"City rank up: {rank_up.name}!"
+            message_display_timer = MESSAGE_DURATION
+            sound_manager.play("ui_click")
 
         # Drawing
         screen.fill(BLACK)
@@ -164,9 +296,22 @@ def main():
                  text_rect = text_surf.get_rect(center=(SCREEN_WIDTH // 2, 30))
             screen.blit(text_surf, text_rect)
 
+        with profiler.section("draw_profiler"):
+            profiler.draw(screen, ui_manager.game_font)
+
+        with profiler.section("display_flip"):
+            pg.display.flip()
 
-        pg.display.flip()
+        if startup is not None: # Deferred startup work, once the first frame is visible
+            startup.mark("first frame")
+            load_sounds(sound_manager)
+            startup.mark("audio")
+            if STARTUP_REPORT:
+                print(startup.report())
+            startup = None
+        profiler.end_frame()
 
+    recorder.stop()
     pg.quit()
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+# Elite 1984 City Builder - Metrics History (ring buffers with downsampled tiers)
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from city_builder.city import City
+
+# Recorded values, one column each
+SERIES = ("credits", "population", "net_power", "ore")
+# (name, ticks per sample, samples kept). Coarser tiers keep the mean of each period, so memory
+# stays fixed however long the session runs: about 26 KB per series.
+METRIC_TIERS = (
+    ("tick", 1, 600), # Last 10 minutes at 1x
+    ("minute", 60, 1440), # Last day
+    ("hour", 3600, 1200), # Last 50 days
+)
+
+
+class MetricsTier:
+    """One resolution: a ring of per-period means, plus the running sum of the period in progress."""
+    def __init__(self, name: str, period: int, capacity: int, width: int):
+        self.name = name
+        self.period = period
+        self.capacity = capacity
+        self._data = np.zeros((capacity, width), dtype=np.float64)
+        self._index = 0
+        self.count = 0
+        self.version = 0 # Bumped per stored sample, so drawings can be cached against it
+        self._sum = np.zeros(width, dtype=np.float64)
+        self._pending = 0
+
+    def add(self, row: np.ndarray) -> None:
+        if self.period == 1:
+            self._store(row)
+            return
+        self._sum += row
+        self._pending += 1
+        if self._pending == self.period:
+            self._store(self._sum / self.period)
+            self._sum[:] = 0
+            self._pending = 0
+
+    def _store(self, row: np.ndarray) -> None:
+        self._data[self._index] = row
+        self._index = (self._index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.version += 1
+
+    def values(self, column: int) -> np.ndarray:
+        """The stored samples of one series, oldest first (a copy)."""
+        if self.count < self.capacity:
+            return self._data[:self.count, column].copy()
+        return np.concatenate((self._data[self._index:, column], self._data[:self._index, column]))
+
+    def clear(self) -> None:
+        self._data[:] = 0
+        self._index = 0
+        self.count = 0
+        self.version += 1
+        self._sum[:] = 0
+        self._pending = 0
+
+
+class MetricsHistory:
+    """
+    Records the city's key values every tick (attach it as `city.metrics`) into fixed-size NumPy
+    ring buffers at several resolutions: per tick, per minute and per hour of game time.
+    """
+    def __init__(self, tiers: Tuple[Tuple[str, int, int], ...] = METRIC_TIERS):
+        self._row = np.zeros(len(SERIES), dtype=np.float64)
+        self.tiers: Dict[str, MetricsTier] = {name: MetricsTier(name, period, capacity, len(SERIES))
+                                              for name, period, capacity in tiers}
+        self._tier_list = list(self.tiers.values())
+
+    def record(self, city: City) -> None:
+        """Appends one tick's values; called by City.advance_ticks."""
+        row = self._row
+        row[0] = city.credits
+        row[1] = city.population
+        row[2] = city.net_power
+        row[3] = city.ore
+        for tier in self._tier_list:
+            tier.add(row)
+
+    def series(self, name: str, tier: str = "tick") -> np.ndarray:
+        return self.tiers[tier].values(SERIES.index(name))
+
+    def polyline(self, name: str, tier: str, width: int, height: int) -> Tuple[List[Tuple[int, int]], float, float]:
+        """
+        Screen points for drawing a series scaled into a width x height box (origin top left),
+        with the series' (min, max). The newest sample is at the right edge.
+        """
+        values = self.series(name, tier)
+        if len(values) == 0:
+            return [], 0.0, 0.0
+        low, high = float(values.min()), float(values.max())
+        span = high - low if high > low else 1.0
+        capacity = self.tiers[tier].capacity
+        xs = width - 1 - (len(values) - 1 - np.arange(len(values))) * ((width - 1) / max(1, capacity - 1))
+        ys = (height - 1) - (values - low) * ((height - 1) / span)
+        return list(zip(xs.astype(int).tolist(), ys.astype(int).tolist())), low, high
+
+    def clear(self) -> None:
+        """Forgets all history, e.g. after loading a different city."""
+        for tier in self._tier_list:
+            tier.clear()
@@ -0,0 +1,81 @@
+# Elite 1984 City Builder - Minimap (per-tile type/state codes colorized for surfarray)
+
+from typing import List, Set
+
+import numpy as np
+
+from city_builder.buildings import Building
+from city_builder.build_menu import spec_category
+from city_builder.catalog import BuildingCatalog, get_catalog
+from city_builder.city import City
+
+EMPTY_COLOR = (18, 28, 18) # Tiles without terrain data
+OFFLINE_COLOR = (200, 30, 30)
+CATEGORY_COLORS = {"Power": (230, 200, 40), "Housing": (40, 200, 60), "Industry": (170, 120, 70), "Other": (60, 110, 230)}
+
+
+def tile_code(building: Building | None) -> int:
+    """0 for an empty tile, else 1 + 2 * type id, plus 1 if the building is offline."""
+    if building is None:
+        return 0
+    return 1 + 2 * building.type_id + (not building.is_operational)
+
+
+def code_colors(catalog: BuildingCatalog) -> np.ndarray:
+    """Lookup table from tile code to RGB: each type in its menu category's color, red when offline."""
+    lut = np.empty((1 + 2 * len(catalog.specs), 3), dtype=np.uint8)
+    lut[0] = EMPTY_COLOR # Replaced per tile by the terrain color
+    for type_id, spec in enumerate(catalog.specs):
+        lut[1 + 2 * type_id] = CATEGORY_COLORS[spec_category(spec)]
+        lut[2 + 2 * type_id] = OFFLINE_COLOR
+    return lut
+
+
+class Minimap:
+    """
+    One pixel per tile: a (width, height) array of tile codes mirroring City.grid, turned into
+    RGB through a lookup table. Building changes mark the rows (y) they cover as dirty, and
+    refresh() recomputes only those rows; the caller copies the same rows into its surface.
+    """
+    def __init__(self, city: City):
+        self.city = city
+        self.width = len(city.grid)
+        self.height = len(city.grid[0]) if self.width else 0
+        self.codes = np.zeros((self.width, self.height), dtype=np.uint16)
+        self.pixels = np.zeros((self.width, self.height, 3), dtype=np.uint8)
+        if city.terrain is not None:
+            self._background = city.terrain.colors()
+        else:
+            self._background = np.empty_like(self.pixels)
+            self._background[:] = EMPTY_COLOR
+        self._catalog = None
+        self._lut = None
+        self._dirty_rows: Set[int] = set(range(self.height)) # Everything, the first time
+
+    def mark_building(self, building: Building) -> None:
+        """Marks the rows under a building that was added, removed or switched on or off."""
+        pos_y, size_h = building.position[1], building.size[1]
+        self._dirty_rows.update(range(max(0, pos_y), min(self.height, pos_y + size_h)))
+
+    def mark_all(self) -> None:
+        self._dirty_rows.update(range(self.height))
+
+    def refresh(self) -> List[int]:
+        """Recomputes the dirty rows' codes and pixels; returns those rows (sorted) for the caller to copy."""
+        catalog = get_catalog()
+        if catalog is not self._catalog: # Type ids or specs changed: new colors for every tile
+            self._catalog, self._lut = catalog, code_colors(catalog)
+            self.mark_all()
+        if not self._dirty_rows:
+            return []
+        rows = sorted(self._dirty_rows)
+        self._dirty_rows.clear()
+        grid = self.city.grid
+        for y in rows:
+            self.codes[:, y] = [tile_code(column[y]) for column in grid]
+        codes = self.codes[:, rows]
+        pixels = self._lut[codes]
+        empty = codes == 0
+        pixels[empty] = self._background[:, rows][empty]
+        self.pixels[:, rows] = pixels
+        return rows
@@ -0,0 +1,97 @@
+# Elite 1984 City Builder - Heatmap Overlays (per-tile city state colorized for surfarray)
+
+from typing import Dict, NamedTuple, Tuple, Type
+
+import numpy as np
+
+from city_builder.buildings import Building
+from city_builder.city import City
+from city_builder.events import BuildingAdded, BuildingRemoved, BuildingStatsChanged, OperationalChanged
+
+OVERLAY_NAMES = ("power", "offline", "capacity", "value") # Cycled with H
+OVERLAY_LABELS = {"power": "Power balance", "offline": "Offline buildings", "capacity": "Population capacity",
+                  "value": "Building value"}
+_PLACEMENT = (BuildingAdded, BuildingRemoved, BuildingStatsChanged)
+# The change events that make each overlay stale; anything else leaves its cached image as it is
+OVERLAY_INVALIDATED_BY: Dict[str, Tuple[Type, ...]] = {
+    "power": _PLACEMENT,
+    "offline": _PLACEMENT + (OperationalChanged,),
+    "capacity": _PLACEMENT + (OperationalChanged,), # Offline habitats house nobody
+    "value": _PLACEMENT,
+}
+
+
+def _gradient(*stops: Tuple[int, int, int]) -> np.ndarray:
+    """256-entry RGB lookup table interpolated evenly between color stops."""
+    positions = np.linspace(0, 255, len(stops))
+    index = np.arange(256)
+    return np.stack([np.interp(index, positions, channel) for channel in zip(*stops)], axis=1).astype(np.uint8)
+
+
+SEQUENTIAL_LUT = _gradient((20, 30, 110), (40, 160, 170), (240, 220, 60)) # Low to high
+DIVERGING_LUT = _gradient((220, 40, 40), (90, 90, 90), (40, 210, 70)) # Negative, zero, positive
+OVERLAY_LUTS = {"power": DIVERGING_LUT, "offline": DIVERGING_LUT, "capacity": SEQUENTIAL_LUT, "value": SEQUENTIAL_LUT}
+
+
+def _tile_value(name: str, building: Building) -> int:
+    if name == "power":
+        return building.power_generation - building.power_consumption
+    if name == "offline":
+        return 1 if building.is_operational else -1
+    if name == "capacity":
+        return building.population_capacity if building.is_operational else 0
+    return building.value
+
+
+class OverlayImage(NamedTuple):
+    rgb: np.ndarray # (width, height, 3) uint8
+    covered: np.ndarray # (width, height) bool: tiles with a building (the rest stay transparent)
+    low: int
+    high: int
+
+
+def overlay_values(city: City, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-tile values for an overlay and the mask of built tiles, both (width, height) like City.grid."""
+    width, height = len(city.grid), len(city.grid[0])
+    values = np.zeros((width, height), dtype=np.int64)
+    covered = np.zeros((width, height), dtype=bool)
+    for building in city.buildings: # One slice assignment per footprint
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        values[pos_x:pos_x + size_w, pos_y:pos_y + size_h] = _tile_value(name, building)
+        covered[pos_x:pos_x + size_w, pos_y:pos_y + size_h] = True
+    return values, covered
+
+
+def render_overlay(city: City, name: str) -> OverlayImage:
+    """Colorizes an overlay's values through its lookup table: diverging around 0, or scaled to the maximum."""
+    values, covered = overlay_values(city, name)
+    lut = OVERLAY_LUTS[name]
+    low, high = (int(values[covered].min()), int(values[covered].max())) if covered.any() else (0, 0)
+    if lut is DIVERGING_LUT:
+        extent = max(abs(low), abs(high), 1)
+        index = 128 + values * 127 // extent
+    else:
+        index = values * 255 // max(high, 1)
+    return OverlayImage(lut[np.clip(index, 0, 255)], covered, low, high)
+
+
+class OverlayCache:
+    """
+    The latest image of each overlay. City change events drop only the overlays they affect
+    (see OVERLAY_INVALIDATED_BY), so showing an overlay re-renders it at most once per change.
+    """
+    def __init__(self, city: City):
+        self.city = city
+        self._images: Dict[str, OverlayImage] = {}
+
+    def handle(self, event) -> None:
+        for name, kinds in OVERLAY_INVALIDATED_BY.items():
+            if isinstance(event, kinds):
+                self._images.pop(name, None)
+
+    def image(self, name: str) -> OverlayImage:
+        image = self._images.get(name)
+        if image is None:
+            image = self._images[name] = render_overlay(self.city, name)
+        return image
@@ -0,0 +1,94 @@
+# Elite 1984 City Builder - Power Networks
+
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from city_builder.buildings import Building
+
+
+class PowerNetworks:
+    """
+    Tracks which buildings share a power network. Buildings are connected when their
+    footprints touch orthogonally; conduits are cheap 1x1 buildings used to bridge gaps.
+
+    Connectivity is a union-find over buildings, updated incrementally: placing a building
+    unions it with its neighbours, and removing one only re-labels the network it belonged to.
+    """
+    def __init__(self):
+        self._parent: Dict[Building, Building] = {}
+        self._members: Dict[Building, Dict[Building, None]] = {} # root -> ordered member set
+        # root -> (generation, consumption) of operational members, refreshed by the City each balance
+        self.stats: Dict[Building, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        """Number of separate networks."""
+        return len(self._members)
+
+    def find(self, building: Building) -> Building:
+        """Returns the root building identifying the network `building` belongs to."""
+        parent = self._parent
+        while parent[building] is not building:
+            parent[building] = parent[parent[building]] # Path halving
+            building = parent[building]
+        return building
+
+    def add(self, building: Building, neighbors: Iterable[Building]) -> None:
+        """Adds a newly placed building and joins it to the networks of its neighbours."""
+        self._parent[building] = building
+        self._members[building] = {building: None}
+        for neighbor in neighbors:
+            self._union(building, neighbor)
+
+    def _union(self, a: Building, b: Building) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a is root_b:
+            return
+        members_a, members_b = self._members[root_a], self._members[root_b]
+        if len(members_a) < len(members_b): # Union by size: merge the smaller set into the larger
+            root_a, root_b = root_b, root_a
+            members_a, members_b = members_b, members_a
+        self._parent[root_b] = root_a
+        members_a.update(members_b)
+        del self._members[root_b]
+
+    def remove(self, building: Building, neighbors_of: Callable[[Building], Iterable[Building]]) -> None:
+        """
+        Removes a building. Only the network it belonged to is re-labelled (by a search over that
+        network's members), since the removal may have split it in two or more.
+        `neighbors_of` must already exclude the removed building.
+        """
+        root = self.find(building)
+        remaining = self._members.pop(root)
+        del remaining[building]
+        del self._parent[building]
+        self.stats.pop(root, None)
+
+        while remaining:
+            start = next(iter(remaining))
+            component: Dict[Building, None] = {}
+            queue = deque([start])
+            del remaining[start]
+            while queue:
+                current = queue.popleft()
+                component[current] = None
+                self._parent[current] = start
+                for neighbor in neighbors_of(current):
+                    if neighbor in remaining:
+                        del remaining[neighbor]
+                        queue.append(neighbor)
+            self._members[start] = component
+
+    def networks(self) -> List[Dict[Building, None]]:
+        """Returns the member set of every network."""
+        return list(self._members.values())
+
+    def items(self) -> List[Tuple[Building, Dict[Building, None]]]:
+        """Returns (root, members) for every network."""
+        return list(self._members.items())
+
+    def members_of(self, building: Building) -> Dict[Building, None]:
+        return self._members[self.find(building)]
+
+    def balance_of(self, building: Building) -> Tuple[int, int]:
+        """(generation, consumption) of the operational buildings in `building`'s network."""
+        return self.stats.get(self.find(building), (0, 0))
@@ -0,0 +1,216 @@
+# Elite 1984 City Builder - What-if Previews (copy-on-write city forks)
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from city_builder.buildings import Building
+from city_builder.city import City
+from city_builder.config import GRID_WIDTH, GRID_HEIGHT, INITIAL_POWER
+
+
+class PowerProjection:
+    """Projected power totals, population capacity and shut-down buildings of a (forked) city."""
+    def __init__(self, generation: int, consumption: int, population_capacity: int, shed: Set[Building]):
+        self.generation = generation
+        self.consumption = consumption
+        self.population_capacity = population_capacity
+        self.shed = shed
+
+    @property
+    def net_power(self) -> int:
+        return self.generation - self.consumption
+
+
+class PlacementPreview:
+    """What placing one building would change, relative to the city as it is now."""
+    def __init__(self, possible: bool, message: str, cost: int = 0, net_power_delta: int = 0,
+                 capacity_delta: int = 0, newly_shed: List[Building] | None = None,
+                 newly_restored: List[Building] | None = None, projection: PowerProjection | None = None):
+        self.possible = possible
+        self.message = message
+        self.cost = cost
+        self.net_power_delta = net_power_delta
+        self.capacity_delta = capacity_delta
+        self.newly_shed = newly_shed or [] # Operational now, shut down after the placement
+        self.newly_restored = newly_restored or [] # Shut down now, back on after (e.g. a new generator)
+        self.projection = projection
+
+    def __str__(self) -> str:
+        if not self.possible:
+            return self.message
+        text = f"Power {self.net_power_delta:+d}  Pop cap {self.capacity_delta:+d}"
+        if self.newly_shed:
+            text += f"  Sheds {len(self.newly_shed)}"
+        return text
+
+
+class CityFork:
+    """
+    A what-if view of a City. Reads fall through to the parent's buildings and grid; the fork keeps
+    only its own additions, removals and the grid columns they touch (copied on first write). Power
+    is projected with City.plan_power, which decides shedding without touching any building, so
+    neither the parent nor its buildings change. A fork is a snapshot: discard it once the parent
+    changes.
+    """
+    def __init__(self, parent: City):
+        self.parent = parent
+        self.credits = parent.credits
+        self.added: List[Building] = []
+        self.removed: Dict[Building, None] = {} # Parent buildings hidden by this fork (ordered set)
+        self._columns: Dict[int, List[Building | None]] = {} # x -> this fork's copy of a grid column
+
+    @property
+    def buildings(self) -> List[Building]:
+        return [b for b in self.parent.buildings if b not in self.removed] + self.added
+
+    def building_at(self, position: Tuple[int, int]) -> Building | None:
+        pos_x, pos_y = position
+        if 0 <= pos_x < GRID_WIDTH and 0 <= pos_y < GRID_HEIGHT:
+            column = self._columns.get(pos_x)
+            if column is None:
+                column = self.parent.grid[pos_x]
+            return column[pos_y]
+        return None
+
+    def _fill(self, building: Building, value: Building | None) -> None:
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        for x in range(max(0, pos_x), min(GRID_WIDTH, pos_x + size_w)):
+            column = self._columns.get(x)
+            if column is None:
+                column = self._columns[x] = list(self.parent.grid[x]) # Copy on write
+            for y in range(max(0, pos_y), min(GRID_HEIGHT, pos_y + size_h)):
+                column[y] = value
+
+    def add_building(self, building_type: str, position: Tuple[int, int]) -> Tuple[bool, str]:
+        """Places a building in the fork only, with the same checks as City.add_building."""
+        try:
+            building = Building(building_type, position)
+        except ValueError as e:
+            return False, str(e)
+        if self.credits < building.cost:
+            return False, "Not enough credits."
+
+        pos_x, pos_y = position
+        size_w, size_h = building.size
+        if not (0 <= pos_x and 0 <= pos_y and pos_x + size_w <= GRID_WIDTH and pos_y + size_h <= GRID_HEIGHT):
+            return False, "Building out of bounds."
+        if self.parent.terrain is not None:
+            terrain_error = self.parent.terrain.placement_error(position, building.size, building.ore_production > 0)
+            if terrain_error:
+                return False, terrain_error
+        for x in range(pos_x, pos_x + size_w):
+            for y in range(pos_y, pos_y + size_h):
+                if self.building_at((x, y)) is not None:
+                    return False, "Space already occupied."
+
+        self.credits -= building.cost
+        self._fill(building, building)
+        self.added.append(building)
+        return True, f"{building.name} placed."
+
+    def remove_building(self, position: Tuple[int, int]) -> Tuple[bool, str]:
+        """Removes a building in the fork only, with the same refund as City.remove_building."""
+        building = self.building_at(position)
+        if building is None:
+            return False, "No building at that position."
+        self._fill(building, None)
+        if building in self.added:
+            self.added.remove(building)
+        else:
+            self.removed[building] = None
+        refund = City.refund_for(building)
+        self.credits += refund
+        return True, f"{building.name} removed. {refund} credits refunded."
+
+    def _neighbors(self, building: Building) -> Iterable[Building]:
+        pos_x, pos_y = building.position
+        size_w, size_h = building.size
+        edge_tiles = [(x, pos_y - 1) for x in range(pos_x, pos_x + size_w)]
+        edge_tiles += [(x, pos_y + size_h) for x in range(pos_x, pos_x + size_w)]
+        edge_tiles += [(pos_x - 1, y) for y in range(pos_y, pos_y + size_h)]
+        edge_tiles += [(pos_x + size_w, y) for y in range(pos_y, pos_y + size_h)]
+        found: Dict[Building, None] = {}
+        for tile in edge_tiles:
+            neighbor = self.building_at(tile)
+            if neighbor is not None:
+                found[neighbor] = None
+        return found
+
+    def project(self) -> PowerProjection:
+        """Power balance, capacity and shedding of the fork, as the parent's next recalculation would find them."""
+        parent = self.parent
+        if parent.power_networks is None:
+            buildings = self.buildings
+            generation, consumption, shed = City.plan_power(buildings, INITIAL_POWER + parent.power_import)
+            capacity = sum(b.population_capacity for b in buildings if b not in shed)
+            return PowerProjection(generation, consumption, capacity, shed)
+
+        # Network mode: only the networks touching a change are re-balanced; the rest keep the
+        # parent's balance and operational status
+        networks = parent.power_networks
+        touched: Dict[Building, None] = {}
+        for building in self.added:
+            touched.update(self._neighbors(building))
+        for building in self.removed:
+            touched[building] = None
+            touched.update(self._neighbors(building))
+        roots = {networks.find(b) for b in touched if b not in self.added}
+
+        generation, consumption = parent.total_power_generation, parent.total_power_consumption
+        capacity = parent.max_population_capacity
+        affected: Dict[Building, None] = {}
+        for root in roots:
+            root_gen, root_con = networks.stats.get(root, (0, 0))
+            generation -= root_gen
+            consumption -= root_con
+            for member in networks.members_of(root):
+                if member.is_operational:
+                    capacity -= member.population_capacity
+                if member not in self.removed:
+                    affected[member] = None
+        for building in self.added:
+            affected[building] = None
+
+        # Split the affected buildings into the fork's networks and balance each on its own
+        shed: Set[Building] = set()
+        unvisited = dict(affected)
+        while unvisited:
+            start = next(iter(unvisited))
+            del unvisited[start]
+            component = [start]
+            index = 0
+            while index < len(component):
+                for neighbor in self._neighbors(component[index]):
+                    if neighbor in unvisited:
+                        del unvisited[neighbor]
+                        component.append(neighbor)
+                index += 1
+            network_gen, network_con, network_shed = City.plan_power(component, 0, by_position=True)
+            generation += network_gen
+            consumption += network_con
+            capacity += sum(b.population_capacity for b in component if b not in network_shed)
+            shed |= network_shed
+        # Buildings outside the re-balanced networks keep their current status
+        shed |= {b for b in parent.index.offline() if b not in affected and b not in self.removed}
+        return PowerProjection(generation, consumption, capacity, shed)
+
+    def preview(self, possible: bool = True, message: str = "") -> PlacementPreview:
+        """Summarizes the fork's changes against the parent's current state."""
+        if not possible:
+            return PlacementPreview(False, message)
+        parent = self.parent
+        projection = self.project()
+        newly_shed = [b for b in parent.buildings
+                      if b.is_operational and b in projection.shed and b not in self.removed]
+        newly_restored = [b for b in parent.index.offline()
+                          if b not in projection.shed and b not in self.removed]
+        newly_shed += [b for b in self.added if b in projection.shed]
+        return PlacementPreview(
+            True, message,
+            cost=parent.credits - self.credits,
+            net_power_delta=projection.net_power - parent.net_power,
+            capacity_delta=projection.population_capacity - parent.max_population_capacity,
+            newly_shed=newly_shed,
+            newly_restored=newly_restored,
+            projection=projection,
+        )
@@ -0,0 +1,289 @@
+# Elite 1984 City Builder - Frame Profiler
+
+import csv
+import os
+import time
+from typing import Dict, List, Tuple
+
+import pygame as pg
+from city_builder.config import WHITE, GREEN, YELLOW, RED
+
+PROFILER_HISTORY = 240 # Frames kept per ring buffer (~4 seconds at 60 FPS)
+PROFILER_TRACE_DIR = "city_builder_profiles"
+FRAME_BUDGET_MS = 1000 / 60 # One frame at the 60 FPS cap
+STATS_REFRESH_FRAMES = 15 # Re-render the overlay text every N frames
+HISTOGRAM_BINS = 16
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of floats. Appending overwrites the oldest sample once full.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data: List[float] = [0.0] * capacity
+        self._index = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self) -> List[float]:
+        """Returns the stored samples, oldest first."""
+        if self.count < self.capacity:
+            return self._data[:self.count]
+        return self._data[self._index:] + self._data[:self._index]
+
+    def latest(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self._data[self._index - 1]
+
+    def percentiles(self, *ps: float) -> Tuple[float, ...]:
+        """Returns the requested percentiles (0-100) using nearest-rank on the buffered samples."""
+        if self.count == 0:
+            return tuple(0.0 for _ in ps)
+        ordered = sorted(self.values())
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(p / 100 * len(ordered)))] for p in ps)
+
+    def histogram(self, bins: int, upper: float) -> List[int]:
+        """Counts samples into `bins` equal buckets over [0, upper]; larger samples land in the last bucket."""
+        counts = [0] * bins
+        if upper <= 0:
+            return counts
+        scale = bins / upper
+        for value in self.values():
+            counts[min(bins - 1, int(value * scale))] += 1
+        return counts
+
+    def clear(self) -> None:
+        self._index = 0
+        self.count = 0
+
+
+class _Section:
+    """Context manager timing one named phase of the current frame."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: 'FrameProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        current = self.profiler._current
+        current[self.name] = current.get(self.name, 0.0) + elapsed_ms
+        return False
+
+
+class _NullSection:
+    """Stand-in used while the profiler is disabled so timing costs nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class StartupTimer:
+    """
+    Wall-clock milestones of the startup pipeline. Each mark() closes a phase that started at
+    the previous mark (or at `origin`), so the report reads e.g. imports, init, first frame.
+    """
+    def __init__(self, origin: float | None = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        self.marks.append((phase, time.perf_counter()))
+
+    def phases(self) -> List[Tuple[str, float]]:
+        """(phase, duration in ms) for every mark so far."""
+        result = []
+        previous = self.origin
+        for phase, at in self.marks:
+            result.append((phase, (at - previous) * 1000))
+            previous = at
+        return result
+
+    def since_origin_ms(self, phase: str) -> float | None:
+        for name, at in self.marks:
+            if name == phase:
+                return (at - self.origin) * 1000
+        return None
+
+    def report(self) -> str:
+        parts = [f"{phase} {ms:.1f} ms" for phase, ms in self.phases()]
+        total = (self.marks[-1][1] - self.origin) * 1000 if self.marks else 0.0
+        return f"Startup: {', '.join(parts)} (total {total:.1f} ms)"
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame (event handling, simulation, each UI draw stage, flip)
+    and keeps rolling per-phase samples in ring buffers for the overlay and CSV traces.
+    Nothing is recorded while the profiler is disabled.
+    """
+    def __init__(self, history: int = PROFILER_HISTORY):
+        self.enabled = False
+        self.history = history
+        self.frame_times = RingBuffer(history)
+        self.phases: Dict[str, RingBuffer] = {}
+        self.phase_order: List[str] = [] # First-seen order, used for display and CSV columns
+        self.frame_numbers = RingBuffer(history)
+        self.frame_count = 0
+
+        self._current: Dict[str, float] = {}
+        self._sections: Dict[str, _Section] = {}
+        self._frame_start = 0.0
+
+        self._overlay_lines: List[pg.Surface] = []
+        self._frames_since_refresh = STATS_REFRESH_FRAMES
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        if self.enabled:
+            self._frame_start = time.perf_counter() # Toggled mid-frame; time the rest of it
+        else:
+            self.reset()
+
+    def reset(self) -> None:
+        """Drops all recorded samples."""
+        self.frame_times.clear()
+        self.frame_numbers.clear()
+        for buffer in self.phases.values():
+            buffer.clear()
+        self._current.clear()
+        self._overlay_lines = []
+        self._frames_since_refresh = STATS_REFRESH_FRAMES
+
+    def section(self, name: str):
+        """Returns a context manager that adds the enclosed time to phase `name` for this frame."""
+        if not self.enabled:
+            return _NULL_SECTION
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _Section(self, name)
+        return section
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self._current.clear()
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """Commits the phase timings collected since begin_frame() into the ring buffers."""
+        if not self.enabled:
+            return
+        self.frame_count += 1
+        self.frame_times.append((time.perf_counter() - self._frame_start) * 1000)
+        self.frame_numbers.append(self.frame_count)
+        for name in self.phase_order:
+            self.phases[name].append(self._current.pop(name, 0.0))
+        for name, elapsed_ms in self._current.items(): # Phases seen for the first time
+            self.phase_order.append(name)
+            buffer = self.phases[name] = RingBuffer(self.history)
+            # Back-fill so every buffer stays aligned with frame_times
+            for _ in range(self.frame_times.count - 1):
+                buffer.append(0.0)
+            buffer.append(elapsed_ms)
+        self._current.clear()
+        self._frames_since_refresh += 1
+
+    def stats(self, name: str | None = None) -> Dict[str, float]:
+        """Returns p50/p95/p99/max in ms for a phase, or for the whole frame if name is None."""
+        buffer = self.frame_times if name is None else self.phases.get(name)
+        if buffer is None or buffer.count == 0:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p95, p99 = buffer.percentiles(50, 95, 99)
+        return {"p50": p50, "p95": p95, "p99": p99, "max": max(buffer.values())}
+
+    def export_csv(self, filepath: str | None = None) -> str | None:
+        """
+        Writes the buffered frames (one row per frame, one column per phase) to a CSV file.
+        Returns the path written, or None on failure.
+        """
+        if filepath is None:
+            filepath = os.path.join(PROFILER_TRACE_DIR, time.strftime("frame_trace_%Y%m%d_%H%M%S.csv"))
+        try:
+            directory = os.path.dirname(filepath)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            columns = [self.phases[name].values() for name in self.phase_order]
+            with open(filepath, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame", "frame_ms"] + [f"{name}_ms" for name in self.phase_order])
+                for row_index, (frame_number, frame_ms) in enumerate(zip(self.frame_numbers.values(), self.frame_times.values())):
+                    writer.writerow([int(frame_number), f"{frame_ms:.4f}"] + [f"{column[row_index]:.4f}" for column in columns])
+            return filepath
+        except OSError as e:
+            print(f"Error writing profiler trace to {filepath}: {e}")
+        return None
+
+    def _refresh_overlay_text(self, font: pg.font.Font) -> None:
+        frame = self.stats()
+        color = GREEN if frame["p95"] <= FRAME_BUDGET_MS else RED
+        lines = [(f"frame  p50 {frame['p50']:5.2f}  p95 {frame['p95']:5.2f}  p99 {frame['p99']:5.2f} ms", color)]
+        for name in self.phase_order:
+            s = self.stats(name)
+            lines.append((f"{name:<14} p50 {s['p50']:5.2f}  p95 {s['p95']:5.2f}  p99 {s['p99']:5.2f}", WHITE))
+        self._overlay_lines = [font.render(text, True, line_color) for text, line_color in lines]
+        self._frames_since_refresh = 0
+
+    def draw(self, screen: pg.Surface, font: pg.font.Font, topleft: Tuple[int, int] = (5, 5)) -> None:
+        """Draws the per-phase percentile table, a frame-time graph and a frame-time histogram."""
+        if not self.enabled:
+            return
+        if self._frames_since_refresh >= STATS_REFRESH_FRAMES or not self._overlay_lines:
+            self._refresh_overlay_text(font)
+
+        graph_w, graph_h = self.history, 60
+        line_h = font.get_linesize()
+        text_w = max((surf.get_width() for surf in self._overlay_lines), default=0)
+        panel = pg.Rect(topleft[0], topleft[1], max(text_w, graph_w * 2) + 10,
+                        len(self._overlay_lines) * line_h + graph_h + 15)
+
+        background = pg.Surface(panel.size, pg.SRCALPHA)
+        background.fill((0, 0, 0, 180))
+        screen.blit(background, panel.topleft)
+        pg.draw.rect(screen, WHITE, panel, 1)
+
+        y = panel.top + 5
+        for surf in self._overlay_lines:
+            screen.blit(surf, (panel.left + 5, y))
+            y += line_h
+
+        # Frame-time graph, scaled so the 60 FPS budget sits at mid height
+        graph = pg.Rect(panel.left + 5, y + 5, graph_w, graph_h)
+        scale = graph_h / (FRAME_BUDGET_MS * 2)
+        budget_y = graph.bottom - int(FRAME_BUDGET_MS * scale)
+        pg.draw.line(screen, YELLOW, (graph.left, budget_y), (graph.right, budget_y), 1)
+        samples = self.frame_times.values()
+        if len(samples) > 1:
+            points = [(graph.left + i, graph.bottom - min(graph_h, int(v * scale))) for i, v in enumerate(samples)]
+            pg.draw.lines(screen, GREEN, False, points, 1)
+        pg.draw.rect(screen, (80, 80, 80), graph, 1)
+
+        # Histogram of frame times over [0, 2 * budget]
+        hist = pg.Rect(graph.right + 5, graph.top, graph_w - 5, graph_h)
+        counts = self.frame_times.histogram(HISTOGRAM_BINS, FRAME_BUDGET_MS * 2)
+        peak = max(counts) or 1
+        bar_w = hist.width // HISTOGRAM_BINS
+        for i, count in enumerate(counts):
+            bar_h = int(count / peak * hist.height)
+            color = GREEN if (i + 1) * 2 <= HISTOGRAM_BINS else RED # Bars past the budget are red
+            pg.draw.rect(screen, color, (hist.left + i * bar_w, hist.bottom - bar_h, bar_w - 1, bar_h))
+        pg.draw.rect(screen, (80, 80, 80), hist, 1)
@@ -0,0 +1,317 @@
+# Elite 1984 City Builder - Regions (many cities ticked in parallel, trading between ticks)
+
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from city_builder.city import City
+from city_builder.config import INITIAL_POWER, REGION_ORE_PRICE, REGION_ORE_RESERVE, REGION_POWER_PRICE
+
+# Per-city state published after each step, one int64 row per city
+STATE_COLUMNS = ("credits", "population", "ore", "net_power", "power_balance", "unmet_power",
+                 "city_value", "tick_count")
+CREDITS, POPULATION, ORE, NET_POWER, POWER_BALANCE, UNMET_POWER, CITY_VALUE, TICK_COUNT = range(len(STATE_COLUMNS))
+# Settlement results applied by each city before its next step
+DELTA_COLUMNS = ("credits", "ore", "power_import")
+CREDITS_DELTA, ORE_DELTA, POWER_IMPORT = range(len(DELTA_COLUMNS))
+
+
+def _write_state(row: np.ndarray, city: City) -> None:
+    index = city.index
+    consumption = index.total("power_consumption")
+    # Own generation minus all demand, before any trade: spare power if positive, a shortfall if negative.
+    # Cities in power network mode balance each network on its own and ignore power_import, so
+    # they stay out of power trade (a balance of 0) rather than sell power they never give up.
+    balance = INITIAL_POWER + index.total("power_generation") - consumption if city.power_networks is None else 0
+    row[:] = (
+        city.credits, city.population, city.ore, city.net_power, balance,
+        consumption - index.total("power_consumption", operational_only=True), # Demand of shed buildings
+        city.city_value, city.tick_count,
+    )
+
+
+def _pro_rata(weights: np.ndarray, total: int) -> np.ndarray:
+    """
+    Splits the integer `total` in proportion to `weights` (no share exceeds its weight when
+    total <= weights.sum()). Leftover units go to the largest remainders, ties to the lowest index,
+    so the split is exact and deterministic.
+    """
+    shares = np.zeros_like(weights)
+    weight_sum = int(weights.sum())
+    if total <= 0 or weight_sum == 0:
+        return shares
+    scaled = weights * total
+    shares = scaled // weight_sum
+    leftover = total - int(shares.sum())
+    if leftover:
+        remainders = scaled - shares * weight_sum
+        order = np.lexsort((np.arange(len(weights)), -remainders))
+        shares[order[:leftover]] += 1
+    return shares
+
+
+def settle(state: np.ndarray, ticks: int = 1) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Resolves one round of trade between the cities in `state` (rows in STATE_COLUMNS order) for
+    the next `ticks` ticks. Spare power goes to cities short of it, and ore above
+    REGION_ORE_RESERVE goes to cities below it. Power is a flow, paid for every one of those
+    ticks; ore is a stock, moved once. Both are capped by what buyers can pay and split pro rata
+    over sellers and buyers.
+    Returns the per-city deltas (DELTA_COLUMNS) and the region-wide traded totals. Credits and
+    ore are conserved exactly; integer arithmetic keeps the result identical on every run.
+    """
+    deltas = np.zeros((len(state), len(DELTA_COLUMNS)), dtype=np.int64)
+    credits = np.maximum(state[:, CREDITS], 0)
+
+    # Power: a per-tick flow, re-decided every settlement from each city's own balance
+    balance = state[:, POWER_BALANCE]
+    power_supply = np.maximum(balance, 0)
+    power_demand = np.minimum(np.maximum(-balance, 0), credits // (REGION_POWER_PRICE * ticks))
+    power_traded = min(int(power_supply.sum()), int(power_demand.sum()))
+    exported = _pro_rata(power_supply, power_traded)
+    imported = _pro_rata(power_demand, power_traded)
+    deltas[:, POWER_IMPORT] = imported - exported
+    deltas[:, CREDITS_DELTA] = (exported - imported) * (REGION_POWER_PRICE * ticks)
+
+    # Ore: a stock, moved once; buyers spend what is left after paying for power
+    ore = state[:, ORE]
+    ore_supply = np.maximum(ore - REGION_ORE_RESERVE, 0)
+    budget = np.maximum(credits + deltas[:, CREDITS_DELTA], 0) // REGION_ORE_PRICE
+    ore_demand = np.minimum(np.maximum(REGION_ORE_RESERVE - ore, 0), budget)
+    ore_traded = min(int(ore_supply.sum()), int(ore_demand.sum()))
+    sold = _pro_rata(ore_supply, ore_traded)
+    bought = _pro_rata(ore_demand, ore_traded)
+    deltas[:, ORE_DELTA] = bought - sold
+    deltas[:, CREDITS_DELTA] += (sold - bought) * REGION_ORE_PRICE
+
+    return deltas, {"power": power_traded, "ore": ore_traded}
+
+
+class _Shard:
+    """The cities one worker owns, stepped against the shared state and delta arrays."""
+    def __init__(self, indices: List[int], city_data: List[Dict[str, Any]], state: np.ndarray, deltas: np.ndarray):
+        self.cities = {i: City.from_dict(data) for i, data in zip(indices, city_data)}
+        self.state = state
+        self.deltas = deltas
+        for i, city in self.cities.items():
+            _write_state(state[i], city)
+
+    def step(self, count: int) -> None:
+        state, deltas = self.state, self.deltas
+        for i, city in self.cities.items():
+            delta = deltas[i]
+            city.credits += int(delta[CREDITS_DELTA])
+            city.ore += int(delta[ORE_DELTA])
+            city.power_import = int(delta[POWER_IMPORT]) # A level, not a delta: kept until the next settlement
+            delta[CREDITS_DELTA] = delta[ORE_DELTA] = 0
+            city.advance_ticks(count)
+            _write_state(state[i], city)
+
+    def add_building(self, i: int, building_type: str, position: Tuple[int, int]) -> Tuple[bool, str]:
+        result = self.cities[i].add_building(building_type, position)
+        _write_state(self.state[i], self.cities[i])
+        return result
+
+    def to_dicts(self) -> Dict[int, Dict[str, Any]]:
+        return {i: city.to_dict() for i, city in self.cities.items()}
+
+
+def _attach(name: str, rows: int, columns: int) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray((rows, columns), dtype=np.int64, buffer=shm.buf)
+
+
+def _worker(conn, state_name: str, deltas_name: str, rows: int, indices: List[int],
+            city_data: List[Dict[str, Any]]) -> None:
+    """Worker process: owns a shard of cities and serves (command, args) requests from the Region."""
+    state_shm, state = _attach(state_name, rows, len(STATE_COLUMNS))
+    deltas_shm, deltas = _attach(deltas_name, rows, len(DELTA_COLUMNS))
+    shard = None
+    try:
+        try:
+            shard = _Shard(indices, city_data, state, deltas)
+        except Exception as e:
+            conn.send(e)
+            return
+        conn.send(None)
+        while True:
+            command, args = conn.recv()
+            if command == "stop":
+                break
+            try:
+                conn.send(getattr(shard, command)(*args))
+            except Exception as e: # Reported to the Region, which re-raises it
+                conn.send(e)
+    finally:
+        del shard, state, deltas # Views into the buffers must go before the segments are closed
+        state_shm.close()
+        deltas_shm.close()
+        conn.close()
+
+
+class Region:
+    """
+    A set of cities simulated side by side. Each step the Region settles trade between all cities
+    in one vectorized pass over the state rows they last published, for the ticks about to run,
+    and writes per-city deltas to shared memory. Every city then applies its deltas and advances
+    in a worker process (cities are split into contiguous shards, one per worker), publishing a
+    compact state row to shared memory.
+    A city's evolution depends only on its own state and its deltas, so results are identical
+    for any number of workers. workers=0 runs every city in this process.
+    """
+    def __init__(self, cities: List[City] | int, workers: int | None = None):
+        if isinstance(cities, int):
+            cities = [City() for _ in range(cities)]
+        if not cities:
+            raise ValueError("A region needs at least one city")
+        city_data = [city.to_dict() for city in cities]
+        self.size = len(cities)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, self.size)
+        self.trade_totals: Dict[str, int] = {"power": 0, "ore": 0} # Traded for the last step
+
+        self._shms: List[shared_memory.SharedMemory] = []
+        self._workers: List[Tuple[Any, Any, List[int]]] = [] # (process, connection, city indices)
+        self._local: _Shard | None = None
+        if workers <= 0:
+            self.state = np.zeros((self.size, len(STATE_COLUMNS)), dtype=np.int64)
+            self.deltas = np.zeros((self.size, len(DELTA_COLUMNS)), dtype=np.int64)
+            self._local = _Shard(list(range(self.size)), city_data, self.state, self.deltas)
+            return
+
+        self.state = self._shared_array(len(STATE_COLUMNS))
+        self.deltas = self._shared_array(len(DELTA_COLUMNS))
+        try:
+            for shard in np.array_split(np.arange(self.size), workers):
+                indices = shard.tolist()
+                parent_conn, child_conn = mp.Pipe()
+                process = mp.Process(target=_worker, daemon=True,
+                                     args=(child_conn, self._shms[0].name, self._shms[1].name, self.size,
+                                           indices, [city_data[i] for i in indices]))
+                process.start()
+                child_conn.close()
+                self._workers.append((process, parent_conn, indices))
+            for _, conn, _ in self._workers:
+                self._receive(conn) # Cities built and their first state rows written
+        except BaseException:
+            self.close()
+            raise
+
+    def _shared_array(self, columns: int) -> np.ndarray:
+        shm = shared_memory.SharedMemory(create=True, size=self.size * columns * 8)
+        self._shms.append(shm)
+        array = np.ndarray((self.size, columns), dtype=np.int64, buffer=shm.buf)
+        array[:] = 0
+        return array
+
+    @staticmethod
+    def _receive(conn) -> Any:
+        reply = conn.recv()
+        if isinstance(reply, Exception):
+            raise RuntimeError(f"Region worker failed: {reply!r}") from reply
+        return reply
+
+    def _owner(self, city_index: int):
+        for _, conn, indices in self._workers:
+            if indices[0] <= city_index <= indices[-1]:
+                return conn
+        raise IndexError(f"No city {city_index} in a region of {self.size}")
+
+    def step(self, count: int = 1) -> None:
+        """
+        Settles trade for the next `count` ticks, then advances every city that many ticks in
+        parallel. Power imported for the step is paid for each of its ticks, so step(n) and
+        run(n) cost the same at a steady power balance.
+        """
+        if count <= 0:
+            return
+        self.deltas[:], self.trade_totals = settle(self.state, count)
+        if self._local is not None:
+            self._local.step(count)
+        else:
+            for _, conn, _ in self._workers:
+                conn.send(("step", (count,)))
+            for _, conn, _ in self._workers:
+                self._receive(conn)
+
+    def run(self, ticks: int) -> None:
+        """Steps one tick at a time, settling trade before each."""
+        for _ in range(ticks):
+            self.step()
+
+    def column(self, name: str) -> np.ndarray:
+        """One STATE_COLUMNS value for every city, as of the last step (a copy)."""
+        return self.state[:, STATE_COLUMNS.index(name)].copy()
+
+    def add_building(self, city_index: int, building_type: str, position: Tuple[int, int]) -> Tuple[bool, str]:
+        """City.add_building() on one of the region's cities. Returns (success, message)."""
+        if self._local is not None:
+            if not 0 <= city_index < self.size:
+                raise IndexError(f"No city {city_index} in a region of {self.size}")
+            return self._local.add_building(city_index, building_type, position)
+        conn = self._owner(city_index)
+        conn.send(("add_building", (city_index, building_type, position)))
+        return self._receive(conn)
+
+    def city_dicts(self) -> List[Dict[str, Any]]:
+        """Every city's to_dict(), in region order (e.g. for saving or checksums)."""
+        if self._local is not None:
+            by_index = self._local.to_dicts()
+        else:
+            by_index = {}
+            for _, conn, _ in self._workers:
+                conn.send(("to_dicts", ()))
+            for _, conn, _ in self._workers:
+                by_index.update(self._receive(conn))
+        return [by_index[i] for i in range(self.size)]
+
+    def close(self) -> None:
+        """Stops the workers and frees the shared memory."""
+        for process, conn, _ in self._workers:
+            try:
+                conn.send(("stop", ()))
+            except OSError:
+                pass # Worker already gone
+        for process, conn, _ in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self._workers = []
+        if self._shms:
+            self.state = self.state.copy() # Keep the last state readable after the segments go
+            self.deltas = self.deltas.copy()
+            for shm in self._shms:
+                shm.close()
+                shm.unlink()
+            self._shms = []
+
+    def __enter__(self) -> 'Region':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Times a region from the command line:
+#   python -m city_builder.region <cities> <ticks> [workers]
+if __name__ == "__main__":
+    import sys
+    import time
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python -m city_builder.region <cities> <ticks> [workers]")
+        sys.exit(2)
+    region_size, region_ticks = int(sys.argv[1]), int(sys.argv[2])
+    region_workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    with Region(region_size, workers=region_workers) as bench_region:
+        for bench_city in range(region_size):
+            bench_region.add_building(bench_city, "SOLAR_PANEL" if bench_city % 2 else "HABITAT_SMALL", (0, 0))
+        bench_start = time.perf_counter()
+        bench_region.run(region_ticks)
+        bench_elapsed = time.perf_counter() - bench_start
+        print(f"{region_size} cities x {region_ticks} ticks in {bench_elapsed:.3f}s "
+              f"({region_size * region_ticks / bench_elapsed:.0f} city-ticks/s); last trade {bench_region.trade_totals}")
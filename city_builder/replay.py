@@ -0,0 +1,250 @@
+# Elite 1984 City Builder - Session Recording and Replay
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from city_builder.city import City
+from city_builder.undo import UndoHistory
+
+REPLAY_DIR = "city_builder_replays"
+REPLAY_FORMAT_VERSION = 2
+DEFAULT_CHECKPOINT_EVERY = 30 # Ticks between recorded state checksums
+
+# Command opcodes. Each record is a compact JSON array: [elapsed_ms, opcode, *args]
+OP_PLACE = "P"    # [ms, "P", building_type, x, y]
+OP_REMOVE = "R"   # [ms, "R", x, y]
+OP_SAVE = "S"     # [ms, "S"]
+OP_LOAD = "L"     # [ms, "L", city_dict]  (the loaded state is embedded, so replays need no save files)
+OP_TICK = "T"     # [ms, "T"] or [ms, "T", count] for a batch of ticks run with City.advance_ticks
+OP_CHECKPOINT = "C" # [ms, "C", tick_number, checksum]
+OP_UNDO = "U"     # [ms, "U"]
+OP_REDO = "Y"     # [ms, "Y"]
+OP_BATCH_BEGIN = "B" # [ms, "B"]  (commands up to the matching "E" undo as one unit)
+OP_BATCH_END = "E"   # [ms, "E"]
+
+
+def city_checksum(city: City) -> str:
+    """Returns a short digest of the city's saved state plus its derived totals."""
+    state = city.to_dict()
+    state["derived"] = [
+        city.net_power, city.total_power_generation, city.total_power_consumption,
+        city.max_population_capacity, city.city_value, city.current_rank_level,
+    ]
+    encoded = json.dumps(state, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def _open_replay(filepath: str, mode: str):
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, mode + "t", encoding="utf-8")
+    return open(filepath, mode, encoding="utf-8")
+
+
+class SessionRecorder:
+    """
+    Logs the player's commands (place, remove, save, load) and tick boundaries to a
+    JSON-lines file so the session can be replayed headlessly. Every method is a no-op
+    while not recording, so the game loop can call them unconditionally.
+    """
+    def __init__(self, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+        self.checkpoint_every = checkpoint_every
+        self.filepath: str | None = None
+        self.tick_count = 0
+        self._file = None
+        self._start_time = 0.0
+
+    @property
+    def is_recording(self) -> bool:
+        return self._file is not None
+
+    def start(self, city: City, filepath: str | None = None, history: UndoHistory | None = None) -> str | None:
+        """
+        Starts a recording from the city's current state. Pass the player's undo history so undos of
+        actions taken before recording started replay too. Returns the file path, or None on failure.
+        """
+        if self.is_recording:
+            self.stop()
+        if filepath is None:
+            filepath = os.path.join(REPLAY_DIR, time.strftime("session_%Y%m%d_%H%M%S.jsonl.gz"))
+        try:
+            directory = os.path.dirname(filepath)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._file = _open_replay(filepath, "w")
+        except OSError as e:
+            print(f"Error starting recording at {filepath}: {e}")
+            return None
+
+        self.filepath = filepath
+        self.tick_count = 0
+        self._start_time = time.perf_counter()
+        header = {
+            "version": REPLAY_FORMAT_VERSION,
+            "checkpoint_every": self.checkpoint_every,
+            "initial": city.to_dict(),
+            "initial_checksum": city_checksum(city),
+        }
+        if history is not None:
+            header["history"] = history.to_dict()
+        self._file.write(json.dumps(header, separators=(",", ":")) + "\n")
+        return filepath
+
+    def stop(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, opcode: str, *args: Any) -> None:
+        elapsed_ms = int((time.perf_counter() - self._start_time) * 1000)
+        self._file.write(json.dumps([elapsed_ms, opcode, *args], separators=(",", ":")) + "\n")
+
+    def place(self, building_type: str, position: Tuple[int, int]) -> None:
+        if self.is_recording:
+            self._write(OP_PLACE, building_type, position[0], position[1])
+
+    def remove(self, position: Tuple[int, int]) -> None:
+        if self.is_recording:
+            self._write(OP_REMOVE, position[0], position[1])
+
+    def save(self) -> None:
+        if self.is_recording:
+            self._write(OP_SAVE)
+
+    def undo(self) -> None:
+        if self.is_recording:
+            self._write(OP_UNDO)
+
+    def redo(self) -> None:
+        if self.is_recording:
+            self._write(OP_REDO)
+
+    def begin_batch(self) -> None:
+        if self.is_recording:
+            self._write(OP_BATCH_BEGIN)
+
+    def end_batch(self) -> None:
+        if self.is_recording:
+            self._write(OP_BATCH_END)
+
+    def load(self, city: City) -> None:
+        """Records a load; `city` is the freshly loaded city."""
+        if self.is_recording:
+            self._write(OP_LOAD, city.to_dict())
+
+    def tick(self, city: City, count: int = 1) -> None:
+        """
+        Records a tick boundary (after update_resources, or advance_ticks(count)) and a state
+        checksum whenever a checkpoint interval was reached.
+        """
+        if not self.is_recording:
+            return
+        previous = self.tick_count
+        self.tick_count += count
+        if count == 1:
+            self._write(OP_TICK)
+        else:
+            self._write(OP_TICK, count)
+        if self.checkpoint_every and self.tick_count // self.checkpoint_every > previous // self.checkpoint_every:
+            self._write(OP_CHECKPOINT, self.tick_count, city_checksum(city))
+
+
+class ReplayResult:
+    """Outcome of a replay: counts, checkpoint mismatches and the final city."""
+    def __init__(self, city: City):
+        self.city = city
+        self.ticks = 0
+        self.commands = 0
+        self.checkpoints_verified = 0
+        self.mismatches: List[Tuple[int, str, str]] = [] # (tick, expected, actual)
+        self.elapsed_seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    def __str__(self) -> str:
+        status = "OK" if self.ok else f"{len(self.mismatches)} checkpoint mismatch(es)"
+        rate = self.ticks / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+        return (f"{status}: {self.commands} commands, {self.ticks} ticks, "
+                f"{self.checkpoints_verified} checkpoints in {self.elapsed_seconds:.3f}s ({rate:.0f} ticks/s)")
+
+
+def replay_session(filepath: str, verify: bool = True) -> ReplayResult:
+    """
+    Re-runs a recorded session against a fresh City as fast as possible.
+    With verify=True each recorded checkpoint is compared to the replayed state's checksum.
+    Raises ValueError if the file is not a replay this version understands.
+    """
+    with _open_replay(filepath, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != REPLAY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported replay version: {header.get('version')}")
+        records = [json.loads(line) for line in f if line.strip()]
+
+    start = time.perf_counter()
+    city = City.from_dict(header["initial"])
+    result = ReplayResult(city)
+    # Places and removals go through it so recorded undos replay exactly, starting from the
+    # history the player had when recording started
+    history = UndoHistory.from_dict(header["history"]) if "history" in header else UndoHistory()
+    if verify and city_checksum(city) != header["initial_checksum"]:
+        result.mismatches.append((0, header["initial_checksum"], city_checksum(city)))
+
+    for record in records:
+        opcode = record[1]
+        if opcode == OP_TICK:
+            count = record[2] if len(record) > 2 else 1
+            city.advance_ticks(count)
+            result.ticks += count
+        elif opcode == OP_CHECKPOINT:
+            if verify:
+                actual = city_checksum(city)
+                if actual != record[3]:
+                    result.mismatches.append((record[2], record[3], actual))
+                result.checkpoints_verified += 1
+        elif opcode == OP_PLACE:
+            history.place(city, record[2], (record[3], record[4]))
+            result.commands += 1
+        elif opcode == OP_REMOVE:
+            history.remove(city, (record[2], record[3]))
+            result.commands += 1
+        elif opcode == OP_UNDO:
+            history.undo(city)
+            result.commands += 1
+        elif opcode == OP_REDO:
+            history.redo(city)
+            result.commands += 1
+        elif opcode == OP_BATCH_BEGIN:
+            history.begin_batch()
+        elif opcode == OP_BATCH_END:
+            history.end_batch()
+        elif opcode == OP_SAVE:
+            city.to_dict() # Reproduce the serialization cost without touching the save files
+            result.commands += 1
+        elif opcode == OP_LOAD:
+            city = City.from_dict(record[2])
+            history.clear()
+            result.commands += 1
+        else:
+            raise ValueError(f"Unknown replay opcode: {opcode!r}")
+
+    result.city = city
+    result.elapsed_seconds = time.perf_counter() - start
+    return result
+
+
+# Replays a recorded session: python -m city_builder.replay <file>
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m city_builder.replay <session.jsonl[.gz]>")
+        sys.exit(2)
+    replay_result = replay_session(sys.argv[1])
+    print(replay_result)
+    for tick, expected, actual in replay_result.mismatches:
+        print(f"  tick {tick}: expected {expected}, got {actual}")
+    sys.exit(0 if replay_result.ok else 1)
@@ -0,0 +1,75 @@
+# Elite 1984 City Builder - Event Scheduler
+
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Tuple
+
+from city_builder.buildings import Building
+
+# Event kinds
+PRODUCTION = "production" # Building yields its output (e.g. ore)
+UPKEEP = "upkeep"         # Building charges its maintenance cost
+
+
+class EventScheduler:
+    """
+    Min-heap of recurring building events keyed by the tick they are due.
+
+    Each tick only the due events are popped, so buildings with nothing scheduled cost nothing.
+    drain() also collapses a multi-tick gap into a single pop per event: the number of missed
+    occurrences is computed arithmetically and the event is pushed back once, costing O(log N).
+    Cancelled events are dropped lazily when they reach the top of the heap.
+    """
+    def __init__(self):
+        # Entries: [due_tick, sequence, kind, building, interval, token]; sequence keeps ordering stable
+        self._heap: List[list] = []
+        self._sequence = itertools.count()
+        self._tokens: Dict[Building, int] = {} # building -> token its live events carry
+        self._next_token = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, building: Building, kind: str, first_due: int, interval: int) -> None:
+        """Schedules a recurring event for `building`, first due at `first_due`, then every `interval` ticks."""
+        if interval < 1:
+            raise ValueError(f"Event interval must be at least one tick, got {interval}")
+        token = self._tokens.get(building)
+        if token is None:
+            token = self._tokens[building] = next(self._next_token)
+        heapq.heappush(self._heap, [first_due, next(self._sequence), kind, building, interval, token])
+
+    def cancel(self, building: Building) -> None:
+        """Cancels every pending event of `building`."""
+        self._tokens.pop(building, None)
+
+    def pending(self) -> List[Tuple[Building, str, int]]:
+        """(building, kind, next due tick) of every live event, in no particular order."""
+        tokens = self._tokens
+        return [(building, kind, due) for due, _, kind, building, _, token in self._heap if tokens.get(building) == token]
+
+    def next_due(self) -> int | None:
+        """Tick of the earliest live event, or None if nothing is scheduled."""
+        heap = self._heap
+        while heap and self._tokens.get(heap[0][3]) != heap[0][5]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def drain(self, tick: int) -> Iterator[Tuple[str, Building, int]]:
+        """
+        Yields (kind, building, occurrences) for every live event due at or before `tick`, where
+        occurrences counts how many times it fell due in the gap, and reschedules each past `tick`.
+        """
+        heap = self._heap
+        tokens = self._tokens
+        while heap and heap[0][0] <= tick:
+            entry = heap[0]
+            due, _, kind, building, interval, token = entry
+            if tokens.get(building) != token:
+                heapq.heappop(heap) # Cancelled
+                continue
+            occurrences = (tick - due) // interval + 1
+            entry[0] = due + occurrences * interval
+            entry[1] = next(self._sequence)
+            heapq.heapreplace(heap, entry)
+            yield kind, building, occurrences
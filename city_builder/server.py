@@ -0,0 +1,295 @@
+# Elite 1984 City Builder - Local Server (a City driven over JSON lines)
+
+import asyncio
+import json
+import os
+from typing import Any, Callable, Dict, Set, Tuple
+
+from city_builder.city import City, RESOURCE_FIELDS
+from city_builder.config import SERVER_HOST, SERVER_PORT, SERVER_TICK_MS, SERVER_MAX_LINE, SERVER_PUSH_BUFFER
+from city_builder.save_load import save_game, SAVE_GAME_FILENAME
+
+MAX_TICKS_PER_REQUEST = 100000 # Shared by all tick commands on one request line, so no batch stalls other clients
+
+
+class CommandError(ValueError):
+    """A malformed or unknown command; reported in its response rather than raised to the client."""
+
+
+def encode(message: Any) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def city_state(city: City) -> Dict[str, Any]:
+    """The city totals sent in query responses and tick updates."""
+    state = {name: getattr(city, name) for name in RESOURCE_FIELDS}
+    state["tick"] = city.tick_count
+    state["rank"] = city.current_rank_name
+    state["buildings"] = len(city.buildings)
+    return state
+
+
+def _int_arg(command: Dict[str, Any], name: str, default: int | None = None) -> int:
+    value = command.get(name, default)
+    if type(value) is not int: # bool is an int subclass, but never a valid coordinate or count
+        raise CommandError(f"'{name}' must be an integer.")
+    return value
+
+
+class _Client:
+    """
+    One connection. Tick updates go through a single pending slot: while the client's unsent
+    output is above SERVER_PUSH_BUFFER, newer updates replace the pending one instead of queueing,
+    so a slow reader gets the latest state and never holds up the simulation or other clients.
+    """
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.task = asyncio.current_task() # The connection's request loop
+        self.subscribed = False
+        self.coalesced = 0 # Updates replaced before they could be sent
+        self._pending: bytes | None = None
+        self._wake = asyncio.Event()
+
+    def push(self, line: bytes) -> None:
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = line
+        self._wake.set()
+
+    async def send_updates(self) -> None:
+        transport = self.writer.transport
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                line, self._pending = self._pending, None
+                if line is None:
+                    continue
+                self.writer.write(line)
+                if transport.get_write_buffer_size() > SERVER_PUSH_BUFFER:
+                    await self.writer.drain() # Meanwhile push() keeps only the newest update
+        except ConnectionError:
+            pass # The request loop notices the disconnect and cleans up
+
+
+class CityServer:
+    """
+    Hosts a City for bots, dashboards and tools on localhost or a Unix socket. Each request line
+    is one JSON command object, or a JSON array of them answered with one array (a batch).
+    Clients may pipeline requests; responses come back in request order and echo any "id".
+    The tick commands on one request line share a budget of MAX_TICKS_PER_REQUEST ticks.
+    Commands: place {type, x, y}, remove {x, y}, query {buildings?}, tick {count?}, save {filename?},
+    subscribe and unsubscribe. Subscribers get {"event": "tick", "state": ...} after every tick.
+
+    Everything runs on one event loop, so commands from all clients apply to the city one at a
+    time. A client that stops reading its responses stops being read from (the request loop
+    awaits drain()), and its tick updates are coalesced, so it can only slow itself down.
+    """
+    def __init__(self, city: City | None = None, tick_ms: int = SERVER_TICK_MS):
+        self.city = city if city is not None else City()
+        self.tick_ms = tick_ms
+        self._clients: Set[_Client] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._ticker: asyncio.Task | None = None
+        self._ticks_left = MAX_TICKS_PER_REQUEST # Tick budget of the request line being answered
+        self._commands: Dict[str, Callable[[_Client, Dict[str, Any]], Dict[str, Any]]] = {
+            "place": self._place, "remove": self._remove, "query": self._query, "tick": self._tick,
+            "save": self._save, "subscribe": self._subscribe, "unsubscribe": self._unsubscribe,
+        }
+
+    async def start(self, host: str = SERVER_HOST, port: int = SERVER_PORT, path: str | None = None) -> None:
+        """Listens on host:port (port 0 picks a free one, see address), or on a Unix socket at `path`."""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path, limit=SERVER_MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=SERVER_MAX_LINE)
+        if self.tick_ms > 0:
+            self._ticker = asyncio.create_task(self._tick_loop())
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+        self._server.close()
+        clients = list(self._clients)
+        for client in clients:
+            client.writer.transport.abort() # Drops unsent output, waking request loops blocked in drain()
+        await asyncio.gather(*(client.task for client in clients), return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _tick_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.tick_ms / 1000
+        next_tick = loop.time()
+        while True:
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.tick(1)
+
+    def tick(self, count: int = 1) -> None:
+        """Advances the city and pushes the new state to subscribers (encoded once for all of them)."""
+        self.city.advance_ticks(count)
+        subscribers = [client for client in self._clients if client.subscribed]
+        if subscribers:
+            line = encode({"event": "tick", "state": city_state(self.city)})
+            for client in subscribers:
+                client.push(line)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = _Client(writer)
+        self._clients.add(client)
+        sender = asyncio.create_task(client.send_updates())
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError: # Longer than SERVER_MAX_LINE; the stream cannot be resynchronized
+                    writer.write(encode({"ok": False, "error": "Request line too long."}))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(self.respond(client, line))
+                    await writer.drain() # Backpressure: a client not reading its responses is not read from
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    def respond(self, client: _Client, line: bytes) -> bytes:
+        """The response line for one request line."""
+        try:
+            request = json.loads(line)
+        except ValueError as e: # Malformed JSON or not UTF-8
+            return encode({"ok": False, "error": f"Invalid JSON: {e}"})
+        except RecursionError:
+            return encode({"ok": False, "error": "Invalid JSON: nested too deeply."})
+        self._ticks_left = MAX_TICKS_PER_REQUEST
+        try:
+            if isinstance(request, list):
+                return encode([self._execute(client, command) for command in request])
+            return encode(self._execute(client, request))
+        except RecursionError: # A nested "id" echoed back that is too deep to encode
+            return encode({"ok": False, "error": "Response nested too deeply."})
+
+    def _execute(self, client: _Client, command: Any) -> Dict[str, Any]:
+        try:
+            if not isinstance(command, dict):
+                raise CommandError("A command must be a JSON object.")
+            handler = self._commands.get(command.get("cmd"))
+            if handler is None:
+                raise CommandError(f"Unknown command: {command.get('cmd')!r}")
+            result = handler(client, command)
+        except CommandError as e:
+            result = {"ok": False, "error": str(e)}
+        if isinstance(command, dict) and "id" in command:
+            result["id"] = command["id"]
+        return result
+
+    def _place(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        building_type = command.get("type")
+        if not isinstance(building_type, str):
+            raise CommandError("'type' must be a building type name.")
+        success, msg = self.city.add_building(building_type, (_int_arg(command, "x"), _int_arg(command, "y")))
+        return {"ok": success, "msg": msg}
+
+    def _remove(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        success, msg = self.city.remove_building((_int_arg(command, "x"), _int_arg(command, "y")))
+        return {"ok": success, "msg": msg}
+
+    def _query(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"ok": True, "state": city_state(self.city)}
+        if command.get("buildings"):
+            result["buildings"] = [
+                {"id": b.building_id, "type": b.type, "x": b.position[0], "y": b.position[1],
+                 "operational": b.is_operational}
+                for b in self.city.buildings
+            ]
+        return result
+
+    def _tick(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        count = _int_arg(command, "count", 1)
+        if not 1 <= count <= MAX_TICKS_PER_REQUEST:
+            raise CommandError(f"'count' must be between 1 and {MAX_TICKS_PER_REQUEST}.")
+        if count > self._ticks_left:
+            raise CommandError(f"At most {MAX_TICKS_PER_REQUEST} ticks per request line; {self._ticks_left} left.")
+        self._ticks_left -= count
+        self.tick(count)
+        return {"ok": True, "tick": self.city.tick_count}
+
+    def _save(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        filename = command.get("filename", SAVE_GAME_FILENAME)
+        if not isinstance(filename, str) or not filename.endswith(".json") or os.path.basename(filename) != filename:
+            raise CommandError("'filename' must be a plain .json file name.")
+        if not save_game(self.city, filename):
+            return {"ok": False, "error": "Error saving game."}
+        return {"ok": True, "filename": filename}
+
+    def _subscribe(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        client.subscribed = True
+        return {"ok": True}
+
+    def _unsubscribe(self, client: _Client, command: Dict[str, Any]) -> Dict[str, Any]:
+        client.subscribed = False
+        return {"ok": True}
+
+
+def _parse_target(target: str) -> Tuple[str | None, int | None, str | None]:
+    """(host, port, path) from "host:port", ":port" or "unix:/path"; raises ValueError if malformed."""
+    if target.startswith("unix:"):
+        path = target[len("unix:"):]
+        if not path:
+            raise ValueError(f"Missing socket path: {target!r}")
+        return None, None, path
+    host, separator, port = target.rpartition(":")
+    if not separator or not port.isdigit() or not 0 <= int(port) <= 65535:
+        raise ValueError(f"Expected host:port, got {target!r}")
+    return host or SERVER_HOST, int(port), None
+
+
+async def _serve(target: str, tick_ms: int) -> None:
+    server = CityServer(tick_ms=tick_ms)
+    host, port, path = _parse_target(target)
+    if path is not None:
+        await server.start(path=path)
+    else:
+        await server.start(host, port)
+    print(f"Serving a city on {target} (tick every {tick_ms} ms)" if tick_ms else f"Serving a city on {target}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    import sys
+    usage = "Usage: python -m city_builder.server [host:port | unix:/path/to.sock] [tick_ms]"
+    if len(sys.argv) > 3:
+        print(usage)
+        sys.exit(2)
+    server_target = sys.argv[1] if len(sys.argv) > 1 else f"{SERVER_HOST}:{SERVER_PORT}"
+    server_tick_ms = sys.argv[2] if len(sys.argv) > 2 else str(SERVER_TICK_MS)
+    try:
+        _parse_target(server_target)
+        if not server_tick_ms.isdigit():
+            raise ValueError(f"tick_ms must be a non-negative integer, got {server_tick_ms!r}")
+    except ValueError as e:
+        print(f"{e}\n{usage}")
+        sys.exit(2)
+    server_tick_ms = int(server_tick_ms)
+    try:
+        asyncio.run(_serve(server_target, server_tick_ms))
+    except KeyboardInterrupt:
+        pass
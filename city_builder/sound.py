@@ -1,58 +1,196 @@
 # Elite 1984 City Builder - Sound Management
 
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
 import pygame as pg
 
+# Mixer settings; they only take effect if set before the mixer opens the audio device
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+SOUND_CHANNELS = 8 # Mixer channels reserved for sound effects
+DEFAULT_VOICE_LIMIT = 2 # Copies of one sound that may play at the same time
+DEFAULT_COOLDOWN_MS = 50 # Repeats of one sound within this window are coalesced into one play
+
+# Decoded sounds shared by every SoundManager, keyed by (absolute path, mixer format)
+_sound_cache: Dict[Tuple[str, tuple], pg.mixer.Sound] = {}
+_sound_cache_lock = threading.Lock()
+
+
+def _decode(filepath: str) -> pg.mixer.Sound:
+    """Returns the decoded sound for `filepath`, decoding it only the first time."""
+    key = (os.path.abspath(filepath), pg.mixer.get_init())
+    with _sound_cache_lock:
+        sound = _sound_cache.get(key)
+    if sound is None:
+        sound = pg.mixer.Sound(filepath)
+        with _sound_cache_lock:
+            sound = _sound_cache.setdefault(key, sound)
+    return sound
+
+
 class SoundManager:
-    def __init__(self):
+    """
+    Plays sound effects on a fixed pool of reserved mixer channels. Each sound has a voice limit
+    (copies playing at once) and a cooldown (repeats closer together are dropped), so bursts such
+    as drag-building cannot flood the mixer. Volume is applied per channel at play time, scaled by
+    the master volume. Sounds can be decoded on a background thread with preload().
+    """
+    def __init__(self, channels: int = SOUND_CHANNELS):
         self.sounds = {}
         self.is_muted = False
-        # It's good practice to initialize mixer with preferred settings
-        # pg.mixer.init(frequency=44100, size=-16, channels=2, buffer=512) # Example settings
+        self.audio_available = True # False once the mixer failed to open (e.g. no audio device)
+        self.master_volume = 1.0
+        self.voice_limits: Dict[str, int] = {}
+        self.cooldowns_ms: Dict[str, float] = {}
+        self.clock = time.monotonic # Seconds; replaceable for tests
+        self.dropped_plays = 0 # Plays skipped by voice limits or cooldowns
+
+        self._channel_count = channels
+        self._channels: List[pg.mixer.Channel] = []
+        self._channel_sounds: List[str | None] = [] # Sound last started on each pooled channel
+        self._channel_started: List[float] = []
+        self._channel_volumes: List[float] = [] # Requested volume, before the master volume
+        self._last_played: Dict[str, float] = {}
+        self._loader: threading.Thread | None = None
+
+    def init_mixer(self) -> bool:
+        """
+        Opens the audio device with the preferred settings and reserves the channel pool. Opening
+        the device can take a noticeable time, so the game calls this after its first frame rather
+        than at startup. Returns False (and leaves sound disabled) if no audio device is available.
+        """
+        if not pg.mixer.get_init():
+            pg.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+            try:
+                pg.mixer.init()
+            except pg.error as e:
+                print(f"Warning: Could not initialize audio, sound disabled: {e}")
+                self.audio_available = False
+                return False
+        if not self._channels:
+            pg.mixer.set_num_channels(max(pg.mixer.get_num_channels(), self._channel_count))
+            pg.mixer.set_reserved(self._channel_count) # Keep Sound.play() elsewhere off our channels
+            self._channels = [pg.mixer.Channel(i) for i in range(self._channel_count)]
+            self._channel_sounds = [None] * self._channel_count
+            self._channel_started = [0.0] * self._channel_count
+            self._channel_volumes = [1.0] * self._channel_count
+        return True
 
     def load_sound(self, name: str, filepath: str):
         """Loads a sound effect and stores it."""
-        if not pg.mixer.get_init(): # Initialize mixer if not already done
-            pg.mixer.init()
-            print("Pygame mixer initialized by SoundManager.")
+        if not self.audio_available or not self.init_mixer(): # Initialize mixer if not already done
+            self.sounds[name] = None
+            return
 
         try:
-            sound = pg.mixer.Sound(filepath)
-            self.sounds[name] = sound
-        except pg.error as e:
+            self.sounds[name] = _decode(filepath)
+        except (pg.error, OSError) as e: # A missing file raises FileNotFoundError, not pg.error
             print(f"Warning: Could not load sound '{name}' from '{filepath}': {e}")
             self.sounds[name] = None # Store None so we don't try to load it again
 
-    def play(self, name: str, loops: int = 0, volume: float = 1.0):
-        """Plays a loaded sound effect."""
-        if self.is_muted:
+    def preload(self, sound_files: Dict[str, str]) -> None:
+        """
+        Opens the mixer, then decodes `sound_files` ({name: path}) on a background thread. Each
+        sound becomes playable as soon as it is decoded; playing one that is not ready yet is a no-op.
+        """
+        if not self.audio_available or not self.init_mixer():
             return
+        for name in sound_files:
+            self.sounds.setdefault(name, None)
+
+        def load_all():
+            for name, filepath in sound_files.items():
+                self.load_sound(name, filepath)
+
+        self._loader = threading.Thread(target=load_all, name="sound-preload", daemon=True)
+        self._loader.start()
+
+    def is_loading(self) -> bool:
+        return self._loader is not None and self._loader.is_alive()
+
+    def wait_until_loaded(self, timeout: float | None = None) -> None:
+        if self._loader is not None:
+            self._loader.join(timeout)
+
+    def configure(self, name: str, voice_limit: int | None = None, cooldown_ms: float | None = None) -> None:
+        """Overrides the voice limit and/or cooldown of one sound."""
+        if voice_limit is not None:
+            self.voice_limits[name] = voice_limit
+        if cooldown_ms is not None:
+            self.cooldowns_ms[name] = cooldown_ms
+
+    def play(self, name: str, loops: int = 0, volume: float = 1.0) -> bool:
+        """
+        Plays a loaded sound effect on a pooled channel. Returns False if it was not played:
+        muted, not loaded (yet), within its cooldown or already at its voice limit.
+        """
+        if self.is_muted or not self._channels: # Muted, or audio not opened yet
+            return False
+
+        sound_to_play = self.sounds.get(name)
+        if sound_to_play is None:
+            if name not in self.sounds:
+                print(f"Warning: Sound '{name}' not loaded. Call load_sound first.")
+            # If self.sounds[name] is None, loading failed (warning already printed) or is in progress.
+            return False
+
+        now = self.clock()
+        cooldown = self.cooldowns_ms.get(name, DEFAULT_COOLDOWN_MS) / 1000
+        if now - self._last_played.get(name, -cooldown) < cooldown:
+            self.dropped_plays += 1 # Coalesced with the previous play
+            return False
+
+        # Pick a free channel, counting the voices this sound already has; steal the oldest otherwise
+        voices = 0
+        free = None
+        oldest = 0
+        for i, channel in enumerate(self._channels):
+            if channel.get_busy():
+                if self._channel_sounds[i] == name:
+                    voices += 1
+                if self._channel_started[i] < self._channel_started[oldest]:
+                    oldest = i
+            elif free is None:
+                free = i
+        if voices >= self.voice_limits.get(name, DEFAULT_VOICE_LIMIT):
+            self.dropped_plays += 1
+            return False
+        index = free if free is not None else oldest
 
-        if name in self.sounds and self.sounds[name] is not None:
-            sound_to_play = self.sounds[name]
-            sound_to_play.set_volume(volume)
-            sound_to_play.play(loops=loops)
-        elif name not in self.sounds:
-            print(f"Warning: Sound '{name}' not loaded. Call load_sound first.")
-        # If self.sounds[name] is None, it means loading failed, warning already printed.
+        channel = self._channels[index]
+        channel.play(sound_to_play, loops=loops)
+        channel.set_volume(max(0.0, min(1.0, volume * self.master_volume)))
+        self._channel_volumes[index] = volume
+        self._channel_sounds[index] = name
+        self._channel_started[index] = now
+        self._last_played[name] = now
+        return True
 
     def toggle_mute(self):
         """Toggles sound playback on/off."""
         self.is_muted = not self.is_muted
         if self.is_muted:
-            pg.mixer.stop() # Stop all currently playing sounds
+            if pg.mixer.get_init():
+                pg.mixer.stop() # Stop all currently playing sounds
             print("Sound muted.")
         else:
             print("Sound unmuted.")
 
     def set_master_volume(self, master_volume: float):
         """
-        Sets a master volume for all sounds.
-        Note: Pygame's mixer doesn't have a direct master volume for Sound objects after they are played.
-        This method is a placeholder or would require adjusting individual sound plays.
-        A common approach is to store the master volume and apply it when self.play() is called.
-        For now, this is a conceptual placeholder.
+        Sets a master volume (0.0 to 1.0) for all sounds. It scales the volume of each play, and
+        sounds already playing are adjusted immediately.
         """
-        print(f"Master volume conceptually set to {master_volume}. Individual sound volumes are set at play time.")
+        self.master_volume = max(0.0, min(1.0, master_volume))
+        for channel, volume in zip(self._channels, self._channel_volumes):
+            if channel.get_busy():
+                channel.set_volume(max(0.0, min(1.0, volume * self.master_volume)))
 
 
 # Example usage (requires actual sound files in an 'assets/sounds' directory for testing)
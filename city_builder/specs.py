@@ -0,0 +1,164 @@
+# Elite 1984 City Builder - Building and Rank Definitions (data files)
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Tuple
+
+try:
+    import tomllib # Python 3.11+; TOML definition files are skipped without it
+except ImportError:
+    tomllib = None
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+RANKS_FILE = "ranks.json"
+BUILDING_FILE_PREFIX = "buildings" # buildings.json, buildings_industry.toml, ...
+CACHE_FILE = ".spec_cache.pickle"
+CACHE_FORMAT = 2 # Bump when the cached structure or the validation rules change
+
+REQUIRED_SPEC_KEYS = ("name", "cost", "size", "char", "unlock_rank", "value")
+# Optional integer stats and their defaults
+OPTIONAL_SPEC_STATS = {
+    "power_gen": 0,
+    "power_con": 0,
+    "population_cap": 0,
+    "ore_prod": 0,
+    "pollution": 0,
+    "production_interval": 1,
+    "upkeep": 0,
+    "upkeep_interval": 1,
+}
+
+
+class SpecError(ValueError):
+    """Raised when building specs or city ranks fail validation."""
+
+
+def validate_building_spec(type_name: str, spec: Dict[str, Any]) -> None:
+    if not isinstance(spec, dict):
+        raise SpecError(f"Building spec {type_name} must be a table, got {type(spec).__name__}")
+    missing = [key for key in REQUIRED_SPEC_KEYS if key not in spec]
+    if missing:
+        raise SpecError(f"Building spec {type_name} is missing {', '.join(missing)}")
+    for key in ("cost", "unlock_rank", "value") + tuple(k for k in OPTIONAL_SPEC_STATS if k in spec):
+        if not isinstance(spec[key], int) or isinstance(spec[key], bool):
+            raise SpecError(f"Building spec {type_name}: {key} must be an int, got {spec[key]!r}")
+    for key in ("name", "char"):
+        if not isinstance(spec[key], str):
+            raise SpecError(f"Building spec {type_name}: {key} must be a string, got {spec[key]!r}")
+    size = spec["size"]
+    if (not isinstance(size, (list, tuple)) or len(size) != 2 or
+            not all(isinstance(n, int) and not isinstance(n, bool) and n > 0 for n in size)):
+        raise SpecError(f"Building spec {type_name}: size must be two positive ints, got {size!r}")
+    for key in ("production_interval", "upkeep_interval"):
+        if spec.get(key, 1) < 1:
+            raise SpecError(f"Building spec {type_name}: {key} must be at least 1")
+
+
+def validate_ranks(city_ranks: Dict[int, Dict[str, Any]]) -> None:
+    if not city_ranks:
+        raise SpecError("At least one city rank is required")
+    thresholds = []
+    if not all(isinstance(level, int) for level in city_ranks):
+        raise SpecError(f"Rank levels must be ints, got {sorted(map(repr, city_ranks))}")
+    for level in sorted(city_ranks):
+        rank = city_ranks[level]
+        if not isinstance(rank, dict) or "name" not in rank or not isinstance(rank.get("value_needed"), int):
+            raise SpecError(f"Rank {level!r} needs an int level, a name and an int value_needed")
+        thresholds.append(rank["value_needed"])
+    if thresholds != sorted(thresholds):
+        raise SpecError("Rank value_needed thresholds must not decrease as rank level increases")
+
+
+def source_files(data_dir: str) -> List[str]:
+    """The definition files in load order: ranks first, then building files by name."""
+    extensions = (".json", ".toml") if tomllib else (".json",)
+    names = sorted(name for name in os.listdir(data_dir)
+                   if name.startswith(BUILDING_FILE_PREFIX) and name.endswith(extensions))
+    return [RANKS_FILE] + names
+
+
+def _parse(name: str, raw: bytes) -> Dict[str, Any]:
+    try:
+        if name.endswith(".toml"):
+            return tomllib.loads(raw.decode("utf-8"))
+        return json.loads(raw)
+    except ValueError as e: # JSONDecodeError and TOMLDecodeError are both ValueErrors
+        raise SpecError(f"{name}: {e}") from e
+
+
+def parse_sources(sources: List[Tuple[str, bytes]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+    """Parses and validates (file name, contents) pairs into BUILDING_SPECS / CITY_RANKS tables."""
+    building_specs: Dict[str, Dict[str, Any]] = {}
+    city_ranks: Dict[int, Dict[str, Any]] = {}
+    known_keys = set(REQUIRED_SPEC_KEYS) | set(OPTIONAL_SPEC_STATS)
+    for name, raw in sources:
+        table = _parse(name, raw)
+        if not isinstance(table, dict):
+            raise SpecError(f"{name}: the top level must be a table keyed by "
+                            f"{'rank level' if name == RANKS_FILE else 'building type'}, got {type(table).__name__}")
+        if name == RANKS_FILE:
+            for level, rank in table.items():
+                if not isinstance(rank, dict):
+                    raise SpecError(f"{name}: rank {level!r} must be a table, got {type(rank).__name__}")
+                try:
+                    city_ranks[int(level)] = dict(rank)
+                except ValueError:
+                    raise SpecError(f"{name}: rank level {level!r} is not an integer") from None
+            continue
+        for type_name, spec in table.items():
+            if type_name in building_specs:
+                raise SpecError(f"{name}: building type {type_name} is already defined")
+            if not isinstance(spec, dict):
+                raise SpecError(f"{name}: building spec {type_name} must be a table, got {type(spec).__name__}")
+            unknown = sorted(set(spec) - known_keys)
+            if unknown:
+                raise SpecError(f"{name}: building spec {type_name} has unknown keys {', '.join(unknown)}")
+            spec = dict(spec)
+            try:
+                validate_building_spec(type_name, spec)
+            except SpecError as e:
+                raise SpecError(f"{name}: {e}") from None
+            spec["size"] = tuple(spec["size"])
+            building_specs[type_name] = spec
+    validate_ranks(city_ranks)
+    return building_specs, city_ranks
+
+
+def load_specs(data_dir: str = DATA_DIR, use_cache: bool = True) -> Tuple[Dict[str, Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+    """
+    Loads the building and rank tables from `data_dir`. Parsed, validated tables are pickled
+    next to the sources, keyed by a hash of every source file, so an unchanged data directory
+    only costs reading and hashing the files.
+    """
+    sources = []
+    digest = hashlib.blake2b(str(CACHE_FORMAT).encode(), digest_size=16)
+    for name in source_files(data_dir):
+        with open(os.path.join(data_dir, name), 'rb') as f:
+            raw = f.read()
+        sources.append((name, raw))
+        digest.update(name.encode() + b"\0" + hashlib.blake2b(raw, digest_size=16).digest())
+    key = digest.hexdigest()
+
+    cache_path = os.path.join(data_dir, CACHE_FILE)
+    if use_cache:
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get("key") == key:
+                return cached["building_specs"], cached["city_ranks"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            pass # Missing or unreadable cache: rebuild it
+
+    building_specs, city_ranks = parse_sources(sources)
+    if use_cache:
+        try:
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"key": key, "building_specs": building_specs, "city_ranks": city_ranks}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e: # E.g. a read-only install; loading still works, just uncached
+            print(f"Could not write spec cache {cache_path}: {e}")
+    return building_specs, city_ranks
@@ -0,0 +1,105 @@
+# Elite 1984 City Builder - Simulation Speed Control
+
+import time
+from typing import Callable, List, Tuple
+
+from city_builder.city import City
+
+# (label, ticks per second of game time at 1 tick/s); None runs as many ticks as the budget allows
+SPEED_MODES: List[Tuple[str, int | None]] = [
+    ("Paused", 0),
+    ("1x", 1),
+    ("4x", 4),
+    ("16x", 16),
+    ("Max", None),
+]
+DEFAULT_SPEED_MODE = 1
+SIM_BUDGET_MS = 8.0 # Simulation time allowed per frame; the rest of the frame belongs to input and drawing
+MAX_BACKLOG_SECONDS = 1.0 # Ticks owed beyond this much game time are dropped instead of caught up
+RATE_WINDOW_SECONDS = 1.0 # Window over which the achieved ticks/s is measured
+
+
+class SimulationClock:
+    """
+    Turns frame time into simulation ticks for the selected speed mode. Owed ticks are run in
+    batches with City.advance_ticks, sized from the measured cost per tick so one frame never
+    spends much more than `budget_ms` simulating; ticks that do not fit carry over to later frames.
+    """
+    def __init__(self, time_per_tick_ms: float = 1000, budget_ms: float = SIM_BUDGET_MS,
+                 mode: int = DEFAULT_SPEED_MODE):
+        self.time_per_tick_ms = time_per_tick_ms
+        self.budget_ms = budget_ms
+        self.mode = mode
+        self._resume_mode = mode if SPEED_MODES[mode][1] != 0 else DEFAULT_SPEED_MODE
+        self.backlog = 0.0 # Ticks owed (fractional)
+        self.tick_cost_ms = 0.05 # Running estimate of one tick's cost, refined as batches run
+        self.achieved_rate = 0.0 # Ticks per second, measured over RATE_WINDOW_SECONDS
+        self._window_start = time.perf_counter()
+        self._window_ticks = 0
+
+    @property
+    def label(self) -> str:
+        return SPEED_MODES[self.mode][0]
+
+    @property
+    def target_rate(self) -> float | None:
+        """Ticks per second the mode asks for; None for max speed."""
+        multiplier = SPEED_MODES[self.mode][1]
+        if multiplier is None:
+            return None
+        return multiplier * 1000 / self.time_per_tick_ms
+
+    def set_mode(self, mode: int) -> None:
+        self.mode = max(0, min(len(SPEED_MODES) - 1, mode))
+        if SPEED_MODES[self.mode][1] != 0:
+            self._resume_mode = self.mode
+        self.backlog = 0.0
+
+    def toggle_pause(self) -> None:
+        """Pauses, or resumes at the speed used before pausing."""
+        self.set_mode(self._resume_mode if SPEED_MODES[self.mode][1] == 0 else 0)
+
+    def advance(self, city: City, dt_ms: float, on_batch: Callable[[int], None] | None = None) -> int:
+        """
+        Runs the ticks owed for `dt_ms` of frame time (as many as fit in the budget at max speed).
+        `on_batch(count)` is called after each advance_ticks batch, e.g. to record it.
+        Returns the number of ticks run this frame.
+        """
+        target = self.target_rate
+        if target is None:
+            owed = float("inf")
+        else:
+            self.backlog = min(self.backlog + dt_ms / 1000 * target, max(1.0, target * MAX_BACKLOG_SECONDS))
+            owed = self.backlog
+
+        ran = 0
+        start = time.perf_counter()
+        while owed >= 1:
+            spent_ms = (time.perf_counter() - start) * 1000
+            remaining_ms = self.budget_ms - spent_ms
+            if remaining_ms <= 0 and ran:
+                break # Out of budget: the rest carries over
+            batch = int(min(owed, max(1, remaining_ms / self.tick_cost_ms)))
+            batch_start = time.perf_counter()
+            city.advance_ticks(batch)
+            batch_ms = (time.perf_counter() - batch_start) * 1000
+            self.tick_cost_ms = 0.7 * self.tick_cost_ms + 0.3 * (batch_ms / batch) # Smoothed per-tick cost
+            if on_batch is not None:
+                on_batch(batch)
+            ran += batch
+            owed -= batch
+        if target is not None:
+            self.backlog -= ran
+
+        self._window_ticks += ran
+        now = time.perf_counter()
+        if now - self._window_start >= RATE_WINDOW_SECONDS:
+            self.achieved_rate = self._window_ticks / (now - self._window_start)
+            self._window_start = now
+            self._window_ticks = 0
+        return ran
+
+    def status_text(self) -> str:
+        target = self.target_rate
+        target_text = "max" if target is None else f"{target:.1f}"
+        return f"Speed {self.label}: {self.achieved_rate:.1f}/{target_text} ticks/s"
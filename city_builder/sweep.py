@@ -0,0 +1,237 @@
+# Elite 1984 City Builder - Balancing Sweeps
+
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+from city_builder import config
+from city_builder.catalog import compile_catalog
+from city_builder.city import City
+
+SWEEP_DIR = "city_builder_sweeps"
+DEFAULT_CHUNK_SIZE = 16 # Runs per worker task; amortizes process-pool overhead
+
+# Scenario used when none is given: a small build order played for 10 minutes of game time
+DEFAULT_SCENARIO: Dict[str, Any] = {
+    "name": "starter",
+    "ticks": 600,
+    "builds": [ # [tick, building_type, x, y]
+        [0, "SOLAR_PANEL", 0, 0],
+        [0, "HABITAT_SMALL", 1, 0],
+        [0, "HABITAT_SMALL", 3, 0],
+        [30, "SOLAR_PANEL", 5, 0],
+        [60, "HABITAT_SMALL", 6, 0],
+        [120, "ORE_MINE_BASIC", 8, 0],
+        [180, "HABITAT_SMALL", 10, 0],
+        [240, "SOLAR_PANEL", 12, 0],
+        [300, "HABITAT_SMALL", 13, 0],
+    ],
+}
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Expands {"key": [values...]} into the list of every combination (Cartesian product)."""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+@contextmanager
+def applied_overrides(overrides: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Temporarily applies spec overrides to the config tables, restoring them on exit.
+    Keys are dotted paths: "BUILDING_SPECS.<type>.<field>" or "CITY_RANKS.<level>.<field>".
+    Keys without a dot are City attributes (e.g. "population_growth_rate") and are
+    yielded back for the caller to set on its City.
+    """
+    missing = object()
+    previous = []
+    city_attributes = {}
+    try:
+        for key, value in overrides.items():
+            if "." not in key:
+                city_attributes[key] = value
+                continue
+            table_name, entry, field = key.split(".", 2)
+            if table_name == "BUILDING_SPECS":
+                target = config.BUILDING_SPECS[entry]
+            elif table_name == "CITY_RANKS":
+                target = config.CITY_RANKS[int(entry)]
+            else:
+                raise ValueError(f"Unknown override table: {table_name}")
+            previous.append((target, field, target.get(field, missing)))
+            target[field] = value
+        if previous:
+            compile_catalog()
+        yield city_attributes
+    finally:
+        for target, field, old_value in reversed(previous):
+            if old_value is missing:
+                del target[field]
+            else:
+                target[field] = old_value
+        if previous:
+            compile_catalog()
+
+
+def simulate(scenario: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Plays a scenario headlessly with the given overrides and returns a flat summary:
+    first tick each rank was reached, ticks spent in a power deficit, failed builds and final totals.
+    """
+    with applied_overrides(overrides) as city_attributes:
+        city = City()
+        for attribute, value in city_attributes.items():
+            if not hasattr(city, attribute):
+                raise ValueError(f"Unknown City attribute override: {attribute}")
+            setattr(city, attribute, value)
+
+        builds = sorted(scenario["builds"], key=lambda build: build[0])
+        time_to_rank = {level: None for level in config.CITY_RANKS}
+        power_deficit_ticks = 0
+        failed_builds = 0
+        build_index = 0
+
+        for tick in range(scenario["ticks"]):
+            while build_index < len(builds) and builds[build_index][0] <= tick:
+                _, building_type, x, y = builds[build_index]
+                success, _ = city.add_building(building_type, (x, y))
+                if not success:
+                    failed_builds += 1
+                build_index += 1
+
+            city.update_resources()
+            if city.index.count(operational=False): # Something was shed this tick
+                power_deficit_ticks += 1
+            for level in range(city.current_rank_level + 1):
+                if time_to_rank.get(level, 0) is None:
+                    time_to_rank[level] = tick
+
+    summary = dict(overrides)
+    summary.update({
+        "ticks": scenario["ticks"],
+        "power_deficit_ticks": power_deficit_ticks,
+        "failed_builds": failed_builds,
+        "final_rank": city.current_rank_level,
+        "final_credits": city.credits,
+        "final_population": city.population,
+        "final_ore": city.ore,
+        "final_value": city.city_value,
+    })
+    for level, tick in time_to_rank.items():
+        summary[f"time_to_rank_{level}"] = tick
+    return summary
+
+
+def _simulate_chunk(scenario: Dict[str, Any], chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [simulate(scenario, overrides) for overrides in chunk]
+
+
+class SweepAggregate:
+    """
+    Running statistics over completed runs, grouped by each override value, so partial
+    results are meaningful while the sweep is still going.
+    """
+    def __init__(self, target_rank: int):
+        self.target_rank = target_rank
+        self.runs = 0
+        # (key, value as canonical JSON) -> [runs, runs reaching target rank, sum of time-to-rank, sum of deficit ticks];
+        # JSON text, because grid values may be lists or objects, which cannot be dict keys
+        self.groups: Dict[Tuple[str, str], List[float]] = {}
+        self._values: Dict[Tuple[str, str], Any] = {} # The override value each group stands for
+
+    def add(self, summary: Dict[str, Any], override_keys: List[str]) -> None:
+        self.runs += 1
+        reached = summary.get(f"time_to_rank_{self.target_rank}")
+        for key in override_keys:
+            group_key = (key, json.dumps(summary[key], sort_keys=True))
+            group = self.groups.get(group_key)
+            if group is None:
+                group = self.groups[group_key] = [0, 0, 0.0, 0.0]
+                self._values[group_key] = summary[key]
+            group[0] += 1
+            group[3] += summary["power_deficit_ticks"]
+            if reached is not None:
+                group[1] += 1
+                group[2] += reached
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One row per (override key, value): reach rate, mean time-to-rank and mean deficit ticks."""
+        result = []
+        for group_key, (runs, reached, ttr_sum, deficit_sum) in sorted(self.groups.items()):
+            result.append({
+                "key": group_key[0],
+                "value": self._values[group_key],
+                "runs": runs,
+                "reached_target": reached / runs,
+                "mean_time_to_target": ttr_sum / reached if reached else None,
+                "mean_power_deficit_ticks": deficit_sum / runs,
+            })
+        return result
+
+
+def run_sweep(scenario: Dict[str, Any], grid: Dict[str, List[Any]], output_path: str,
+              max_workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              target_rank: int | None = None, progress: bool = False) -> SweepAggregate:
+    """
+    Runs the scenario once per combination in `grid` across a process pool (all cores by default).
+    Each run's summary is appended to the CSV at `output_path` as soon as its chunk completes,
+    and folded into the returned SweepAggregate.
+    """
+    runs = expand_grid(grid)
+    override_keys = sorted(grid)
+    if target_rank is None:
+        target_rank = max(config.CITY_RANKS)
+    aggregate = SweepAggregate(target_rank)
+    columns = override_keys + list(simulate({"ticks": 0, "builds": []}, {}).keys())
+
+    directory = os.path.dirname(output_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='') as f, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        futures = [executor.submit(_simulate_chunk, scenario, runs[i:i + chunk_size])
+                   for i in range(0, len(runs), chunk_size)]
+        for future in as_completed(futures):
+            for summary in future.result():
+                writer.writerow(summary)
+                aggregate.add(summary, override_keys)
+            f.flush() # Stream: the file is usable while the sweep runs
+            if progress:
+                rate = aggregate.runs / (time.perf_counter() - start)
+                print(f"\r{aggregate.runs}/{len(runs)} runs ({rate:.0f} runs/s)", end="", flush=True)
+    if progress:
+        print()
+    return aggregate
+
+
+# Runs a sweep from the command line:
+#   python -m city_builder.sweep grid.json [scenario.json]
+# where grid.json maps override keys to value lists, e.g.
+#   {"BUILDING_SPECS.SOLAR_PANEL.cost": [400, 500, 600], "population_growth_rate": [0.01, 0.02]}
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m city_builder.sweep <grid.json> [scenario.json]")
+        sys.exit(2)
+    with open(sys.argv[1]) as grid_file:
+        sweep_grid = json.load(grid_file)
+    sweep_scenario = DEFAULT_SCENARIO
+    if len(sys.argv) == 3:
+        with open(sys.argv[2]) as scenario_file:
+            sweep_scenario = json.load(scenario_file)
+
+    csv_path = os.path.join(SWEEP_DIR, time.strftime(f"{sweep_scenario.get('name', 'sweep')}_%Y%m%d_%H%M%S.csv"))
+    sweep_aggregate = run_sweep(sweep_scenario, sweep_grid, csv_path, progress=True)
+    print(f"Per-run results written to {csv_path}")
+    for row in sweep_aggregate.rows():
+        mean_ttr = "-" if row["mean_time_to_target"] is None else f"{row['mean_time_to_target']:.1f}"
+        print(f"{row['key']} = {row['value']}: runs {row['runs']}, reached rank {sweep_aggregate.target_rank} "
+              f"{row['reached_target']:.0%}, mean ticks {mean_ttr}, mean deficit ticks {row['mean_power_deficit_ticks']:.1f}")
@@ -0,0 +1,149 @@
+# Elite 1984 City Builder - Procedural Terrain (water, rock and ore richness)
+
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from city_builder.buildings import Building
+from city_builder.config import TERRAIN_CACHE_DIR
+
+TERRAIN_FORMAT = 1 # Bump when generation changes, so stale cache files are not reused
+# Tile kinds
+LAND = 0
+WATER = 1
+ROCK = 2
+WATER_LEVEL = 0.32 # Normalized height below which a tile is water
+ROCK_LEVEL = 0.72 # ... and above which it is rock
+NOISE_OCTAVES = 5
+NOISE_BASE_CELLS = 4 # Lattice cells across the map at the coarsest octave
+RICHNESS_NORMAL = 100 # Richness at which a mine yields its spec output; stored per tile as 0-200
+# Display colors per tile kind (index = kind)
+TERRAIN_COLORS = np.array([(18, 28, 18), (10, 25, 70), (60, 55, 50)], dtype=np.uint8)
+
+
+def _interpolation(size: int, cells: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Lattice index and smoothstep weight for each of `size` samples spread over `cells` cells."""
+    position = (np.arange(size, dtype=np.float32) + 0.5) * (cells / size)
+    index = np.minimum(position.astype(np.int32), cells - 1)
+    t = position - index
+    return index, t * t * (3 - 2 * t)
+
+
+def fractal_noise(rng: np.random.Generator, width: int, height: int,
+                  octaves: int = NOISE_OCTAVES, base_cells: int = NOISE_BASE_CELLS) -> np.ndarray:
+    """
+    Fractal value noise in [0, 1], shape (width, height), float32. Each octave is a random lattice
+    interpolated along x (cheap: the lattice is small), leaving an interpolation along y that is a
+    linear map. Those maps are stacked so every octave is summed in one matrix product, which
+    writes the full-size map once instead of once per octave.
+    """
+    left, right = [], [] # Per octave: (width, cells_y + 1) rows and (cells_y + 1, height) y-weights
+    amplitude, amplitude_sum = 1.0, 0.0
+    columns = np.arange(height)
+    for octave in range(octaves):
+        cells_x = min(width, base_cells << octave)
+        cells_y = min(height, base_cells << octave)
+        lattice = rng.random((cells_x + 1, cells_y + 1), dtype=np.float32)
+        ix, wx = _interpolation(width, cells_x)
+        iy, wy = _interpolation(height, cells_y)
+        rows = lattice[ix] * (1 - wx)[:, None] + lattice[ix + 1] * wx[:, None]
+        left.append(rows * np.float32(amplitude))
+        weights = np.zeros((cells_y + 1, height), dtype=np.float32)
+        weights[iy, columns] = 1 - wy
+        weights[iy + 1, columns] += wy
+        right.append(weights)
+        amplitude_sum += amplitude
+        amplitude *= 0.5
+    total = np.concatenate(left, axis=1) @ np.concatenate(right, axis=0)
+    low, high = total.min(), total.max()
+    if high > low:
+        total -= low
+        total *= np.float32(1 / (high - low))
+    else:
+        total[:] = 0.5
+    return total
+
+
+def generate_terrain(seed: int, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Tile kinds and ore richness (both uint8, shape (width, height)) for a seed and map size."""
+    rng = np.random.default_rng(seed)
+    elevation = fractal_noise(rng, width, height)
+    ore = fractal_noise(rng, width, height)
+
+    water = elevation < WATER_LEVEL
+    rock = elevation > ROCK_LEVEL
+    kind = water.view(np.uint8) * np.uint8(WATER) # Masks viewed as 0/1 bytes, scaled to the kind codes
+    kind += rock.view(np.uint8) * np.uint8(ROCK)
+    # Ore is scarce on open land and concentrated in rock (50-200); none under water
+    ore *= RICHNESS_NORMAL
+    richness = ore.astype(np.uint8)
+    richness[rock] = (50 + ore[rock] * 1.5).astype(np.uint8)
+    richness[water] = 0
+    return kind, richness
+
+
+class Terrain:
+    """
+    Per-tile terrain stored alongside City.grid as compact (width, height) uint8 arrays, indexed
+    [x, y] like the grid. Nothing can be built on water, and only mines can be built on rock.
+    A mine's output is scaled by the mean ore richness under its footprint.
+    """
+    def __init__(self, seed: int, kind: np.ndarray, richness: np.ndarray):
+        self.seed = seed
+        self.kind = kind
+        self.richness = richness
+        self.width, self.height = kind.shape
+        self._footprint_richness: Dict[Tuple[int, int, int, int], int] = {} # (x, y, w, h) -> mean richness
+
+    @classmethod
+    def load(cls, seed: int, width: int, height: int, cache_dir: str | None = TERRAIN_CACHE_DIR) -> 'Terrain':
+        """Loads the terrain for a seed and size from the disk cache, generating (and caching) it if missing."""
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, f"terrain_v{TERRAIN_FORMAT}_{seed}_{width}x{height}.npz")
+            try:
+                with np.load(path) as cached:
+                    return cls(seed, cached["kind"], cached["richness"])
+            except (OSError, KeyError, ValueError):
+                pass # Missing or unreadable: regenerate
+        kind, richness = generate_terrain(seed, width, height)
+        if path is not None:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = path + ".tmp.npz" # np.savez appends .npz to names without it
+                np.savez(tmp_path, kind=kind, richness=richness)
+                os.replace(tmp_path, path)
+            except OSError as e: # The terrain still works, it is just regenerated next time
+                print(f"Could not write terrain cache {path}: {e}")
+        return cls(seed, kind, richness)
+
+    def placement_error(self, position: Tuple[int, int], size: Tuple[int, int], mines_ore: bool) -> str | None:
+        """Why a footprint cannot be built on (water, or rock for anything but a mine), or None."""
+        pos_x, pos_y = position
+        size_w, size_h = size
+        tiles = self.kind[pos_x:pos_x + size_w, pos_y:pos_y + size_h]
+        if (tiles == WATER).any():
+            return "Cannot build on water."
+        if not mines_ore and (tiles == ROCK).any():
+            return "Only mines can be built on rock."
+        return None
+
+    def richness_under(self, building: Building) -> int:
+        """Mean ore richness (RICHNESS_NORMAL = spec output) under a building's footprint."""
+        key = building.position + building.size
+        richness = self._footprint_richness.get(key)
+        if richness is None:
+            pos_x, pos_y = building.position
+            size_w, size_h = building.size
+            tiles = self.richness[pos_x:pos_x + size_w, pos_y:pos_y + size_h]
+            richness = int(tiles.mean()) if tiles.size else 0
+            self._footprint_richness[key] = richness
+        return richness
+
+    def scale_output(self, building: Building, output: int) -> int:
+        return output * self.richness_under(building) // RICHNESS_NORMAL
+
+    def colors(self) -> np.ndarray:
+        """(width, height, 3) RGB image of the tile kinds, for pygame.surfarray."""
+        return TERRAIN_COLORS[self.kind]
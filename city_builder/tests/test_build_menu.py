@@ -0,0 +1,71 @@
+import unittest
+from city_builder.build_menu import BuildMenuList, spec_category, MENU_FILTERS
+from city_builder.buildings import get_available_buildings
+
+
+def make_specs(count):
+    """`count` synthetic specs, alternating generators and habitats."""
+    specs = {}
+    for i in range(count):
+        kind = "power_gen" if i % 2 == 0 else "population_cap"
+        specs[f"TYPE_{i}"] = {"name": f"Building {i}", "cost": 100 + i, kind: 10}
+    return specs
+
+
+class TestBuildMenuList(unittest.TestCase):
+    def test_categories(self):
+        available = get_available_buildings(1)
+        self.assertEqual(spec_category(available["SOLAR_PANEL"]), "Power")
+        self.assertEqual(spec_category(available["HABITAT_SMALL"]), "Housing")
+        self.assertEqual(spec_category(available["ORE_MINE_BASIC"]), "Industry")
+        self.assertEqual(spec_category(available["POWER_CONDUIT"]), "Other")
+
+    def test_layout_once_per_catalog(self):
+        menu = BuildMenuList(row_height=30, visible_rows=5)
+        self.assertTrue(menu.set_catalog(get_available_buildings(0)))
+        rank0 = [type_id for type_id, _ in menu.rows]
+        self.assertFalse(menu.set_catalog(get_available_buildings(0))) # Same shared dict: nothing to do
+        self.assertTrue(menu.set_catalog(get_available_buildings(1)))
+        self.assertIn("ORE_MINE_BASIC", [type_id for type_id, _ in menu.rows])
+        self.assertNotIn("ORE_MINE_BASIC", rank0)
+
+    def test_search_and_filter(self):
+        menu = BuildMenuList(30, 5)
+        menu.set_catalog(get_available_buildings(1))
+        menu.set_query("SOLAR")
+        self.assertEqual([type_id for type_id, _ in menu.rows], ["SOLAR_PANEL"])
+        menu.set_query("ore mine") # Every word must match, in the name or the type id
+        self.assertEqual([type_id for type_id, _ in menu.rows], ["ORE_MINE_BASIC"])
+        menu.set_query("")
+        self.assertEqual(menu.cycle_filter(), MENU_FILTERS[1])
+        self.assertTrue(all(spec_category(spec) == "Power" for _, spec in menu.rows))
+        for _ in range(len(MENU_FILTERS) - 1):
+            menu.cycle_filter()
+        self.assertEqual(menu.filter_name, "All")
+
+    def test_scrolling_and_hit_testing(self):
+        menu = BuildMenuList(row_height=30, visible_rows=10)
+        menu.set_catalog(make_specs(500))
+        self.assertEqual(menu.visible(), range(0, 10))
+        menu.scroll_by(1000)
+        self.assertEqual(menu.scroll, 490) # Clamped so the last page is full
+        self.assertEqual(menu.visible(), range(490, 500))
+        self.assertEqual(menu.row_at(0), 490)
+        self.assertEqual(menu.row_at(95), 493)
+        self.assertIsNone(menu.row_at(300)) # Below the last visible slot
+        self.assertIsNone(menu.row_at(-1))
+        menu.scroll_by(-1000)
+        self.assertEqual(menu.scroll, 0)
+
+        menu.scroll_by(200)
+        menu.set_query("building 49") # Fewer rows than the scroll position: re-clamped
+        self.assertEqual(len(menu.rows), 15) # 49, 149, ..., 449 and 490-499
+        self.assertEqual(menu.scroll, 5)
+        menu.set_query("building 499")
+        self.assertEqual(menu.scroll, 0)
+        self.assertEqual(menu.row_at(0), 0)
+        self.assertIsNone(menu.row_at(30)) # Past the last row
+
+
+if __name__ == '__main__':
+    unittest.main()
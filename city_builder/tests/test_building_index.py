@@ -0,0 +1,74 @@
+import unittest
+
+from city_builder.building_index import INDEXED_STATS
+from city_builder.city import City
+from city_builder.undo import UndoHistory
+
+
+class TestBuildingIndex(unittest.TestCase):
+    def setUp(self):
+        self.city = City()
+        self.city.credits = 100000
+
+    def assertIndexMatchesScan(self):
+        city, index = self.city, self.city.index
+        self.assertEqual(index.count(), len(city.buildings))
+        self.assertEqual(set(index.offline()), {b for b in city.buildings if not b.is_operational})
+        for building_type in {b.type for b in city.buildings} | {"POWER_CONDUIT"}:
+            members = [b for b in city.buildings if b.type == building_type]
+            self.assertEqual(list(index.of_type(building_type)), members)
+            self.assertEqual(index.count(building_type, operational=True), sum(b.is_operational for b in members))
+            for stat in INDEXED_STATS:
+                self.assertEqual(index.total(stat, building_type), sum(getattr(b, stat) for b in members))
+                self.assertEqual(index.total(stat, building_type, operational_only=True),
+                                 sum(getattr(b, stat) for b in members if b.is_operational))
+        for stat in INDEXED_STATS:
+            self.assertEqual(index.total(stat), sum(getattr(b, stat) for b in city.buildings))
+
+    def test_add_and_remove(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("HABITAT_SMALL", (2, 0))
+        self.city.add_building("HABITAT_SMALL", (4, 0))
+        self.assertIndexMatchesScan()
+        self.assertEqual(self.city.index.count("HABITAT_SMALL"), 2)
+        self.assertEqual(self.city.index.total("population_capacity"), 100)
+
+        self.city.remove_building((2, 0))
+        self.assertIndexMatchesScan()
+        self.city.remove_building((0, 0))
+        self.city.remove_building((4, 0))
+        self.assertEqual(self.city.index.types(), [])
+        self.assertEqual(self.city.index.total("value"), 0)
+
+    def test_power_shortage_flips_state(self):
+        for i in range(12): # 120 consumption against the 100 base supply
+            self.city.add_building("HABITAT_SMALL", (i * 2, 0))
+        self.assertEqual(self.city.index.count("HABITAT_SMALL", operational=False), 2)
+        self.assertIndexMatchesScan()
+        self.assertEqual(self.city.max_population_capacity,
+                         self.city.index.total("population_capacity", operational_only=True))
+
+        self.city.add_building("SOLAR_PANEL", (0, 4)) # Enough supply again
+        self.assertEqual(self.city.index.count(operational=False), 0)
+        self.assertIndexMatchesScan()
+
+    def test_undo_keeps_index_in_step(self):
+        history = UndoHistory()
+        for i in range(11):
+            history.place(self.city, "HABITAT_SMALL", (i * 2, 0))
+        history.undo(self.city)
+        self.assertIndexMatchesScan()
+        history.redo(self.city)
+        history.remove(self.city, (0, 0))
+        history.undo(self.city)
+        self.assertIndexMatchesScan()
+
+    def test_load_rebuilds_index(self):
+        for i in range(12):
+            self.city.add_building("HABITAT_SMALL", (i * 2, 0))
+        self.city = City.from_dict(self.city.to_dict())
+        self.assertIndexMatchesScan()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from city_builder.buildings import Building, get_available_buildings
+from city_builder.catalog import compile_catalog
 from city_builder.config import BUILDING_SPECS
 
 class TestBuilding(unittest.TestCase):
@@ -106,6 +107,7 @@ class TestBuilding(unittest.TestCase):
             "name": "Advanced Solar", "cost": 2000, "power_gen": 200, "size": (1,1),
             "char": "A", "unlock_rank": 1, "value": 1500
         }
+        compile_catalog()
 
         available_rank_0 = get_available_buildings(0)
         self.assertIn("SOLAR_PANEL", available_rank_0)
@@ -121,6 +123,7 @@ class TestBuilding(unittest.TestCase):
         # Restore original BUILDING_SPECS to not affect other tests if run in same suite
         BUILDING_SPECS.clear()
         BUILDING_SPECS.update(original_building_specs)
+        compile_catalog()
 
 
 if __name__ == '__main__':
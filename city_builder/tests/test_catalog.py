@@ -0,0 +1,110 @@
+import unittest
+from city_builder.buildings import Building, get_available_buildings
+from city_builder.catalog import BuildingCatalog, CatalogError, compile_catalog, get_catalog
+from city_builder.config import BUILDING_SPECS, CITY_RANKS
+
+
+def spec(**overrides):
+    base = {"name": "Test", "cost": 10, "size": (1, 1), "char": "T", "unlock_rank": 0, "value": 5}
+    base.update(overrides)
+    return base
+
+
+RANKS = {0: {"name": "A", "value_needed": 0}, 1: {"name": "B", "value_needed": 100},
+         2: {"name": "C", "value_needed": 1000}}
+
+
+class TestCatalog(unittest.TestCase):
+    def test_validation_errors(self):
+        with self.assertRaises(CatalogError):
+            BuildingCatalog({"X": {"name": "X"}}, RANKS) # Missing required keys
+        with self.assertRaises(CatalogError):
+            BuildingCatalog({"X": spec(cost="10")}, RANKS)
+        with self.assertRaises(CatalogError):
+            BuildingCatalog({"X": spec(size=(0, 1))}, RANKS)
+        with self.assertRaises(CatalogError):
+            BuildingCatalog({"X": spec(production_interval=0)}, RANKS)
+        with self.assertRaises(CatalogError):
+            BuildingCatalog({"X": spec()}, {0: {"name": "A", "value_needed": 10}, 1: {"name": "B", "value_needed": 5}})
+        with self.assertRaises(ValueError): # CatalogError is a ValueError
+            BuildingCatalog({"X": spec()}, {})
+
+    def test_rank_for_value(self):
+        catalog = BuildingCatalog({"X": spec()}, RANKS)
+        self.assertEqual(catalog.rank_for_value(-5), 0)
+        self.assertEqual(catalog.rank_for_value(99), 0)
+        self.assertEqual(catalog.rank_for_value(100), 1)
+        self.assertEqual(catalog.rank_for_value(999), 1)
+        self.assertEqual(catalog.rank_for_value(10 ** 9), 2)
+
+    def test_available_matches_unlock_rank(self):
+        specs = {"LATE": spec(unlock_rank=2), "EARLY": spec(), "MID": spec(unlock_rank=1), "NEVER": spec(unlock_rank=7)}
+        catalog = BuildingCatalog(specs, RANKS)
+        self.assertEqual(list(catalog.available(0)), ["EARLY"])
+        self.assertEqual(list(catalog.available(1)), ["EARLY", "MID"]) # Spec-table order
+        self.assertEqual(list(catalog.available(2)), ["LATE", "EARLY", "MID"])
+        self.assertEqual(list(catalog.available(7)), list(specs))
+        self.assertIs(catalog.available(1), catalog.available(1)) # Precomputed, shared
+        self.assertEqual(catalog.unlocks_at[1], ["MID"])
+
+        for rank in range(8):
+            expected = [name for name, s in specs.items() if s["unlock_rank"] <= rank]
+            self.assertEqual(list(catalog.available(rank)), expected)
+
+    def test_stat_tables_and_defaults(self):
+        catalog = BuildingCatalog({"A": spec(power_gen=7), "B": spec(upkeep=3, size=[2, 2])}, RANKS)
+        self.assertEqual(catalog.type_ids, {"A": 0, "B": 1})
+        self.assertEqual(catalog.stats["power_gen"], (7, 0))
+        self.assertEqual(catalog.stats["upkeep_interval"], (1, 1))
+        self.assertEqual(catalog.sizes[1], (2, 2))
+
+    def test_building_uses_catalog(self):
+        building = Building("SOLAR_PANEL", (0, 0))
+        catalog = get_catalog()
+        self.assertEqual(building.type_id, catalog.type_ids["SOLAR_PANEL"])
+        self.assertEqual(building.power_generation, BUILDING_SPECS["SOLAR_PANEL"]["power_gen"])
+        self.assertIs(building.spec, BUILDING_SPECS["SOLAR_PANEL"])
+        with self.assertRaises(ValueError):
+            Building("NO_SUCH_TYPE", (0, 0))
+
+    def test_recompile_after_edit(self):
+        original_cost = BUILDING_SPECS["SOLAR_PANEL"]["cost"]
+        try:
+            BUILDING_SPECS["SOLAR_PANEL"]["cost"] = original_cost + 1
+            compile_catalog()
+            self.assertEqual(Building("SOLAR_PANEL", (0, 0)).cost, original_cost + 1)
+        finally:
+            BUILDING_SPECS["SOLAR_PANEL"]["cost"] = original_cost
+            compile_catalog()
+
+        BUILDING_SPECS["CATALOG_TEST"] = spec(unlock_rank=max(CITY_RANKS))
+        try:
+            compile_catalog()
+            self.assertIn("CATALOG_TEST", get_available_buildings(max(CITY_RANKS)))
+        finally:
+            del BUILDING_SPECS["CATALOG_TEST"]
+            compile_catalog()
+        self.assertNotIn("CATALOG_TEST", get_available_buildings(max(CITY_RANKS)))
+
+    def test_only_explicit_recompiles(self):
+        catalog = get_catalog()
+        removed = next(iter(BUILDING_SPECS))
+        removed_spec = BUILDING_SPECS.pop(removed)
+        BUILDING_SPECS["CATALOG_TEST"] = spec() # Same table size as before
+        try:
+            self.assertIs(get_catalog(), catalog) # No hidden rebuilds from a size check
+            catalog = compile_catalog()
+            self.assertIn("CATALOG_TEST", catalog.type_ids)
+            self.assertNotIn(removed, catalog.type_ids)
+            self.assertIs(get_catalog(), catalog)
+        finally:
+            del BUILDING_SPECS["CATALOG_TEST"]
+            table = {removed: removed_spec, **BUILDING_SPECS}
+            BUILDING_SPECS.clear()
+            BUILDING_SPECS.update(table)
+            compile_catalog()
+        self.assertIn(removed, get_catalog().type_ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
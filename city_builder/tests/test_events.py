@@ -0,0 +1,78 @@
+import unittest
+
+from city_builder.city import City
+from city_builder.events import (
+    BuildingAdded, BuildingRemoved, OperationalChanged, ResourcesChanged, RankUp
+)
+from city_builder.undo import UndoHistory
+
+
+class TestCityEvents(unittest.TestCase):
+    def setUp(self):
+        self.city = City()
+        self.city.credits = 100000
+        self.city.recalculate()
+        self.events = self.city.events.subscribe()
+
+    def test_placement_events(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        batch = self.events.drain()
+        self.assertIsInstance(batch[0], BuildingAdded)
+        self.assertEqual(batch[0].building, self.city.building_at((0, 0)))
+        resources = [e for e in batch if isinstance(e, ResourcesChanged)]
+        self.assertEqual(len(resources), 1)
+        old_credits, new_credits = resources[0].changes["credits"]
+        self.assertEqual(new_credits, self.city.credits)
+        self.assertEqual(resources[0].changes["net_power"], (100, 150))
+        self.assertEqual(self.events.drain(), []) # Drained
+
+        self.city.remove_building((0, 0))
+        self.assertIsInstance(self.events.drain()[0], BuildingRemoved)
+
+    def test_only_flips_are_reported(self):
+        for i in range(12): # 120 consumption against the 100 base supply
+            self.city.add_building("HABITAT_SMALL", (i * 2, 0))
+        flips = [e for e in self.events.drain() if isinstance(e, OperationalChanged)]
+        self.assertEqual(len(flips), 2)
+        self.assertTrue(all(not e.operational for e in flips))
+
+        self.city.advance_ticks(5) # Steady state: nothing switches on or off
+        self.assertFalse([e for e in self.events.drain() if isinstance(e, OperationalChanged)])
+
+        self.city.add_building("SOLAR_PANEL", (0, 4))
+        flips = [e for e in self.events.drain() if isinstance(e, OperationalChanged)]
+        self.assertEqual(len(flips), 2)
+        self.assertTrue(all(e.operational and e.building.type == "HABITAT_SMALL" for e in flips))
+
+    def test_unchanged_tick_emits_nothing(self):
+        self.city.advance_ticks(1)
+        self.events.drain()
+        self.city.recalculate()
+        self.assertEqual(self.events.drain(), [])
+
+    def test_filtered_subscription_and_rank_up(self):
+        ranks = self.city.events.subscribe(RankUp)
+        self.city.credits = 10 ** 9
+        self.city.recalculate()
+        batch = ranks.drain()
+        self.assertTrue(batch)
+        self.assertTrue(all(isinstance(e, RankUp) for e in batch))
+        self.assertEqual(batch[-1].level, self.city.current_rank_level)
+
+        self.city.events.unsubscribe(ranks)
+        self.city.credits += 1
+        self.city.recalculate()
+        self.assertEqual(ranks.drain(), [])
+
+    def test_undo_emits_events(self):
+        history = UndoHistory()
+        history.place(self.city, "SOLAR_PANEL", (0, 0))
+        self.events.drain()
+        history.undo(self.city)
+        self.assertIsInstance(self.events.drain()[0], BuildingRemoved)
+        history.redo(self.city)
+        self.assertIsInstance(self.events.drain()[0], BuildingAdded)
+
+
+if __name__ == '__main__':
+    unittest.main()
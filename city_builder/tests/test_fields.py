@@ -0,0 +1,60 @@
+import unittest
+from city_builder.city import City
+from city_builder.config import GRID_WIDTH, GRID_HEIGHT, LAND_VALUE_BASE
+
+try:
+    import numpy as np
+    from city_builder.fields import FieldModel, diffuse
+except ImportError: # numpy is optional
+    np = None
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestFields(unittest.TestCase):
+
+    def test_diffuse_conserves_and_spreads(self):
+        source = np.zeros((31, 31), dtype=np.float32)
+        source[15, 15] = 100
+        out = diffuse(source, 2)
+        self.assertAlmostEqual(float(out.sum()), 100, places=3)
+        self.assertGreater(out[15, 15], out[17, 15])
+        self.assertEqual(out[15 + 5, 15], 0) # Beyond the 2 * radius reach
+
+    def test_incremental_update_matches_full_recompute(self):
+        city = City(fields_enabled=True)
+        city.credits = 1000000
+        city.add_building("HABITAT_SMALL", (2, 2))
+        city.add_building("SOLAR_PANEL", (20, 10))
+        city.fields.update()
+        city.remove_building((2, 2))
+        city.add_building("HABITAT_SMALL", (12, 6))
+        city.fields.update()
+
+        fields = city.fields
+        expected_density = diffuse(fields.density_source, fields.radius)
+        expected_pollution = diffuse(fields.pollution_source, fields.radius)
+        np.testing.assert_allclose(fields.density, expected_density, atol=1e-4)
+        np.testing.assert_allclose(fields.pollution, expected_pollution, atol=1e-4)
+
+    def test_fields_follow_buildings(self):
+        city = City(fields_enabled=True)
+        self.assertEqual(city.fields.density.shape, (GRID_WIDTH, GRID_HEIGHT))
+        city.add_building("HABITAT_SMALL", (5, 5))
+        city.add_building("SOLAR_PANEL", (20, 5))
+        self.assertFalse(city.fields.density.any()) # Not refreshed until the update interval
+
+        while city.tick_count % city.fields.update_interval:
+            city.update_resources()
+        self.assertGreater(city.fields.land_value_at((5, 5)), LAND_VALUE_BASE)
+        self.assertLess(city.fields.land_value_at((20, 5)), LAND_VALUE_BASE)
+        self.assertFalse(city.fields.update()) # Nothing left dirty
+
+    def test_save_load_rebuilds_fields(self):
+        city = City(fields_enabled=True)
+        city.add_building("HABITAT_SMALL", (5, 5))
+        loaded = City.from_dict(city.to_dict())
+        self.assertIsNotNone(loaded.fields)
+        self.assertGreater(loaded.fields.land_value_at((5, 5)), LAND_VALUE_BASE)
+
+
+if __name__ == '__main__':
+    unittest.main()
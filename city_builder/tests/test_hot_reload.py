@@ -0,0 +1,131 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from city_builder.catalog import compile_catalog
+from city_builder.city import City
+from city_builder.config import BUILDING_SPECS, CITY_RANKS
+from city_builder.hot_reload import SpecReloader
+from city_builder.specs import DATA_DIR
+
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self):
+        self.saved_specs = {t: (spec, copy.deepcopy(spec)) for t, spec in BUILDING_SPECS.items()}
+        self.saved_ranks = copy.deepcopy(CITY_RANKS)
+        self.data_dir = tempfile.mkdtemp()
+        for name in ("ranks.json", "buildings.json"):
+            shutil.copy(os.path.join(DATA_DIR, name), self.data_dir)
+        self.mtime = 1000000000
+        self.reloader = SpecReloader(self.data_dir, poll_interval=0)
+
+        self.city = City()
+        self.city.credits = 100000
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("HABITAT_SMALL", (1, 0))
+        self.city.add_building("HABITAT_SMALL", (3, 0))
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+        # Restore the shared tables in place, keeping the original spec dicts
+        BUILDING_SPECS.clear()
+        for type_name, (spec, contents) in self.saved_specs.items():
+            spec.clear()
+            spec.update(contents)
+            BUILDING_SPECS[type_name] = spec
+        CITY_RANKS.clear()
+        CITY_RANKS.update(self.saved_ranks)
+        compile_catalog()
+
+    def edit(self, change):
+        path = os.path.join(self.data_dir, "buildings.json")
+        with open(path) as f:
+            table = json.load(f)
+        change(table)
+        with open(path, 'w') as f:
+            json.dump(table, f)
+        self.mtime += 1
+        os.utime(path, (self.mtime, self.mtime)) # Guarantee a new mtime even on coarse filesystem clocks
+
+    def test_poll_detects_changes(self):
+        self.assertFalse(self.reloader.poll())
+        self.edit(lambda table: None)
+        self.assertTrue(self.reloader.poll())
+        self.assertFalse(self.reloader.poll())
+        slow = SpecReloader(self.data_dir, poll_interval=60)
+        self.edit(lambda table: table["SOLAR_PANEL"].update(cost=1))
+        self.assertFalse(slow.poll()) # Throttled
+
+    def test_reload_updates_placed_buildings(self):
+        spec = BUILDING_SPECS["HABITAT_SMALL"]
+        solar = self.city.building_at((0, 0))
+        self.edit(lambda table: table["HABITAT_SMALL"].update(power_con=15, population_cap=80))
+        success, message = self.reloader.check(self.city)
+        self.assertTrue(success, message)
+        self.assertIs(BUILDING_SPECS["HABITAT_SMALL"], spec) # Swapped in place
+        self.assertEqual(spec["population_cap"], 80)
+        self.assertIn("2 building(s)", message)
+
+        habitat = self.city.building_at((1, 0))
+        self.assertEqual(habitat.power_consumption, 15)
+        self.assertEqual(self.city.total_power_consumption, 30)
+        self.assertEqual(self.city.max_population_capacity, 160)
+        self.assertEqual(solar.power_generation, BUILDING_SPECS["SOLAR_PANEL"]["power_gen"])
+
+    def test_reload_reschedules_events(self):
+        self.city.add_building("ORE_MINE_BASIC", (5, 0))
+        self.edit(lambda table: table["ORE_MINE_BASIC"].update(ore_prod=7, production_interval=2))
+        self.reloader.check(self.city)
+        ore = self.city.ore
+        self.city.update_resources()
+        self.city.update_resources()
+        self.assertEqual(self.city.ore - ore, 7) # One yield every two ticks
+
+    def test_new_type_and_renumbering(self):
+        def add_type(table):
+            table.clear()
+            table.update({"SHED": {"name": "Shed", "cost": 5, "size": [1, 1], "char": "s", "unlock_rank": 0, "value": 1},
+                          **self.saved_specs_contents()})
+        self.edit(add_type)
+        success, _ = self.reloader.reload(self.city)
+        self.assertTrue(success)
+        self.assertEqual(list(BUILDING_SPECS)[0], "SHED")
+        self.assertEqual(self.city.building_at((0, 0)).type_id, 1)
+        self.assertTrue(self.city.add_building("SHED", (8, 0))[0])
+
+    def test_invalid_or_unsafe_reload_keeps_current_specs(self):
+        cost = BUILDING_SPECS["SOLAR_PANEL"]["cost"]
+        self.edit(lambda table: table["SOLAR_PANEL"].update(cost="free"))
+        success, _ = self.reloader.reload(self.city)
+        self.assertFalse(success)
+        self.assertEqual(BUILDING_SPECS["SOLAR_PANEL"]["cost"], cost)
+
+        self.edit(lambda table: table.pop("SOLAR_PANEL") and None)
+        success, message = self.reloader.reload(self.city)
+        self.assertFalse(success)
+        self.assertIn("SOLAR_PANEL", message)
+        self.assertIn("SOLAR_PANEL", BUILDING_SPECS)
+
+    def test_malformed_file_is_a_failed_reload(self):
+        path = os.path.join(self.data_dir, "buildings.json")
+        for contents in ('[{"name": "Solar Panel"}]', '{"SOLAR_PANEL": "panel"}', "{"):
+            with self.subTest(contents=contents):
+                with open(path, 'w') as f:
+                    f.write(contents)
+                success, message = self.reloader.reload(self.city)
+                self.assertFalse(success)
+                self.assertIn("Spec reload failed", message)
+        with mock.patch("city_builder.hot_reload.load_specs", side_effect=TypeError("unhashable type: 'list'")):
+            self.assertEqual(self.reloader.reload(self.city), (False, "Spec reload failed: unhashable type: 'list'"))
+        self.assertIn("SOLAR_PANEL", BUILDING_SPECS)
+
+    def saved_specs_contents(self):
+        return {t: {**contents, "size": list(contents["size"])} for t, (_, contents) in self.saved_specs.items()}
+
+
+if __name__ == '__main__':
+    unittest.main()
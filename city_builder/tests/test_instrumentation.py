@@ -0,0 +1,77 @@
+import unittest
+import os
+import tempfile
+from city_builder import save_load
+from city_builder.city import City
+from city_builder.instrumentation import EngineInstrumentation
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = EngineInstrumentation()
+
+    def tearDown(self):
+        self.instrumentation.disable() # Never leave wrappers installed for other tests
+
+    def test_disabled_leaves_originals_in_place(self):
+        original_add = City.__dict__["add_building"]
+        original_from_dict = City.__dict__["from_dict"]
+        original_save = save_load.save_game
+
+        self.instrumentation.enable()
+        self.assertIsNot(City.__dict__["add_building"], original_add)
+        self.instrumentation.disable()
+
+        self.assertIs(City.__dict__["add_building"], original_add)
+        self.assertIs(City.__dict__["from_dict"], original_from_dict)
+        self.assertIs(save_load.save_game, original_save)
+
+    def test_records_calls_and_latency(self):
+        with self.instrumentation:
+            city = City()
+            city.add_building("SOLAR_PANEL", (0, 0))
+            city.add_building("SOLAR_PANEL", (0, 0)) # Failed placement still counts as a call
+            city.remove_building((0, 0))
+            City.from_dict(city.to_dict())
+
+        ops = self.instrumentation.snapshot()["operations"]
+        self.assertEqual(ops["city_add_building"]["calls"], 2)
+        self.assertEqual(ops["city_remove_building"]["calls"], 1)
+        self.assertEqual(ops["city_to_dict"]["calls"], 1)
+        self.assertEqual(ops["city_from_dict"]["calls"], 1)
+        self.assertGreaterEqual(ops["city_update_resources"]["calls"], 3)
+        self.assertGreater(ops["city_add_building"]["total_seconds"], 0)
+        self.assertLessEqual(ops["city_add_building"]["max_seconds"], ops["city_add_building"]["total_seconds"])
+
+        # Calls made after disable() are not recorded
+        City().add_building("SOLAR_PANEL", (0, 0))
+        self.assertEqual(self.instrumentation.snapshot()["operations"]["city_add_building"]["calls"], 2)
+
+    def test_allocation_tracking(self):
+        self.instrumentation.enable(track_allocations=True)
+        City().to_dict()
+        self.instrumentation.disable()
+        ops = self.instrumentation.snapshot()["operations"]
+        self.assertEqual(ops["city_to_dict"]["calls"], 1)
+        self.assertGreaterEqual(ops["city_to_dict"]["max_alloc_bytes"], 0)
+
+    def test_prometheus_dump(self):
+        city = City()
+        with self.instrumentation:
+            city.update_rank()
+        self.instrumentation.set_gauge("buildings", 0)
+
+        text = self.instrumentation.to_prometheus()
+        self.assertIn("# TYPE city_builder_calls_total counter", text)
+        self.assertIn('city_builder_calls_total{op="city_update_rank"} 1', text)
+        self.assertIn("city_builder_buildings 0", text)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "metrics", "engine.prom")
+            self.assertTrue(self.instrumentation.write_prometheus(path))
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
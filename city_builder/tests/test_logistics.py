@@ -0,0 +1,73 @@
+import unittest
+import random
+from city_builder.city import City
+from city_builder.buildings import Building
+from city_builder.config import BUILDING_SPECS, GRID_WIDTH, GRID_HEIGHT
+from city_builder.logistics import LogisticsNetwork, UNREACHABLE
+
+class TestLogistics(unittest.TestCase):
+
+    def setUp(self):
+        self.city = City(logistics_enabled=True)
+        self.city.credits = 1000000
+        self.city.current_rank_level = BUILDING_SPECS["ORE_MINE_BASIC"]["unlock_rank"]
+
+    def rebuilt(self) -> LogisticsNetwork:
+        """A network built from scratch from the city's current buildings."""
+        network = LogisticsNetwork(GRID_WIDTH, GRID_HEIGHT)
+        for building in self.city.buildings:
+            network.add_building(building)
+        return network
+
+    def test_distance_discount(self):
+        self.city.add_building("HABITAT_SMALL", (0, 0))
+        near = Building("ORE_MINE_BASIC", (2, 0)) # Touches the habitat
+        far = Building("ORE_MINE_BASIC", (12, 0))
+        logistics = self.city.logistics
+
+        self.assertEqual(logistics.distance_at((1, 1)), 0)
+        self.assertEqual(logistics.distance_at((5, 0)), 4)
+        self.assertEqual(logistics.effective_ore_production(near), near.ore_production)
+        self.assertLess(logistics.effective_ore_production(far), far.ore_production)
+
+    def test_obstacles_and_sink_removal(self):
+        self.city.add_building("HABITAT_SMALL", (0, 0))
+        self.assertEqual(self.city.logistics.distance_at((4, 0)), 3)
+        # A wall of panels across column 3 forces a detour
+        for y in range(GRID_HEIGHT - 1):
+            self.city.add_building("SOLAR_PANEL", (3, y))
+        # Down column 2 to the gap in the bottom row, across, then back up column 4
+        self.assertEqual(self.city.logistics.distance_at((4, 0)), 1 + (GRID_HEIGHT - 2) + 2 + (GRID_HEIGHT - 1))
+
+        self.city.remove_building((0, 0))
+        self.assertEqual(self.city.logistics.distance_at((4, 0)), UNREACHABLE)
+        self.assertEqual(self.city.logistics.dist, self.rebuilt().dist)
+
+    def test_incremental_matches_rebuild(self):
+        rng = random.Random(7)
+        types = ["HABITAT_SMALL", "SOLAR_PANEL", "ORE_MINE_BASIC"]
+        for step in range(150):
+            position = (rng.randrange(GRID_WIDTH), rng.randrange(GRID_HEIGHT))
+            if rng.random() < 0.35 and self.city.buildings:
+                self.city.remove_building(rng.choice(self.city.buildings).position)
+            else:
+                self.city.add_building(rng.choice(types), position)
+            if step % 25 == 0:
+                self.assertEqual(self.city.logistics.dist, self.rebuilt().dist)
+        self.assertEqual(self.city.logistics.dist, self.rebuilt().dist)
+
+    def test_mine_without_sink_produces_nothing(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("ORE_MINE_BASIC", (5, 5))
+        ore = self.city.ore
+        self.city.update_resources()
+        self.assertEqual(self.city.ore, ore)
+
+        self.city.add_building("HABITAT_SMALL", (7, 5))
+        ore = self.city.ore
+        self.city.update_resources()
+        self.assertEqual(self.city.ore, ore + BUILDING_SPECS["ORE_MINE_BASIC"]["ore_prod"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from city_builder.city import City
+
+try:
+    import numpy as np
+    from city_builder.metrics import MetricsHistory
+except ImportError: # numpy is optional
+    np = None
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestMetricsHistory(unittest.TestCase):
+    def setUp(self):
+        self.city = City()
+        self.metrics = MetricsHistory(tiers=(("tick", 1, 5), ("minute", 4, 3)))
+        self.city.metrics = self.metrics
+
+    def test_records_every_tick(self):
+        self.city.advance_ticks(3)
+        credits = self.metrics.series("credits")
+        self.assertEqual(len(credits), 3)
+        self.assertEqual(credits[-1], self.city.credits)
+        self.assertEqual(self.metrics.series("ore")[-1], self.city.ore)
+
+    def test_ring_keeps_newest_samples(self):
+        for value in range(12):
+            self.city.credits = value * 10
+            self.metrics.record(self.city)
+        np.testing.assert_array_equal(self.metrics.series("credits"), [70, 80, 90, 100, 110])
+
+    def test_coarser_tiers_hold_period_means(self):
+        for value in range(10):
+            self.city.population = value
+            self.metrics.record(self.city)
+        # Periods of four: [0..3] and [4..7]; 8 and 9 are still pending
+        np.testing.assert_array_equal(self.metrics.series("population", "minute"), [1.5, 5.5])
+        for value in range(10, 22):
+            self.city.population = value
+            self.metrics.record(self.city)
+        self.assertEqual(len(self.metrics.series("population", "minute")), 3) # Capped at capacity
+
+    def test_version_tracks_stored_samples(self):
+        minute = self.metrics.tiers["minute"]
+        for _ in range(3):
+            self.metrics.record(self.city)
+        self.assertEqual(minute.version, 0)
+        self.metrics.record(self.city)
+        self.assertEqual(minute.version, 1)
+
+    def test_polyline_scales_into_box(self):
+        for value in (5, 10, 15):
+            self.city.ore = value
+            self.metrics.record(self.city)
+        points, low, high = self.metrics.polyline("ore", "tick", 101, 51)
+        self.assertEqual((low, high), (5.0, 15.0))
+        self.assertEqual(points[-1], (100, 0)) # Newest at the right edge, highest at the top
+        self.assertEqual(points[0][1], 50)
+        self.assertEqual(self.metrics.polyline("ore", "minute", 101, 51), ([], 0.0, 0.0))
+
+    def test_clear(self):
+        self.city.advance_ticks(6)
+        self.metrics.clear()
+        self.assertEqual(len(self.metrics.series("credits")), 0)
+        self.assertEqual(len(self.metrics.series("credits", "minute")), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from city_builder.city import City
+from city_builder.catalog import get_catalog
+
+try:
+    import numpy as np
+    from city_builder.minimap import Minimap, tile_code, code_colors, EMPTY_COLOR, OFFLINE_COLOR, CATEGORY_COLORS
+except ImportError: # numpy is optional
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestMinimap(unittest.TestCase):
+    def setUp(self):
+        self.city = City()
+        self.city.credits = 100000
+        self.minimap = Minimap(self.city)
+        self.minimap.refresh() # Initial full build
+
+    def test_full_refresh_matches_grid(self):
+        self.city.add_building("SOLAR_PANEL", (3, 4))
+        self.city.add_building("HABITAT_SMALL", (10, 6))
+        minimap = Minimap(self.city)
+        self.assertEqual(minimap.refresh(), list(range(minimap.height)))
+        expected = [[tile_code(self.city.grid[x][y]) for y in range(minimap.height)] for x in range(minimap.width)]
+        np.testing.assert_array_equal(minimap.codes, expected)
+        self.assertEqual(tuple(minimap.pixels[3, 4]), CATEGORY_COLORS["Power"])
+        self.assertEqual(tuple(minimap.pixels[11, 7]), CATEGORY_COLORS["Housing"])
+        self.assertEqual(tuple(minimap.pixels[0, 0]), EMPTY_COLOR)
+
+    def test_only_marked_rows_refresh(self):
+        self.assertEqual(self.minimap.refresh(), []) # Nothing changed
+        self.city.add_building("HABITAT_SMALL", (10, 6))
+        self.minimap.mark_building(self.city.building_at((10, 6)))
+        self.assertEqual(self.minimap.refresh(), [6, 7])
+        habitat = self.city.building_at((10, 6))
+        self.assertEqual(self.minimap.codes[10, 6], 1 + 2 * habitat.type_id)
+
+        self.city.index.set_operational(habitat, False)
+        self.minimap.mark_building(habitat)
+        self.minimap.refresh()
+        self.assertEqual(self.minimap.codes[11, 7], 2 + 2 * habitat.type_id)
+        self.assertEqual(tuple(self.minimap.pixels[11, 7]), OFFLINE_COLOR)
+
+        self.city.remove_building((10, 6))
+        self.minimap.mark_building(habitat)
+        self.assertEqual(self.minimap.refresh(), [6, 7])
+        self.assertFalse(self.minimap.codes.any())
+
+    def test_lookup_table_covers_every_type(self):
+        lut = code_colors(get_catalog())
+        self.assertEqual(lut.shape, (1 + 2 * len(get_catalog().specs), 3))
+        self.assertTrue((lut[2::2] == OFFLINE_COLOR).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from city_builder.city import City
+from city_builder.events import OperationalChanged
+
+try:
+    import numpy as np
+    from city_builder.overlays import (
+        OverlayCache, overlay_values, render_overlay, DIVERGING_LUT, SEQUENTIAL_LUT
+    )
+except ImportError: # numpy is optional
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestOverlays(unittest.TestCase):
+    def setUp(self):
+        self.city = City()
+        self.city.credits = 100000
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("HABITAT_SMALL", (4, 4))
+
+    def test_values_cover_footprints(self):
+        values, covered = overlay_values(self.city, "power")
+        self.assertEqual(values.shape, (len(self.city.grid), len(self.city.grid[0])))
+        self.assertEqual(values[0, 0], 50)
+        self.assertTrue((values[4:6, 4:6] == -10).all())
+        self.assertEqual(int(covered.sum()), 5)
+        values, _ = overlay_values(self.city, "capacity")
+        self.assertTrue((values[4:6, 4:6] == 50).all())
+
+    def test_colorized_through_lookup_tables(self):
+        image = render_overlay(self.city, "power")
+        self.assertEqual((image.low, image.high), (-10, 50))
+        self.assertEqual(tuple(image.rgb[0, 0]), tuple(DIVERGING_LUT[255])) # The strongest generator
+        self.assertEqual(tuple(image.rgb[4, 4]), tuple(DIVERGING_LUT[128 + -10 * 127 // 50]))
+        image = render_overlay(self.city, "value")
+        self.assertEqual(tuple(image.rgb[4, 4]), tuple(SEQUENTIAL_LUT[255])) # The habitat is worth the most
+
+    def test_offline_overlay(self):
+        for i in range(16): # 170 consumption against 150 supply
+            self.city.add_building("HABITAT_SMALL", (i % 12 * 2, 8 + i // 12 * 2))
+        values, covered = overlay_values(self.city, "offline")
+        offline = sum(1 for b in self.city.buildings if not b.is_operational)
+        self.assertGreater(offline, 0)
+        self.assertEqual(int((values == -1).sum()), offline * 4)
+        self.assertEqual(int(((values == 1) & covered).sum()), int(covered.sum()) - offline * 4)
+
+    def test_cache_invalidated_only_by_relevant_events(self):
+        cache = OverlayCache(self.city)
+        events = self.city.events.subscribe()
+        images = {name: cache.image(name) for name in ("power", "offline", "value")}
+        self.assertIs(cache.image("power"), images["power"]) # Cached
+
+        self.city.advance_ticks(3) # Resources change, buildings do not
+        for event in events.drain():
+            cache.handle(event)
+        self.assertIs(cache.image("power"), images["power"])
+
+        habitat = self.city.building_at((4, 4))
+        self.city.index.set_operational(habitat, False)
+        self.city.events.emit(OperationalChanged(habitat, False))
+        for event in events.drain():
+            cache.handle(event)
+        self.assertIs(cache.image("power"), images["power"])
+        self.assertIs(cache.image("value"), images["value"])
+        self.assertIsNot(cache.image("offline"), images["offline"])
+
+        self.city.add_building("SOLAR_PANEL", (10, 0))
+        for event in events.drain():
+            cache.handle(event)
+        self.assertIsNot(cache.image("power"), images["power"])
+        self.assertEqual(cache.image("power").rgb.shape[:2], (len(self.city.grid), len(self.city.grid[0])))
+
+
+if __name__ == '__main__':
+    unittest.main()
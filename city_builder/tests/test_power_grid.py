@@ -0,0 +1,75 @@
+import unittest
+from city_builder.city import City
+from city_builder.config import BUILDING_SPECS
+
+class TestPowerNetworks(unittest.TestCase):
+
+    def setUp(self):
+        self.city = City(power_network_mode=True)
+        self.city.credits = 1000000
+
+    def test_adjacent_buildings_share_a_network(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("HABITAT_SMALL", (1, 0)) # Touches the panel
+        self.city.add_building("HABITAT_SMALL", (10, 10)) # Isolated, no generator
+        networks = self.city.power_networks
+
+        self.assertEqual(len(networks), 2)
+        solar, near, far = self.city.buildings
+        self.assertIs(networks.find(solar), networks.find(near))
+        self.assertTrue(near.is_operational)
+        self.assertFalse(far.is_operational) # No base supply in network mode
+        self.assertEqual(networks.balance_of(near), (BUILDING_SPECS["SOLAR_PANEL"]["power_gen"], BUILDING_SPECS["HABITAT_SMALL"]["power_con"]))
+        self.assertEqual(self.city.total_power_generation, BUILDING_SPECS["SOLAR_PANEL"]["power_gen"])
+        self.assertEqual(self.city.max_population_capacity, BUILDING_SPECS["HABITAT_SMALL"]["population_cap"])
+
+    def test_conduits_bridge_and_removal_splits(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        for x in range(1, 5):
+            self.city.add_building("POWER_CONDUIT", (x, 0))
+        self.city.add_building("HABITAT_SMALL", (5, 0))
+        habitat = self.city.building_at((5, 0))
+        self.assertEqual(len(self.city.power_networks), 1)
+        self.assertTrue(habitat.is_operational)
+
+        self.city.remove_building((2, 0)) # Cut the conduit line
+        self.assertEqual(len(self.city.power_networks), 2)
+        self.assertFalse(habitat.is_operational)
+
+        self.city.add_building("POWER_CONDUIT", (2, 0)) # Repair it
+        self.assertEqual(len(self.city.power_networks), 1)
+        self.assertTrue(habitat.is_operational)
+
+    def test_shedding_is_per_network(self):
+        # Network A: one panel (50) and six habitats (60) -> one habitat shed
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        for i in range(6):
+            self.city.add_building("HABITAT_SMALL", (1 + 2 * i, 0))
+        # Network B: one panel and one habitat -> fully powered
+        self.city.add_building("SOLAR_PANEL", (0, 10))
+        self.city.add_building("HABITAT_SMALL", (1, 10))
+
+        offline = [b for b in self.city.buildings if not b.is_operational]
+        self.assertEqual(len(offline), 1)
+        self.assertEqual(offline[0].position[1], 0)
+        self.assertGreaterEqual(self.city.net_power, 0)
+
+    def test_many_networks(self):
+        for x in range(0, 24, 2):
+            for y in range(0, 14, 2):
+                self.city.add_building("SOLAR_PANEL", (x, y))
+        self.assertEqual(len(self.city.power_networks), 12 * 7)
+        self.city.remove_building((0, 0))
+        self.assertEqual(len(self.city.power_networks), 12 * 7 - 1)
+
+    def test_save_load_keeps_mode_and_networks(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("HABITAT_SMALL", (1, 0))
+        loaded = City.from_dict(self.city.to_dict())
+        self.assertIsNotNone(loaded.power_networks)
+        self.assertEqual(len(loaded.power_networks), 1)
+        self.assertNotIn("power_network_mode", City().to_dict()) # Default saves are unchanged
+
+
+if __name__ == '__main__':
+    unittest.main()
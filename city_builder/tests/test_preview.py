@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from city_builder.city import City
+
+
+def shed_positions(buildings):
+    return sorted(b.position for b in buildings)
+
+
+class TestPreview(unittest.TestCase):
+    def build_city(self, power_network_mode):
+        city = City(power_network_mode=power_network_mode)
+        city.credits = 10 ** 7
+        rng = random.Random(7)
+        types = ["SOLAR_PANEL", "HABITAT_SMALL", "HABITAT_SMALL", "POWER_CONDUIT", "ORE_MINE_BASIC"]
+        for _ in range(60):
+            city.add_building(rng.choice(types), (rng.randrange(20), rng.randrange(12)))
+        return city
+
+    def assert_matches_real_placement(self, city, building_type, position):
+        before = city.to_dict()
+        version, credits = city.version, city.credits
+        operational = [b.is_operational for b in city.buildings]
+        preview = city.preview_add(building_type, position)
+        # No side effects on the parent or its buildings
+        self.assertEqual(city.to_dict(), before)
+        self.assertEqual((city.version, city.credits), (version, credits))
+        self.assertEqual([b.is_operational for b in city.buildings], operational)
+
+        real = City.from_dict(before)
+        real_before_net, real_before_capacity = real.net_power, real.max_population_capacity
+        success, message = real.add_building(building_type, position)
+        self.assertEqual(preview.possible, success, message)
+        if not success:
+            self.assertEqual(preview.message, message)
+            return
+        self.assertEqual(preview.net_power_delta, real.net_power - real_before_net)
+        self.assertEqual(preview.capacity_delta, real.max_population_capacity - real_before_capacity)
+        self.assertEqual(shed_positions(preview.projection.shed),
+                         shed_positions(b for b in real.buildings if not b.is_operational))
+
+    def test_preview_matches_real_placement(self):
+        for mode in (False, True):
+            city = self.build_city(mode)
+            rng = random.Random(11)
+            for _ in range(40):
+                with self.subTest(mode=mode):
+                    building_type = rng.choice(["SOLAR_PANEL", "HABITAT_SMALL", "POWER_CONDUIT", "NOPE"])
+                    self.assert_matches_real_placement(city, building_type, (rng.randrange(25), rng.randrange(16)))
+
+    def test_preview_reports_shed_consumers(self):
+        city = City()
+        city.credits = 10 ** 6
+        for x in range(0, 20, 2):
+            city.add_building("HABITAT_SMALL", (x, 0))
+        self.assertTrue(all(b.is_operational for b in city.buildings)) # 100 base power covers ten habitats
+        preview = city.preview_add("ORE_MINE_BASIC", (0, 4))
+        self.assertTrue(preview.possible)
+        self.assertEqual(len(preview.newly_shed), 1) # The mine itself is the heaviest consumer
+        self.assertIn("Sheds 1", str(preview))
+
+        preview = city.preview_add("SOLAR_PANEL", (0, 4))
+        self.assertEqual(preview.net_power_delta, 50)
+        self.assertEqual(preview.cost, 500)
+
+        city.add_building("ORE_MINE_BASIC", (0, 4))
+        self.assertFalse(city.building_at((0, 4)).is_operational)
+        preview = city.preview_add("SOLAR_PANEL", (4, 4))
+        self.assertEqual([b.position for b in preview.newly_restored], [(0, 4)]) # A generator brings it back
+        self.assert_matches_real_placement(city, "SOLAR_PANEL", (4, 4))
+
+    def test_fork_copies_only_what_it_changes(self):
+        city = City()
+        city.credits = 10 ** 6
+        city.add_building("SOLAR_PANEL", (0, 0))
+        fork = city.fork()
+        self.assertTrue(fork.add_building("HABITAT_SMALL", (3, 3))[0])
+        self.assertTrue(fork.remove_building((0, 0))[0])
+        self.assertEqual(sorted(fork._columns), [0, 3, 4]) # Only the touched grid columns were copied
+        self.assertIs(fork._columns.get(1), None)
+        self.assertIsNotNone(city.building_at((0, 0)))
+        self.assertIsNone(city.building_at((3, 3)))
+        self.assertEqual([b.type for b in fork.buildings], ["HABITAT_SMALL"])
+        self.assertEqual(fork.add_building("SOLAR_PANEL", (4, 4)), (False, "Space already occupied."))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from city_builder.profiler import FrameProfiler, RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wrapped_ring(self):
+        ring = RingBuffer(4)
+        for value in range(1, 7): # 1 and 2 are overwritten
+            ring.append(float(value))
+        self.assertEqual(ring.count, 4)
+        self.assertEqual(ring.values(), [3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(ring.latest(), 6.0)
+        self.assertEqual(ring.percentiles(0, 50, 99, 100), (3.0, 5.0, 6.0, 6.0))
+
+    def test_percentiles_empty_and_partial(self):
+        ring = RingBuffer(8)
+        self.assertEqual(ring.percentiles(50, 95), (0.0, 0.0))
+        for value in (9.0, 1.0, 5.0):
+            ring.append(value)
+        self.assertEqual(ring.percentiles(50, 95), (5.0, 9.0))
+
+    def test_histogram(self):
+        ring = RingBuffer(8)
+        for value in (0.0, 0.9, 1.0, 2.5, 3.99, 4.0, 50.0):
+            ring.append(value)
+        self.assertEqual(ring.histogram(4, 4.0), [2, 1, 1, 3]) # Samples past the range land in the last bin
+        self.assertEqual(ring.histogram(4, 0), [0, 0, 0, 0])
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = FrameProfiler(history=16)
+        self.profiler.toggle()
+
+    def frame(self, *names):
+        self.profiler.begin_frame()
+        for name in names:
+            with self.profiler.section(name):
+                pass
+        self.profiler.end_frame()
+
+    def test_disabled_records_nothing(self):
+        self.profiler.toggle()
+        self.frame("update")
+        self.assertEqual(self.profiler.frame_times.count, 0)
+        self.assertEqual(self.profiler.phase_order, [])
+
+    def test_missing_sections_back_filled(self):
+        self.frame("update")
+        self.frame("update", "draw")
+        self.frame("draw")
+        self.assertEqual(self.profiler.phase_order, ["update", "draw"])
+        update = self.profiler.phases["update"].values()
+        draw = self.profiler.phases["draw"].values()
+        self.assertEqual(len(update), 3)
+        self.assertEqual(len(draw), 3) # Aligned with frame_times
+        self.assertEqual(draw[0], 0.0) # Before "draw" was first seen
+        self.assertEqual(update[2], 0.0) # Absent from the last frame
+        self.assertEqual(self.profiler.stats("missing"), {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0})
+
+    def test_export_csv(self):
+        self.frame("update")
+        self.frame("update", "draw")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.profiler.export_csv(os.path.join(temp_dir, "traces", "trace.csv"))
+            with open(path, newline='') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["frame", "frame_ms", "update_ms", "draw_ms"])
+        self.assertEqual([row[0] for row in rows[1:]], ["1", "2"])
+        self.assertTrue(all(len(row) == 4 for row in rows[1:]))
+        self.assertEqual(rows[1][3], "0.0000")
+        self.assertAlmostEqual(float(rows[2][1]), self.profiler.frame_times.latest(), places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from city_builder.city import City
+from city_builder.config import REGION_ORE_PRICE, REGION_ORE_RESERVE, REGION_POWER_PRICE
+
+try:
+    import numpy as np
+    from city_builder.region import (
+        Region, settle, _pro_rata, STATE_COLUMNS, CREDITS, ORE, POWER_BALANCE,
+        CREDITS_DELTA, ORE_DELTA, POWER_IMPORT
+    )
+except ImportError: # numpy is optional
+    np = None
+
+
+def make_state(rows):
+    """rows: (credits, ore, power_balance) per city."""
+    state = np.zeros((len(rows), len(STATE_COLUMNS)), dtype=np.int64)
+    for i, (credits, ore, balance) in enumerate(rows):
+        state[i, CREDITS], state[i, ORE], state[i, POWER_BALANCE] = credits, ore, balance
+    return state
+
+
+def make_cities():
+    """A power exporter, a city short of power, an ore-rich city and a plain one."""
+    exporter, importer, miner, plain = City(), City(), City(), City()
+    for city in (exporter, importer, miner, plain):
+        city.credits = 100000
+    for x in range(4):
+        exporter.add_building("SOLAR_PANEL", (x, 0))
+    for i in range(12): # 120 consumption against the 100 base supply
+        importer.add_building("HABITAT_SMALL", (i * 2, 0))
+    miner.ore = REGION_ORE_RESERVE + 400
+    plain.ore = REGION_ORE_RESERVE - 100
+    return [exporter, importer, miner, plain]
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestSettlement(unittest.TestCase):
+
+    def test_pro_rata_is_exact(self):
+        shares = _pro_rata(np.array([1, 1, 1], dtype=np.int64), 2)
+        np.testing.assert_array_equal(shares, [1, 1, 0]) # Ties go to the lowest index
+        shares = _pro_rata(np.array([30, 10, 0, 60], dtype=np.int64), 7)
+        self.assertEqual(int(shares.sum()), 7)
+        self.assertTrue(np.all(shares <= [30, 10, 0, 60]))
+        np.testing.assert_array_equal(_pro_rata(np.zeros(3, dtype=np.int64), 5), [0, 0, 0])
+
+    def test_power_flows_to_shortfall(self):
+        state = make_state([(1000, REGION_ORE_RESERVE, 50), (1000, REGION_ORE_RESERVE, -20),
+                            (1000, REGION_ORE_RESERVE, -20)])
+        deltas, totals = settle(state)
+        self.assertEqual(totals["power"], 40)
+        np.testing.assert_array_equal(deltas[:, POWER_IMPORT], [-40, 20, 20])
+        np.testing.assert_array_equal(deltas[:, CREDITS_DELTA], np.array([40, -20, -20]) * REGION_POWER_PRICE)
+
+    def test_buyers_limited_by_credits(self):
+        state = make_state([(0, REGION_ORE_RESERVE, 50), (3 * REGION_POWER_PRICE, REGION_ORE_RESERVE, -20)])
+        deltas, totals = settle(state)
+        self.assertEqual(totals["power"], 3)
+        self.assertEqual(deltas[1, POWER_IMPORT], 3)
+
+    def test_power_charged_per_tick(self):
+        state = make_state([(1000, REGION_ORE_RESERVE, 50), (1000, REGION_ORE_RESERVE, -20)])
+        deltas, totals = settle(state, ticks=10)
+        self.assertEqual(totals["power"], 20)
+        np.testing.assert_array_equal(deltas[:, CREDITS_DELTA], np.array([20, -20]) * REGION_POWER_PRICE * 10)
+        # A buyer can only import what it can pay for over every tick of the step
+        state = make_state([(0, REGION_ORE_RESERVE, 50), (30 * REGION_POWER_PRICE, REGION_ORE_RESERVE, -20)])
+        deltas, totals = settle(state, ticks=10)
+        self.assertEqual(deltas[1, POWER_IMPORT], 3)
+
+    def test_ore_conserved(self):
+        state = make_state([(0, REGION_ORE_RESERVE + 90, 0), (100000, REGION_ORE_RESERVE - 50, 0),
+                            (100000, REGION_ORE_RESERVE - 70, 0)])
+        deltas, totals = settle(state)
+        self.assertEqual(totals["ore"], 90)
+        self.assertEqual(int(deltas[:, ORE_DELTA].sum()), 0)
+        self.assertEqual(int(deltas[:, CREDITS_DELTA].sum()), 0)
+        self.assertEqual(deltas[0, CREDITS_DELTA], 90 * REGION_ORE_PRICE)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestRegion(unittest.TestCase):
+
+    def test_trade_keeps_importer_powered(self):
+        with Region(make_cities(), workers=0) as region:
+            self.assertGreater(region.column("unmet_power")[1], 0) # Shedding before any trade
+            region.run(3)
+            self.assertEqual(region.column("unmet_power")[1], 0)
+            self.assertEqual(region.trade_totals["power"], 20)
+            ore = region.column("ore")
+            self.assertEqual(ore[2], REGION_ORE_RESERVE + 300)
+            self.assertEqual(ore[3], REGION_ORE_RESERVE)
+
+    def test_power_network_cities_do_not_trade_power(self):
+        credits = []
+        for with_importer in (True, False):
+            networked = City(power_network_mode=True)
+            networked.credits = 100000
+            for x in range(4): # Spare generation, but power_import is ignored in network mode
+                networked.add_building("SOLAR_PANEL", (x, 0))
+            cities = [networked, make_cities()[1]] if with_importer else [networked]
+            with Region(cities, workers=0) as region:
+                region.run(3)
+                self.assertEqual(region.trade_totals["power"], 0)
+                credits.append(int(region.column("credits")[0]))
+        self.assertEqual(credits[0], credits[1]) # Not paid for power it never gave up
+
+    def test_step_and_run_cost_the_same(self):
+        credits = []
+        for batched in (False, True):
+            exporter, importer = make_cities()[:2]
+            with Region([exporter, importer], workers=0) as region:
+                region.step() # Warm-up: trade established
+                if batched:
+                    region.step(10)
+                else:
+                    region.run(10)
+                credits.append(region.column("credits").tolist())
+                self.assertEqual(region.column("unmet_power")[1], 0)
+        self.assertEqual(credits[0], credits[1])
+
+    def test_results_independent_of_worker_count(self):
+        results = []
+        for workers in (0, 2, 3):
+            with Region(make_cities(), workers=workers) as region:
+                region.run(10)
+                self.assertEqual(region.add_building(3, "SOLAR_PANEL", (5, 5))[0], True)
+                region.step(15)
+                results.append((region.city_dicts(), region.state.copy()))
+        for city_dicts, state in results[1:]:
+            self.assertEqual(city_dicts, results[0][0])
+            np.testing.assert_array_equal(state, results[0][1])
+
+    def test_worker_errors_surface(self):
+        with Region(2, workers=2) as region:
+            with self.assertRaises(RuntimeError):
+                region.add_building(1, "SOLAR_PANEL", None) # Bad position fails inside the worker
+            with self.assertRaises(IndexError):
+                region.add_building(5, "SOLAR_PANEL", (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import os
+import tempfile
+from city_builder.city import City
+from city_builder.replay import SessionRecorder, replay_session, city_checksum
+from city_builder.undo import UndoHistory
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.replay_path = os.path.join(self.temp_dir.name, "session.jsonl.gz")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def record_session(self, city: City, recorder: SessionRecorder) -> None:
+        """Plays a short scripted session, mirroring the calls main.py makes."""
+        recorder.start(city, self.replay_path)
+        for x in range(4):
+            city.add_building("SOLAR_PANEL", (x, 0))
+            recorder.place("SOLAR_PANEL", (x, 0))
+        city.add_building("HABITAT_SMALL", (0, 2))
+        recorder.place("HABITAT_SMALL", (0, 2))
+        for _ in range(10):
+            city.update_resources()
+            recorder.tick(city)
+        city.remove_building((1, 0))
+        recorder.remove((1, 0))
+        recorder.save()
+        loaded = City.from_dict(city.to_dict())
+        recorder.load(loaded)
+        city = loaded
+        for _ in range(5):
+            city.update_resources()
+            recorder.tick(city)
+        recorder.stop()
+        self.final_checksum = city_checksum(city)
+
+    def test_from_dict_round_trip_is_stable(self):
+        city = City()
+        city.add_building("SOLAR_PANEL", (0, 0))
+        city.add_building("HABITAT_SMALL", (2, 2))
+        self.assertEqual(city_checksum(City.from_dict(city.to_dict())), city_checksum(city))
+
+    def test_replay_reproduces_session(self):
+        city = City()
+        city.add_building("SOLAR_PANEL", (10, 10)) # State before recording starts is captured too
+        self.record_session(city, SessionRecorder(checkpoint_every=5))
+
+        result = replay_session(self.replay_path)
+        self.assertTrue(result.ok, result.mismatches)
+        self.assertEqual(result.ticks, 15)
+        self.assertEqual(result.commands, 8)
+        self.assertEqual(result.checkpoints_verified, 3)
+        self.assertEqual(city_checksum(result.city), self.final_checksum)
+
+    def test_replay_detects_divergence(self):
+        recorder = SessionRecorder(checkpoint_every=1)
+        city = City()
+        recorder.start(city, self.replay_path)
+        city.update_resources()
+        city.credits += 1 # A state change the recording knows nothing about
+        recorder.tick(city)
+        recorder.stop()
+
+        result = replay_session(self.replay_path)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.mismatches[0][0], 1)
+
+    def test_undo_of_action_before_recording(self):
+        city = City()
+        history = UndoHistory()
+        history.place(city, "SOLAR_PANEL", (0, 0)) # Placed before recording starts
+        history.place(city, "HABITAT_SMALL", (2, 2))
+        history.undo(city) # Leaves a redo entry too
+        recorder = SessionRecorder(checkpoint_every=1)
+        recorder.start(city, self.replay_path, history=history)
+        for undo in (True, False, True): # Undo the panel, redo it, undo it again
+            (history.undo if undo else history.redo)(city)
+            (recorder.undo if undo else recorder.redo)()
+            city.update_resources()
+            recorder.tick(city)
+        for _ in range(2): # Redo the panel, then the habitat undone before recording
+            self.assertTrue(history.redo(city)[0])
+            recorder.redo()
+            city.update_resources()
+            recorder.tick(city)
+        recorder.stop()
+
+        result = replay_session(self.replay_path)
+        self.assertTrue(result.ok, result.mismatches)
+        self.assertEqual(result.checkpoints_verified, 5)
+        self.assertEqual(city_checksum(result.city), city_checksum(city))
+        self.assertIsNotNone(result.city.building_at((0, 0)))
+        self.assertIsNotNone(result.city.building_at((2, 2)))
+
+    def test_undo_after_remove_and_reload(self):
+        city = City()
+        history = UndoHistory()
+        for x in (0, 2, 4):
+            history.place(city, "SOLAR_PANEL", (x, 0))
+        history.remove(city, (2, 0))
+        city = City.from_dict(city.to_dict()) # Ids survive the round trip, so the history still applies
+        self.assertEqual(sorted(city.buildings_by_id), [1, 3])
+        recorder = SessionRecorder(checkpoint_every=1)
+        recorder.start(city, self.replay_path, history=history)
+        for _ in range(2): # Bring the middle panel back, then take the last one away
+            self.assertTrue(history.undo(city)[0])
+            recorder.undo()
+            city.update_resources()
+            recorder.tick(city)
+        recorder.stop()
+        self.assertEqual(sorted((b.building_id, b.position) for b in city.buildings), [(1, (0, 0)), (2, (2, 0))])
+
+        result = replay_session(self.replay_path)
+        self.assertTrue(result.ok, result.mismatches)
+        self.assertEqual(result.checkpoints_verified, 2)
+        self.assertEqual(city_checksum(result.city), city_checksum(city))
+
+    def test_recorder_inactive_is_noop(self):
+        recorder = SessionRecorder()
+        recorder.place("SOLAR_PANEL", (0, 0))
+        recorder.tick(City())
+        self.assertFalse(recorder.is_recording)
+        self.assertEqual(recorder.tick_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
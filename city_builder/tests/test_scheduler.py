@@ -0,0 +1,98 @@
+import unittest
+from city_builder.city import City
+from city_builder.buildings import Building
+from city_builder.catalog import compile_catalog
+from city_builder.config import BUILDING_SPECS
+from city_builder.scheduler import EventScheduler, PRODUCTION, UPKEEP
+
+class TestEventScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = EventScheduler()
+        self.mine = Building("ORE_MINE_BASIC", (0, 0))
+
+    def test_only_due_events_fire(self):
+        self.scheduler.schedule(self.mine, PRODUCTION, 3, 3)
+        self.assertEqual(list(self.scheduler.drain(2)), [])
+        self.assertEqual(list(self.scheduler.drain(3)), [(PRODUCTION, self.mine, 1)])
+        self.assertEqual(self.scheduler.next_due(), 6)
+
+    def test_gap_is_collapsed(self):
+        self.scheduler.schedule(self.mine, PRODUCTION, 1, 2)
+        # Due at 1, 3, 5, ..., 99 -> 50 occurrences in a single pop
+        self.assertEqual(list(self.scheduler.drain(100)), [(PRODUCTION, self.mine, 50)])
+        self.assertEqual(self.scheduler.next_due(), 101)
+
+    def test_cancel(self):
+        self.scheduler.schedule(self.mine, PRODUCTION, 1, 1)
+        self.scheduler.schedule(self.mine, UPKEEP, 1, 1)
+        self.scheduler.cancel(self.mine)
+        self.assertEqual(list(self.scheduler.drain(10)), [])
+        self.assertIsNone(self.scheduler.next_due())
+
+        self.scheduler.schedule(self.mine, PRODUCTION, 12, 1) # Re-registering starts fresh
+        self.assertEqual(list(self.scheduler.drain(12)), [(PRODUCTION, self.mine, 1)])
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.schedule(self.mine, PRODUCTION, 1, 0)
+
+
+class TestCityEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.city = City()
+        self.city.current_rank_level = BUILDING_SPECS["ORE_MINE_BASIC"]["unlock_rank"]
+        self.original_specs = BUILDING_SPECS.copy()
+
+    def tearDown(self):
+        BUILDING_SPECS.clear()
+        BUILDING_SPECS.update(self.original_specs)
+        compile_catalog()
+
+    def test_only_producers_are_scheduled(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("HABITAT_SMALL", (1, 0))
+        self.assertEqual(len(self.city.scheduler), 0)
+        self.city.add_building("ORE_MINE_BASIC", (4, 0))
+        self.assertEqual(len(self.city.scheduler), 1)
+
+    def test_production_interval_and_upkeep(self):
+        BUILDING_SPECS["SLOW_MINE"] = {
+            "name": "Slow Mine", "cost": 100, "power_con": 0, "ore_prod": 30, "production_interval": 3,
+            "upkeep": 7, "upkeep_interval": 2, "size": (1, 1), "char": "m", "unlock_rank": 0, "value": 10,
+        }
+        compile_catalog()
+        self.city.add_building("SLOW_MINE", (0, 0)) # Placed at tick 0; placement itself runs tick 1
+        ore, credits = self.city.ore, self.city.credits
+        for _ in range(5): # Ticks 2..6: yields at 3 and 6, upkeep at 2, 4 and 6
+            self.city.update_resources()
+        self.assertEqual(self.city.ore, ore + 60)
+        self.assertEqual(self.city.credits, credits - 21)
+
+    def test_save_load_keeps_event_phase(self):
+        BUILDING_SPECS["SLOW_MINE"] = {
+            "name": "Slow Mine", "cost": 100, "ore_prod": 30, "production_interval": 3,
+            "size": (1, 1), "char": "m", "unlock_rank": 0, "value": 10,
+        }
+        compile_catalog()
+        self.city.add_building("SLOW_MINE", (0, 0)) # Placed at tick 1, due at 4, 7, ...
+        self.city.update_resources()
+        loaded = City.from_dict(self.city.to_dict()) # At tick 3; a fresh schedule would be due at 6
+        self.assertEqual(loaded.tick_count, 3)
+        self.assertEqual(loaded.to_dict()["schedule"], self.city.to_dict()["schedule"])
+        ore = loaded.ore
+        loaded.update_resources()
+        self.assertEqual(loaded.ore, ore + 30)
+
+    def test_removed_building_stops_producing(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        self.city.add_building("ORE_MINE_BASIC", (2, 2))
+        self.city.remove_building((2, 2))
+        ore = self.city.ore
+        self.city.update_resources()
+        self.assertEqual(self.city.ore, ore)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import unittest
+
+from city_builder.server import CityServer, MAX_TICKS_PER_REQUEST, _parse_target, encode
+
+
+class TestCityServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = CityServer(tick_ms=0) # Ticks only on request, so the tests are deterministic
+        self.server.city.credits = 100000
+        await self.server.start(port=0)
+        self.host, self.port = self.server.address[:2]
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self.addCleanup(writer.close)
+        return reader, writer
+
+    async def request(self, reader, writer, message):
+        writer.write(encode(message))
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    async def test_commands(self):
+        reader, writer = await self.connect()
+        response = await self.request(reader, writer, {"id": 1, "cmd": "place", "type": "SOLAR_PANEL", "x": 2, "y": 3})
+        self.assertEqual(response, {"ok": True, "msg": "Solar Panel placed.", "id": 1})
+        response = await self.request(reader, writer, {"cmd": "query", "buildings": True})
+        self.assertEqual(response["state"]["net_power"], 150)
+        self.assertEqual(response["buildings"][0]["type"], "SOLAR_PANEL")
+        self.assertEqual((response["buildings"][0]["x"], response["buildings"][0]["y"]), (2, 3))
+
+        tick = self.server.city.tick_count
+        response = await self.request(reader, writer, {"cmd": "tick", "count": 10})
+        self.assertEqual(response["tick"], tick + 10)
+        response = await self.request(reader, writer, {"cmd": "remove", "x": 2, "y": 3})
+        self.assertTrue(response["ok"])
+        self.assertEqual(self.server.city.buildings, [])
+
+    async def test_errors_are_responses(self):
+        reader, writer = await self.connect()
+        writer.write(b"{oops\n")
+        response = json.loads(await reader.readline())
+        self.assertFalse(response["ok"])
+        self.assertIn("Invalid JSON", response["error"])
+        writer.write(b"\xff\xfe\n")
+        self.assertIn("Invalid JSON", json.loads(await reader.readline())["error"])
+        for command in ({"cmd": "dance"}, {"cmd": "place", "type": "SOLAR_PANEL", "x": "2", "y": 3},
+                        {"cmd": "tick", "count": 0}, {"cmd": "save", "filename": "../escape.json"}):
+            response = await self.request(reader, writer, command)
+            self.assertFalse(response["ok"])
+            self.assertIn("error", response)
+        writer.write(b"[" * 100000 + b"\n") # Deep enough to overflow the decoder's recursion
+        self.assertIn("nested too deeply", json.loads(await reader.readline())["error"])
+        response = await self.request(reader, writer, {"id": [[[[]]]], "cmd": "query"})
+        self.assertEqual(response["id"], [[[[]]]]) # The connection survived
+        response = await self.request(reader, writer, {"cmd": "place", "type": "NOPE", "x": 0, "y": 0})
+        self.assertEqual(response["ok"], False) # Rejected by the city, with its message
+        self.assertIn("NOPE", response["msg"])
+
+    async def test_batches_and_pipelining(self):
+        reader, writer = await self.connect()
+        batch = [{"id": i, "cmd": "place", "type": "SOLAR_PANEL", "x": i, "y": 0} for i in range(5)]
+        writer.write(encode(batch) + encode({"id": "q", "cmd": "query"}) + encode({"id": "t", "cmd": "tick"}))
+        await writer.drain()
+        responses = json.loads(await reader.readline())
+        self.assertEqual([r["id"] for r in responses], list(range(5)))
+        self.assertTrue(all(r["ok"] for r in responses))
+        self.assertEqual(json.loads(await reader.readline())["id"], "q") # In request order
+        self.assertEqual(json.loads(await reader.readline())["id"], "t")
+
+    async def test_batch_shares_tick_budget(self):
+        reader, writer = await self.connect()
+        tick = self.server.city.tick_count
+        half = MAX_TICKS_PER_REQUEST // 2
+        batch = [{"cmd": "tick", "count": half}] * 2 + [{"cmd": "tick", "count": 1}]
+        responses = await self.request(reader, writer, batch)
+        self.assertEqual([r["ok"] for r in responses], [True, True, False])
+        self.assertIn("per request line", responses[2]["error"])
+        self.assertEqual(self.server.city.tick_count, tick + 2 * half)
+        response = await self.request(reader, writer, {"cmd": "tick", "count": 1}) # Budget resets per line
+        self.assertTrue(response["ok"])
+
+    async def test_tick_updates_coalesce(self):
+        reader, writer = await self.connect()
+        await self.request(reader, writer, {"cmd": "subscribe"})
+        client = next(iter(self.server._clients))
+        for _ in range(50): # No chance to send in between: only the newest update survives
+            self.server.tick()
+        update = json.loads(await reader.readline())
+        self.assertEqual(update["event"], "tick")
+        self.assertEqual(update["state"]["tick"], self.server.city.tick_count)
+        self.assertEqual(client.coalesced, 49)
+
+        await self.request(reader, writer, {"cmd": "unsubscribe"})
+        self.server.tick()
+        response = await self.request(reader, writer, {"cmd": "query"}) # The next line is not an update
+        self.assertEqual(response["state"]["tick"], self.server.city.tick_count)
+
+    async def test_many_clients(self):
+        connections = [await self.connect() for _ in range(200)]
+        responses = await asyncio.gather(*(self.request(reader, writer, {"id": i, "cmd": "query"})
+                                           for i, (reader, writer) in enumerate(connections)))
+        self.assertEqual([r["id"] for r in responses], list(range(200)))
+        self.assertEqual(self.server.client_count, 200)
+
+    async def test_timed_ticks_push_updates(self):
+        server = CityServer(tick_ms=10)
+        await server.start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.address[:2])
+            writer.write(encode({"cmd": "subscribe"}))
+            self.assertEqual(json.loads(await reader.readline()), {"ok": True})
+            first = json.loads(await asyncio.wait_for(reader.readline(), 5))
+            second = json.loads(await asyncio.wait_for(reader.readline(), 5))
+            self.assertGreater(second["state"]["tick"], first["state"]["tick"])
+            writer.close()
+        finally:
+            await server.close()
+
+
+class TestParseTarget(unittest.TestCase):
+    def test_targets(self):
+        self.assertEqual(_parse_target("0.0.0.0:9000"), ("0.0.0.0", 9000, None))
+        self.assertEqual(_parse_target("unix:/tmp/city.sock"), (None, None, "/tmp/city.sock"))
+        for target in ("localhost", "localhost:http", "host:70000", "unix:"):
+            with self.subTest(target=target):
+                with self.assertRaises(ValueError):
+                    _parse_target(target)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets not supported")
+class TestUnixSocket(unittest.IsolatedAsyncioTestCase):
+    async def test_unix_socket(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        path = os.path.join(temp_dir.name, "city.sock")
+        server = CityServer(tick_ms=0)
+        await server.start(path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(encode({"cmd": "query"}))
+            response = json.loads(await reader.readline())
+            self.assertTrue(response["ok"])
+            writer.close()
+        finally:
+            await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
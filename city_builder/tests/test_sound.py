@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+import wave
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # No audio device needed
+import pygame as pg
+
+from city_builder import sound
+from city_builder.sound import SoundManager
+
+
+def write_silence(path, seconds=1.0, rate=44100):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(bytes(int(rate * seconds) * 4))
+
+
+class TestSoundManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.wav_path = os.path.join(self.tmp.name, "tone.wav")
+        write_silence(self.wav_path)
+        self.now = 0.0
+
+    def tearDown(self):
+        pg.mixer.quit()
+        sound._sound_cache.clear()
+        self.tmp.cleanup()
+
+    def make_manager(self, channels=4):
+        sound_manager = SoundManager(channels)
+        if not sound_manager.init_mixer():
+            self.skipTest("No audio device")
+        sound_manager.clock = lambda: self.now
+        sound_manager.load_sound("tone", self.wav_path)
+        return sound_manager
+
+    def test_play_before_mixer_is_opened(self):
+        pg.mixer.quit()
+        sound_manager = SoundManager()
+        self.assertFalse(sound_manager.play("ui_click")) # Startup defers the mixer; playing early is a no-op
+        self.assertFalse(pg.mixer.get_init())
+
+    def test_missing_file_is_not_fatal(self):
+        sound_manager = SoundManager()
+        sound_manager.load_sound("missing", os.path.join("no", "such", "sound.wav"))
+        self.assertIsNone(sound_manager.sounds["missing"])
+        self.assertFalse(sound_manager.play("missing"))
+
+    def test_preload_in_background_and_cache(self):
+        sound_manager = SoundManager()
+        sound_manager.preload({"tone": self.wav_path, "missing": "no_such.wav"})
+        if not sound_manager.audio_available:
+            self.skipTest("No audio device")
+        sound_manager.wait_until_loaded(5)
+        self.assertFalse(sound_manager.is_loading())
+        self.assertIsNotNone(sound_manager.sounds["tone"])
+        self.assertIsNone(sound_manager.sounds["missing"])
+
+        other = SoundManager()
+        other.load_sound("same", self.wav_path)
+        self.assertIs(other.sounds["same"], sound_manager.sounds["tone"]) # Decoded once
+
+    def test_cooldown_coalesces_bursts(self):
+        sound_manager = self.make_manager()
+        sound_manager.configure("tone", voice_limit=4, cooldown_ms=100)
+        played = [sound_manager.play("tone") for _ in range(100)] # One frame of drag-building
+        self.assertEqual(played.count(True), 1)
+        self.assertEqual(sound_manager.dropped_plays, 99)
+        self.now += 0.2
+        self.assertTrue(sound_manager.play("tone"))
+
+    def test_voice_limit_and_pool(self):
+        sound_manager = self.make_manager(channels=3)
+        sound_manager.configure("tone", voice_limit=2, cooldown_ms=0)
+        results = []
+        for _ in range(4):
+            self.now += 0.01
+            results.append(sound_manager.play("tone"))
+        self.assertEqual(results, [True, True, False, False])
+        busy = [pg.mixer.Channel(i).get_busy() for i in range(3)]
+        self.assertEqual(busy.count(True), 2) # Only reserved pool channels are used
+
+        sound_manager.configure("tone", voice_limit=10)
+        for _ in range(5):
+            self.now += 0.01
+            self.assertTrue(sound_manager.play("tone")) # Pool full: the oldest voice is replaced
+        self.assertEqual(sum(pg.mixer.Channel(i).get_busy() for i in range(3)), 3)
+
+    def test_master_volume_applies_at_play_time(self):
+        sound_manager = self.make_manager()
+        sound_manager.set_master_volume(0.5)
+        sound_manager.play("tone", volume=0.5)
+        channel = pg.mixer.Channel(0)
+        self.assertAlmostEqual(channel.get_volume(), 0.25, places=2)
+        self.assertAlmostEqual(sound_manager.sounds["tone"].get_volume(), 1.0, places=2) # Shared Sound untouched
+        sound_manager.set_master_volume(1.0)
+        self.assertAlmostEqual(channel.get_volume(), 0.5, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
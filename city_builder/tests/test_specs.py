@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from city_builder import specs
+from city_builder.config import BUILDING_SPECS, CITY_RANKS
+from city_builder.specs import CACHE_FILE, SpecError, load_specs
+
+RANKS = {"0": {"name": "Outpost", "value_needed": 0}, "1": {"name": "Hamlet", "value_needed": 100}}
+BUILDINGS = {
+    "HUT": {"name": "Hut", "cost": 10, "size": [1, 1], "char": "h", "unlock_rank": 0, "value": 5, "population_cap": 4},
+}
+
+
+class TestSpecs(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.write("ranks.json", RANKS)
+        self.write("buildings.json", BUILDINGS)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def write(self, name, table):
+        with open(os.path.join(self.data_dir, name), 'w') as f:
+            f.write(table if isinstance(table, str) else json.dumps(table))
+
+    def test_shipped_data_loads(self):
+        building_specs, city_ranks = load_specs(use_cache=False)
+        self.assertEqual(building_specs, BUILDING_SPECS)
+        self.assertEqual(city_ranks, CITY_RANKS)
+        self.assertEqual(BUILDING_SPECS["HABITAT_SMALL"]["size"], (2, 2)) # Lists become tuples
+
+    def test_load_and_convert(self):
+        building_specs, city_ranks = load_specs(self.data_dir)
+        self.assertEqual(list(city_ranks), [0, 1])
+        self.assertEqual(building_specs["HUT"]["size"], (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, CACHE_FILE)))
+
+    def test_cache_skips_parsing_until_a_file_changes(self):
+        load_specs(self.data_dir)
+        with mock.patch.object(specs, "parse_sources", side_effect=AssertionError("parsed")):
+            building_specs, _ = load_specs(self.data_dir) # Served from the cache
+        self.assertIn("HUT", building_specs)
+
+        self.write("buildings.json", {**BUILDINGS, "SHED": {**BUILDINGS["HUT"], "name": "Shed"}})
+        building_specs, _ = load_specs(self.data_dir)
+        self.assertEqual(list(building_specs), ["HUT", "SHED"])
+
+        self.write(CACHE_FILE, "not a pickle")
+        building_specs, _ = load_specs(self.data_dir) # Corrupt cache is rebuilt
+        self.assertEqual(list(building_specs), ["HUT", "SHED"])
+
+    def test_extra_building_files_merge_in_name_order(self):
+        self.write("buildings_z.json", {"ZED": {**BUILDINGS["HUT"], "name": "Zed"}})
+        self.write("buildings_a.toml", '[ALPHA]\nname = "Alpha"\ncost = 1\nsize = [1, 2]\nchar = "a"\nunlock_rank = 1\nvalue = 1\n')
+        self.write("notes.json", {"IGNORED": {}})
+        building_specs, _ = load_specs(self.data_dir, use_cache=False)
+        expected = ["HUT", "ZED"] if specs.tomllib is None else ["HUT", "ALPHA", "ZED"]
+        self.assertEqual(list(building_specs), expected)
+
+    def test_validation_errors(self):
+        cases = [
+            ("buildings.json", {"HUT": {**BUILDINGS["HUT"], "power_cons": 5}}), # Unknown key (typo)
+            ("buildings.json", {"HUT": {**BUILDINGS["HUT"], "cost": "10"}}),
+            ("buildings.json", "{not json"),
+            ("buildings_more.json", BUILDINGS), # Duplicate type
+            ("ranks.json", {"0": {"name": "A", "value_needed": 10}, "1": {"name": "B", "value_needed": 5}}),
+            ("ranks.json", {"first": {"name": "A", "value_needed": 0}}),
+        ]
+        for name, table in cases:
+            with self.subTest(name=name, table=table):
+                self.tearDown() # Fresh data directory per case
+                self.setUp()
+                self.write(name, table)
+                with self.assertRaises(SpecError):
+                    load_specs(self.data_dir)
+
+    def test_structure_errors_name_file_and_key(self):
+        cases = [
+            ("buildings.json", [BUILDINGS["HUT"]], "buildings.json"), # Top level not a table
+            ("buildings.json", {"HUT": "hut"}, "HUT"),
+            ("buildings.json", {"HUT": {**BUILDINGS["HUT"], "size": 2}}, "size"),
+            ("buildings.json", {"HUT": {**BUILDINGS["HUT"], "char": 7}}, "char"),
+            ("ranks.json", [RANKS["0"]], "ranks.json"),
+            ("ranks.json", {"0": "Outpost"}, "'0'"),
+        ]
+        for name, table, key in cases:
+            with self.subTest(name=name, table=table):
+                self.tearDown()
+                self.setUp()
+                self.write(name, table)
+                with self.assertRaises(SpecError) as caught:
+                    load_specs(self.data_dir, use_cache=False)
+                self.assertIn(name, str(caught.exception))
+                self.assertIn(key, str(caught.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from city_builder.city import City
+from city_builder.replay import SessionRecorder, city_checksum, replay_session
+from city_builder.speed import SimulationClock
+
+
+def build_city() -> City:
+    city = City()
+    city.credits = 100000
+    city.add_building("SOLAR_PANEL", (0, 0))
+    city.add_building("HABITAT_SMALL", (2, 0))
+    city.add_building("ORE_MINE_BASIC", (6, 0))
+    city.credits = 100000
+    city.recalculate()
+    return city
+
+
+class TestAdvanceTicks(unittest.TestCase):
+    def test_batch_matches_single_ticks(self):
+        single, batched = build_city(), build_city()
+        for _ in range(37):
+            single.update_resources()
+        batched.advance_ticks(30)
+        batched.advance_ticks(7)
+        self.assertEqual(batched.tick_count, single.tick_count)
+        self.assertEqual(city_checksum(batched), city_checksum(single))
+        self.assertEqual(batched.to_dict(), single.to_dict())
+
+    def test_zero_ticks_is_a_no_op(self):
+        city = build_city()
+        checksum = city_checksum(city)
+        city.advance_ticks(0)
+        self.assertEqual(city_checksum(city), checksum)
+
+
+class TestSimulationClock(unittest.TestCase):
+    def setUp(self):
+        self.city = build_city()
+        self.start_tick = self.city.tick_count # add_building runs a tick per placement
+
+    def test_paused_runs_no_ticks(self):
+        clock = SimulationClock(mode=0)
+        self.assertEqual(clock.advance(self.city, 5000), 0)
+        self.assertEqual(self.city.tick_count, self.start_tick)
+
+    def test_toggle_pause_resumes_previous_speed(self):
+        clock = SimulationClock(mode=2)
+        clock.toggle_pause()
+        self.assertEqual(clock.label, "Paused")
+        clock.toggle_pause()
+        self.assertEqual(clock.label, "4x")
+
+    def test_speed_multiplies_tick_rate(self):
+        clock = SimulationClock(mode=2, budget_ms=1000) # 4x
+        ran = sum(clock.advance(self.city, 100) for _ in range(10)) # One second of frames
+        self.assertEqual(ran, 4)
+        self.assertEqual(self.city.tick_count - self.start_tick, 4)
+
+    def test_backlog_is_capped(self):
+        clock = SimulationClock(mode=1, budget_ms=1000)
+        self.assertEqual(clock.advance(self.city, 60000), 1) # A long stall catches up one second, not sixty
+
+    def test_max_speed_stops_at_budget(self):
+        batches = []
+        clock = SimulationClock(mode=4, budget_ms=5)
+        ran = clock.advance(self.city, 16, batches.append)
+        self.assertGreater(ran, 0)
+        self.assertEqual(sum(batches), ran)
+        self.assertEqual(self.city.tick_count - self.start_tick, ran)
+        self.assertIn("max", clock.status_text())
+
+    def test_batched_recording_replays(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "session.jsonl")
+            recorder = SessionRecorder(checkpoint_every=10)
+            recorder.start(self.city, path)
+            clock = SimulationClock(mode=3, budget_ms=1000) # 16x
+            ran = 0
+            for _ in range(20):
+                ran += clock.advance(self.city, 250, lambda count: recorder.tick(self.city, count))
+            recorder.stop()
+
+            result = replay_session(path)
+            self.assertTrue(result.ok, [str(m) for m in result.mismatches])
+            self.assertEqual(result.ticks, ran)
+            self.assertGreater(result.checkpoints_verified, 0)
+            self.assertEqual(city_checksum(result.city), city_checksum(self.city))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import csv
+import os
+import tempfile
+from city_builder.config import BUILDING_SPECS, CITY_RANKS
+from city_builder.sweep import SweepAggregate, expand_grid, applied_overrides, simulate, run_sweep
+
+SCENARIO = {
+    "name": "test",
+    "ticks": 50,
+    "builds": [[0, "SOLAR_PANEL", 0, 0], [0, "HABITAT_SMALL", 1, 0], [10, "HABITAT_SMALL", 3, 0]],
+}
+
+class TestSweep(unittest.TestCase):
+
+    def test_expand_grid(self):
+        runs = expand_grid({"b": [1, 2], "a": ["x", "y", "z"]})
+        self.assertEqual(len(runs), 6)
+        self.assertIn({"a": "z", "b": 2}, runs)
+
+    def test_applied_overrides_restore_config(self):
+        original_cost = BUILDING_SPECS["SOLAR_PANEL"]["cost"]
+        original_threshold = CITY_RANKS[2]["value_needed"]
+        overrides = {"BUILDING_SPECS.SOLAR_PANEL.cost": 1, "CITY_RANKS.2.value_needed": 6000,
+                     "BUILDING_SPECS.SOLAR_PANEL.new_field": 3, "population_growth_rate": 0.5}
+        with applied_overrides(overrides) as city_attributes:
+            self.assertEqual(BUILDING_SPECS["SOLAR_PANEL"]["cost"], 1)
+            self.assertEqual(CITY_RANKS[2]["value_needed"], 6000)
+            self.assertEqual(city_attributes, {"population_growth_rate": 0.5})
+        self.assertEqual(BUILDING_SPECS["SOLAR_PANEL"]["cost"], original_cost)
+        self.assertEqual(CITY_RANKS[2]["value_needed"], original_threshold)
+        self.assertNotIn("new_field", BUILDING_SPECS["SOLAR_PANEL"])
+
+    def test_simulate_summary(self):
+        cheap = simulate(SCENARIO, {"BUILDING_SPECS.SOLAR_PANEL.cost": 100})
+        pricey = simulate(SCENARIO, {"BUILDING_SPECS.SOLAR_PANEL.cost": 900})
+        self.assertEqual(cheap["ticks"], 50)
+        self.assertEqual(cheap["failed_builds"], 0)
+        self.assertEqual(cheap["final_credits"] - pricey["final_credits"], 800)
+
+        starved = simulate(SCENARIO, {"BUILDING_SPECS.HABITAT_SMALL.power_con": 500})
+        self.assertGreater(starved["power_deficit_ticks"], 0)
+
+        with self.assertRaises(ValueError):
+            simulate(SCENARIO, {"no_such_attribute": 1})
+
+    def test_run_sweep_streams_csv(self):
+        grid = {"BUILDING_SPECS.SOLAR_PANEL.cost": [300, 500, 700], "population_growth_rate": [0.01, 0.1]}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "sweep.csv")
+            aggregate = run_sweep(SCENARIO, grid, path, max_workers=2, chunk_size=2, target_rank=1)
+            with open(path, newline='') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(aggregate.runs, 6)
+        self.assertIn("time_to_rank_1", rows[0])
+        by_key = {(row["key"], row["value"]): row for row in aggregate.rows()}
+        self.assertEqual(by_key[("population_growth_rate", 0.1)]["runs"], 3)
+
+    def test_aggregate_unhashable_values(self):
+        aggregate = SweepAggregate(target_rank=1)
+        for size in ([1, 1], [2, 2], [1, 1]): # List values are valid in grid.json
+            aggregate.add({"BUILDING_SPECS.SOLAR_PANEL.size": size, "power_deficit_ticks": 2, "time_to_rank_1": 10},
+                          ["BUILDING_SPECS.SOLAR_PANEL.size"])
+        rows = aggregate.rows()
+        self.assertEqual([(row["value"], row["runs"]) for row in rows], [([1, 1], 2), ([2, 2], 1)])
+        self.assertEqual(rows[0]["mean_time_to_target"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
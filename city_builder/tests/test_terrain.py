@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from city_builder.city import City
+
+try:
+    import numpy as np
+    from city_builder.terrain import Terrain, generate_terrain, LAND, WATER, ROCK, RICHNESS_NORMAL
+except ImportError: # numpy is optional
+    np = None
+
+SEED = 7
+
+
+def find_footprint(terrain, kind, size=(2, 2)):
+    """Top-left of the first footprint made only of `kind` tiles."""
+    for x in range(terrain.width - size[0] + 1):
+        for y in range(terrain.height - size[1] + 1):
+            if (terrain.kind[x:x + size[0], y:y + size[1]] == kind).all():
+                return (x, y)
+    raise AssertionError(f"No {size} footprint of kind {kind}")
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestTerrain(unittest.TestCase):
+    def setUp(self):
+        # Cities cache their terrain under the working directory
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(temp_dir.name)
+
+    def test_generation_is_seeded(self):
+        kind, richness = generate_terrain(SEED, 128, 96)
+        self.assertEqual(kind.shape, (128, 96))
+        self.assertEqual((kind.dtype, richness.dtype), (np.uint8, np.uint8))
+        again = generate_terrain(SEED, 128, 96)
+        np.testing.assert_array_equal(kind, again[0])
+        np.testing.assert_array_equal(richness, again[1])
+        self.assertFalse(np.array_equal(kind, generate_terrain(SEED + 1, 128, 96)[0]))
+        self.assertEqual(set(np.unique(kind)), {LAND, WATER, ROCK})
+        self.assertTrue((richness[kind == WATER] == 0).all())
+        self.assertGreater(richness[kind == ROCK].mean(), richness[kind == LAND].mean())
+
+    def test_load_caches_per_seed_and_size(self):
+        first = Terrain.load(SEED, 64, 32, "cache")
+        self.assertEqual(os.listdir("cache"), [f"terrain_v1_{SEED}_64x32.npz"])
+        second = Terrain.load(SEED, 64, 32, "cache")
+        np.testing.assert_array_equal(first.kind, second.kind)
+        np.testing.assert_array_equal(first.richness, second.richness)
+        Terrain.load(SEED, 32, 32, "cache")
+        self.assertEqual(len(os.listdir("cache")), 2)
+
+    def test_placement_respects_terrain(self):
+        city = City(terrain_seed=SEED)
+        city.credits = 100000
+        water = find_footprint(city.terrain, WATER)
+        rock = find_footprint(city.terrain, ROCK)
+        self.assertEqual(city.add_building("HABITAT_SMALL", water), (False, "Cannot build on water."))
+        self.assertEqual(city.add_building("HABITAT_SMALL", rock), (False, "Only mines can be built on rock."))
+        self.assertFalse(city.preview_add("HABITAT_SMALL", rock).possible)
+        self.assertTrue(city.add_building("ORE_MINE_BASIC", rock)[0])
+        self.assertTrue(city.add_building("HABITAT_SMALL", find_footprint(city.terrain, LAND))[0])
+
+    def test_mine_output_scales_with_richness(self):
+        city = City(terrain_seed=SEED)
+        city.credits = 100000
+        city.add_building("SOLAR_PANEL", find_footprint(city.terrain, LAND, (1, 1)))
+        position = find_footprint(city.terrain, ROCK)
+        city.add_building("ORE_MINE_BASIC", position)
+        mine = city.building_at(position)
+        richness = city.terrain.richness_under(mine)
+        self.assertGreater(richness, 0)
+        ore = city.ore
+        for _ in range(mine.production_interval * 3):
+            city.update_resources()
+        self.assertEqual(city.ore - ore, 3 * (mine.ore_production * richness // RICHNESS_NORMAL))
+
+    def test_save_keeps_seed(self):
+        city = City(terrain_seed=SEED)
+        loaded = City.from_dict(city.to_dict())
+        self.assertEqual(loaded.terrain.seed, SEED)
+        self.assertIsNone(City.from_dict(City().to_dict()).terrain)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+
+from city_builder.buildings import Building
+from city_builder.city import City
+from city_builder.replay import SessionRecorder, city_checksum, replay_session
+from city_builder.undo import UndoHistory
+
+
+class TestUndo(unittest.TestCase):
+    def setUp(self):
+        self.city = City()
+        self.city.credits = 100000
+        self.city.recalculate()
+        self.history = UndoHistory()
+
+    def test_undo_redo_place(self):
+        credits = self.city.credits
+        success, _ = self.history.place(self.city, "SOLAR_PANEL", (0, 0))
+        self.assertTrue(success)
+        building_id = self.city.building_at((0, 0)).building_id
+        income = self.city.credits - (credits - 500) # add_building ran a tick
+
+        success, message = self.history.undo(self.city)
+        self.assertTrue(success, message)
+        self.assertIsNone(self.city.building_at((0, 0)))
+        self.assertEqual(self.city.credits, credits + income) # Cost refunded in full; undo runs no tick
+        self.assertFalse(self.history.can_undo())
+
+        success, _ = self.history.redo(self.city)
+        self.assertTrue(success)
+        self.assertEqual(self.city.building_at((0, 0)).building_id, building_id)
+        self.assertEqual(self.city.credits, credits + income - 500)
+        self.assertFalse(self.history.redo(self.city)[0])
+
+    def test_undo_remove_restores_building_and_refund(self):
+        self.history.place(self.city, "HABITAT_SMALL", (2, 2))
+        building_id = self.city.building_at((2, 2)).building_id
+        self.history.remove(self.city, (3, 3)) # Any tile of the footprint
+        credits = self.city.credits
+        self.history.undo(self.city)
+        habitat = self.city.building_at((3, 3))
+        self.assertEqual(habitat.position, (2, 2))
+        self.assertEqual(habitat.building_id, building_id)
+        self.assertIs(self.city.buildings_by_id[building_id], habitat)
+        self.assertEqual(self.city.credits, credits - 500) # Refund taken back
+        self.assertEqual(self.city.max_population_capacity, 50)
+
+    def test_batch_undoes_as_unit(self):
+        with self.history.batch():
+            for x in range(5):
+                self.history.place(self.city, "SOLAR_PANEL", (x, 0))
+        self.history.place(self.city, "SOLAR_PANEL", (0, 5))
+        self.history.undo(self.city)
+        self.assertEqual(len(self.city.buildings), 5)
+        success, message = self.history.undo(self.city)
+        self.assertTrue(success)
+        self.assertIn("5 actions", message)
+        self.assertEqual(self.city.buildings, [])
+        self.history.redo(self.city)
+        self.assertEqual(len(self.city.buildings), 5)
+
+    def test_new_action_clears_redo_and_limit_bounds_memory(self):
+        history = UndoHistory(limit=3)
+        for x in range(6):
+            history.place(self.city, "SOLAR_PANEL", (x, 0))
+        undone = 0
+        while history.undo(self.city)[0]:
+            undone += 1
+        self.assertEqual(undone, 3)
+        self.assertEqual(len(self.city.buildings), 3)
+        history.place(self.city, "SOLAR_PANEL", (9, 9))
+        self.assertFalse(history.can_redo())
+
+    def test_failed_undo_rolls_back(self):
+        with self.history.batch():
+            self.history.place(self.city, "SOLAR_PANEL", (0, 0))
+            self.history.remove(self.city, (0, 0))
+        self.city.add_building("SOLAR_PANEL", (0, 0)) # Unrecorded: blocks restoring the removed panel
+        success, _ = self.history.undo(self.city)
+        self.assertFalse(success)
+        self.assertEqual(len(self.city.buildings), 1)
+        self.assertTrue(self.history.can_undo())
+
+        self.city.credits = 0
+        self.city.remove_building((0, 0))
+        self.city.credits = 0
+        self.assertFalse(self.history.undo(self.city)[0]) # Refund can no longer be paid back
+
+    def test_restore_rejects_id_in_use(self):
+        self.city.add_building("SOLAR_PANEL", (0, 0))
+        existing = self.city.building_at((0, 0))
+        clash = Building("SOLAR_PANEL", (4, 0))
+        clash.building_id = existing.building_id
+        success, message = self.city.restore_building(clash)
+        self.assertFalse(success)
+        self.assertIn("already in use", message)
+        self.assertIs(self.city.buildings_by_id[existing.building_id], existing)
+        self.assertIsNone(self.city.building_at((4, 0)))
+
+    def test_undo_replays(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "session.jsonl")
+            recorder = SessionRecorder(checkpoint_every=1)
+            recorder.start(self.city, path)
+            self.history.begin_batch()
+            recorder.begin_batch()
+            for x in range(3):
+                self.history.place(self.city, "SOLAR_PANEL", (x, 0))
+                recorder.place("SOLAR_PANEL", (x, 0))
+            self.history.end_batch()
+            recorder.end_batch()
+            self.history.undo(self.city)
+            recorder.undo()
+            self.history.redo(self.city)
+            recorder.redo()
+            self.history.undo(self.city)
+            recorder.undo()
+            self.city.update_resources()
+            recorder.tick(self.city)
+            recorder.stop()
+
+            result = replay_session(path)
+            self.assertTrue(result.ok, [str(m) for m in result.mismatches])
+            self.assertEqual(city_checksum(result.city), city_checksum(self.city))
+            self.assertEqual(result.city.buildings, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,40 +1,141 @@
 # Elite 1984 City Builder - UI Rendering Logic
 
+from typing import Tuple
+
 import pygame as pg
 from city_builder.config import WHITE, GREEN, RED, YELLOW, BLUE, TILE_SIZE, SCREEN_HEIGHT, SCREEN_WIDTH
 from city_builder.city import City
 from city_builder.buildings import Building, get_available_buildings # For build menu
+from city_builder.build_menu import BuildMenuList
+from city_builder.profiler import FrameProfiler
+from city_builder.events import BuildingAdded, BuildingRemoved, BuildingStatsChanged, OperationalChanged, ResourcesChanged, RankUp
+
+try:
+    from city_builder.minimap import Minimap
+except ImportError: # numpy is optional; without it there is no minimap
+    Minimap = None
+try:
+    from city_builder.overlays import OverlayCache, OVERLAY_NAMES, OVERLAY_LABELS
+except ImportError: # ... nor heatmap overlays
+    OverlayCache = None
 
 # Basic font
 FONT_NAME = None # Default system font
 UI_FONT_SIZE = 20
 GAME_FONT_SIZE = TILE_SIZE // 2
+GRAPH_PANEL_WIDTH = 260
+UI_PANEL_HEIGHT = 80
+MINIMAP_SIZE = 160 # Largest side of the minimap in pixels (at least one pixel per tile)
+VIEW_TILES = (SCREEN_WIDTH // TILE_SIZE, (SCREEN_HEIGHT - UI_PANEL_HEIGHT) // TILE_SIZE) # Tiles on screen
 
 
 class UIManager:
-    def __init__(self, screen, city: City):
+    def __init__(self, screen, city: City, profiler: FrameProfiler | None = None):
         self.screen = screen
-        self.city = city
+        self.city = None
+        self._city_events = None # Subscription to the city's change events
+        self.profiler = profiler if profiler is not None else FrameProfiler() # Times each draw_* stage when enabled
         self.ui_font = pg.font.Font(FONT_NAME, UI_FONT_SIZE)
         self.game_font = pg.font.Font(FONT_NAME, GAME_FONT_SIZE)
 
         self.build_menu_active = False
-        self.available_buildings_for_menu = []
+        self.menu_search_focused = False # Typed keys go to the search box only after / or a click on it
         self.selected_building_type = None # Stores the type_id like "SOLAR_PANEL"
+        # Projected effect of placing the ghost, recomputed only when the ghost or the city changes
+        self._ghost_preview_key = None
+        self._ghost_preview = None
+        self._ghost_preview_surf = None
+        self.sim_status: str | None = None # Speed mode and achieved ticks/s, set by the game loop
+        # History graphs (G cycles the tier); the panel is re-rendered only when the tier gains a sample
+        self.metrics = None # metrics.MetricsHistory, set by the game loop when numpy is available
+        self.graph_tier: str | None = None
+        self._graph_key = None
+        self._graph_surf = None
+        self._terrain_key = None # Terrain map rendered once per city terrain
+        self._terrain_surf = None
+        # Buildings layer and bottom panel, re-rendered only after change events mark them dirty
+        self._buildings_surf = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pg.SRCALPHA)
+        self._buildings_dirty = True
+        self._panel_surf = None
+        self._panel_dirty = True
+        self._panel_sim_status = None
+        # World tile at the top left of the screen; it only moves once the world is larger than the view
+        self.camera = (0, 0)
+        # Minimap (M toggles it; clicking it jumps the camera), kept up to date row by row from change events
+        self.minimap_active = False
+        self._minimap = None # minimap.Minimap for the current city, created when first shown
+        self._minimap_surf = None # One pixel per tile
+        self._minimap_scaled = None
+        self.minimap_rect = None
+        # Heatmap overlay (H cycles them); each overlay's image is cached until a change that affects it
+        self.overlay: str | None = None
+        self._overlays = None # overlays.OverlayCache for the current city
+        self._overlay_image = None # The OverlayImage the surfaces below were made from
+        self._overlay_surf = None
+        self._overlay_label = None
+        self.attach_city(city)
 
         # Build menu layout
         self.menu_rect = pg.Rect(50, 50, SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100)
         self.menu_item_height = 30
         self.menu_close_button_rect = pg.Rect(self.menu_rect.right - 30, self.menu_rect.top, 30, 30)
-
+        self.menu_filter_rect = pg.Rect(self.menu_rect.right - 160, self.menu_rect.top + 28, 120, 26)
+        self.menu_search_rect = pg.Rect(self.menu_rect.left + 5, self.menu_rect.top + 28,
+                                        self.menu_filter_rect.left - self.menu_rect.left - 15, 26)
+        # Scrolling list area below the title and search lines, leaving room for the scrollbar
+        list_top = self.menu_rect.top + 60
+        self.menu_list_rect = pg.Rect(self.menu_rect.left + 10, list_top, self.menu_rect.width - 30,
+                                      (self.menu_rect.bottom - 10 - list_top) // self.menu_item_height * self.menu_item_height)
+        self.menu_list = BuildMenuList(self.menu_item_height, self.menu_list_rect.height // self.menu_item_height)
+        self._menu_row_surfs = {} # (type_id, affordable) -> rendered label
+
+
+    def attach_city(self, city: City) -> None:
+        """Shows `city` (e.g. after loading a game), moving the event subscription over to it."""
+        if self._city_events is not None:
+            self.city.events.unsubscribe(self._city_events)
+        self.city = city
+        self._city_events = city.events.subscribe(BuildingAdded, BuildingRemoved, BuildingStatsChanged,
+                                                  OperationalChanged, ResourcesChanged, RankUp)
+        self._buildings_dirty = self._panel_dirty = True
+        self._minimap = None
+        self._overlays = OverlayCache(city) if OverlayCache is not None else None
+        self.camera = (0, 0)
+        if self.build_menu_active:
+            self._refresh_build_menu()
+
+    def _apply_city_events(self) -> None:
+        """Marks the layers the city's changes since the last frame affect as dirty."""
+        for event in self._city_events.drain():
+            if self._overlays is not None:
+                self._overlays.handle(event)
+            if isinstance(event, (ResourcesChanged, RankUp)):
+                self._panel_dirty = True
+                if isinstance(event, RankUp) and self.build_menu_active:
+                    self._refresh_build_menu() # Newly unlocked buildings appear in the open menu
+            else: # Building added, removed, re-statted or switched on/off
+                self._buildings_dirty = self._panel_dirty = True # The panel shows power and offline totals
+                if self._minimap is not None:
+                    self._minimap.mark_building(event.building)
 
     def toggle_build_menu(self):
         self.build_menu_active = not self.build_menu_active
+        self.menu_search_focused = False
         if self.build_menu_active:
-            self.available_buildings_for_menu = list(get_available_buildings(self.city.current_rank_level).items())
+            self._refresh_build_menu()
         else:
             self.selected_building_type = None # Clear selection when closing menu
 
+    def _refresh_build_menu(self) -> None:
+        """Re-lays out the menu rows if the rank (or the spec tables) changed since they were laid out."""
+        if self.menu_list.set_catalog(get_available_buildings(self.city.current_rank_level)):
+            self._menu_row_surfs.clear() # Labels show cost and power, which a spec reload may change
+
+    def _select_menu_row(self, index: int) -> None:
+        self.selected_building_type = self.menu_list.rows[index][0]
+        self.build_menu_active = False # Close menu on selection
+        self.menu_search_focused = False
+
     def handle_click_build_menu(self, mouse_pos):
         if not self.build_menu_active:
             return False # Menu not active
@@ -42,22 +143,69 @@ class UIManager:
         if self.menu_close_button_rect.collidepoint(mouse_pos):
             self.toggle_build_menu()
             return True
+        if self.menu_filter_rect.collidepoint(mouse_pos):
+            self.menu_list.cycle_filter()
+            return True
+        self.menu_search_focused = self.menu_search_rect.collidepoint(mouse_pos)
+        if self.menu_search_focused:
+            return True
 
-        # Check item clicks
-        for i, (type_id, spec) in enumerate(self.available_buildings_for_menu):
-            item_rect = pg.Rect(
-                self.menu_rect.left + 10,
-                self.menu_rect.top + 30 + (i * self.menu_item_height), # +30 for title/close button
-                self.menu_rect.width - 20,
-                self.menu_item_height
-            )
-            if item_rect.collidepoint(mouse_pos):
-                self.selected_building_type = type_id
-                self.build_menu_active = False # Close menu on selection
-                # print(f"Selected building: {self.selected_building_type}")
+        # Rows are a fixed height, so the clicked row is plain arithmetic
+        if self.menu_list_rect.collidepoint(mouse_pos):
+            index = self.menu_list.row_at(mouse_pos[1] - self.menu_list_rect.top)
+            if index is not None:
+                self._select_menu_row(index)
                 return True
         return False # Click was in menu area but not on an item/close
 
+    def handle_key_build_menu(self, event) -> bool:
+        """
+        Search and navigation keys while the menu is open: / (or a click on the search box)
+        focuses the search, after which typing filters by name and Backspace edits; Tab cycles
+        the category filter, arrows/PageUp/PageDown scroll, Enter picks the first listed row and
+        Escape clears the search. Returns False for keys the menu ignores, so B and Escape still
+        close it and the game hotkeys (Space, 1-5, G, H, M) work while the search is unfocused.
+        """
+        if not self.build_menu_active or event.mod & pg.KMOD_CTRL:
+            return False
+        menu_list = self.menu_list
+        if event.key == pg.K_ESCAPE:
+            if not menu_list.query and not self.menu_search_focused:
+                return False # Nothing to clear: let Escape close the menu
+            menu_list.set_query("")
+            self.menu_search_focused = False
+        elif event.key == pg.K_SLASH and not self.menu_search_focused:
+            self.menu_search_focused = True
+        elif event.key == pg.K_BACKSPACE and self.menu_search_focused:
+            menu_list.set_query(menu_list.query[:-1])
+        elif event.key == pg.K_TAB:
+            menu_list.cycle_filter()
+        elif event.key in (pg.K_UP, pg.K_DOWN):
+            menu_list.scroll_by(-1 if event.key == pg.K_UP else 1)
+        elif event.key in (pg.K_PAGEUP, pg.K_PAGEDOWN):
+            menu_list.scroll_by(-menu_list.visible_rows if event.key == pg.K_PAGEUP else menu_list.visible_rows)
+        elif event.key in (pg.K_RETURN, pg.K_KP_ENTER):
+            if menu_list.rows:
+                self._select_menu_row(menu_list.scroll)
+        elif self.menu_search_focused and event.unicode and (event.unicode.isalnum() or event.unicode == " "):
+            menu_list.set_query(menu_list.query + event.unicode)
+        else:
+            return False
+        return True
+
+    def scroll_build_menu(self, rows: int) -> None:
+        if self.build_menu_active:
+            self.menu_list.scroll_by(rows)
+
+    def _menu_row_surf(self, type_id, spec, affordable: bool) -> pg.Surface:
+        """A row label, rendered once per building type and affordability."""
+        key = (type_id, affordable)
+        surf = self._menu_row_surfs.get(key)
+        if surf is None:
+            text = f"{spec['name']} (Cost: {spec['cost']}, Pwr: {spec.get('power_gen',0)-spec.get('power_con',0)})"
+            surf = self._menu_row_surfs[key] = self.ui_font.render(text, True, WHITE if affordable else RED)
+        return surf
+
     def draw_build_menu(self):
         if not self.build_menu_active:
             return
@@ -75,61 +223,80 @@ class UIManager:
         close_text = self.ui_font.render("X", True, WHITE)
         self.screen.blit(close_text, (self.menu_close_button_rect.x + 8, self.menu_close_button_rect.y + 3))
 
-
-        # Menu items
-        for i, (type_id, spec) in enumerate(self.available_buildings_for_menu):
-            item_y = self.menu_rect.top + 30 + (i * self.menu_item_height)
-            item_rect = pg.Rect(
-                self.menu_rect.left + 10,
-                item_y,
-                self.menu_rect.width - 20,
-                self.menu_item_height
-            )
-
-            # Highlight on hover (basic)
-            mouse_pos = pg.mouse.get_pos()
-            if item_rect.collidepoint(mouse_pos):
-                pg.draw.rect(self.screen, (80, 80, 80), item_rect)
-
-
-            text = f"{spec['name']} (Cost: {spec['cost']}, Pwr: {spec.get('power_gen',0)-spec.get('power_con',0)})"
-            surf = self.ui_font.render(text, True, WHITE if self.city.credits >= spec['cost'] else RED)
-            self.screen.blit(surf, (item_rect.left + 5, item_y + 5))
+        # Search box and filter tab
+        menu_list = self.menu_list
+        if self.menu_search_focused:
+            search_text = f"Search: {menu_list.query}_  ({len(menu_list.rows)} shown)"
+        else:
+            search_text = f"[/] Search: {menu_list.query}  ({len(menu_list.rows)} shown)"
+        self.screen.blit(self.ui_font.render(search_text, True, YELLOW), (self.menu_rect.left + 10, self.menu_rect.top + 32))
+        pg.draw.rect(self.screen, YELLOW if self.menu_search_focused else (80, 80, 80), self.menu_search_rect, 1)
+        filter_surf = self.ui_font.render(f"[Tab] {menu_list.filter_name}", True, WHITE)
+        self.screen.blit(filter_surf, (self.menu_filter_rect.left + 5, self.menu_filter_rect.top + 4))
+        pg.draw.rect(self.screen, (80, 80, 80), self.menu_filter_rect, 1)
+
+        # Only the visible rows, from cached labels
+        mouse_pos = pg.mouse.get_pos()
+        hovered = None
+        if self.menu_list_rect.collidepoint(mouse_pos):
+            hovered = menu_list.row_at(mouse_pos[1] - self.menu_list_rect.top)
+        credits = self.city.credits
+        for slot, index in enumerate(menu_list.visible()):
+            type_id, spec = menu_list.rows[index]
+            item_y = self.menu_list_rect.top + slot * self.menu_item_height
+            if index == hovered:
+                pg.draw.rect(self.screen, (80, 80, 80),
+                             (self.menu_list_rect.left, item_y, self.menu_list_rect.width, self.menu_item_height))
+            self.screen.blit(self._menu_row_surf(type_id, spec, credits >= spec['cost']),
+                             (self.menu_list_rect.left + 5, item_y + 5))
+
+        # Scrollbar, when the rows do not all fit
+        if len(menu_list.rows) > menu_list.visible_rows:
+            track = self.menu_list_rect
+            thumb_h = max(10, track.height * menu_list.visible_rows // len(menu_list.rows))
+            thumb_y = track.top + (track.height - thumb_h) * menu_list.scroll // (len(menu_list.rows) - menu_list.visible_rows)
+            pg.draw.rect(self.screen, (150, 150, 150), (track.right + 2, thumb_y, 6, thumb_h))
 
 
     def draw_main_ui(self):
-        """Draws the main game UI (resource display, city rank, etc.)"""
-        ui_panel_height = 80
-        ui_panel_rect = pg.Rect(0, SCREEN_HEIGHT - ui_panel_height, SCREEN_WIDTH, ui_panel_height)
-        pg.draw.rect(self.screen, (10, 10, 30), ui_panel_rect) # Dark blue panel
-        pg.draw.line(self.screen, WHITE, (0, SCREEN_HEIGHT - ui_panel_height), (SCREEN_WIDTH, SCREEN_HEIGHT - ui_panel_height), 1)
-
-        y_offset = SCREEN_HEIGHT - ui_panel_height + 5
+        """Draws the main game UI (resource display, city rank, etc.), re-rendered only after a change."""
+        if self._panel_dirty or self.sim_status != self._panel_sim_status:
+            self._panel_surf = self._render_main_ui()
+            self._panel_dirty = False
+            self._panel_sim_status = self.sim_status
+        self.screen.blit(self._panel_surf, (0, SCREEN_HEIGHT - UI_PANEL_HEIGHT))
+
+    def _render_main_ui(self) -> pg.Surface:
+        panel = pg.Surface((SCREEN_WIDTH, UI_PANEL_HEIGHT))
+        panel.fill((10, 10, 30)) # Dark blue panel
+        pg.draw.line(panel, WHITE, (0, 0), (SCREEN_WIDTH, 0), 1)
+
+        y_offset = 5
         x_offset = 10
 
         # Credits
         credits_text = f"Credits: {self.city.credits}"
         credits_surf = self.ui_font.render(credits_text, True, GREEN)
-        self.screen.blit(credits_surf, (x_offset, y_offset))
+        panel.blit(credits_surf, (x_offset, y_offset))
         x_offset += credits_surf.get_width() + 20
 
         # Population
         pop_text = f"Pop: {self.city.population} / {self.city.max_population_capacity}"
         pop_surf = self.ui_font.render(pop_text, True, YELLOW)
-        self.screen.blit(pop_surf, (x_offset, y_offset))
+        panel.blit(pop_surf, (x_offset, y_offset))
         x_offset += pop_surf.get_width() + 20
 
         # Power
         power_color = GREEN if self.city.net_power >= 0 else RED
         power_text = f"Power: {self.city.net_power} (G:{self.city.total_power_generation} C:{self.city.total_power_consumption})"
         power_surf = self.ui_font.render(power_text, True, power_color)
-        self.screen.blit(power_surf, (x_offset, y_offset))
+        panel.blit(power_surf, (x_offset, y_offset))
         x_offset += power_surf.get_width() + 20
 
         # Ore
         ore_text = f"Ore: {self.city.ore}" # Placeholder
         ore_surf = self.ui_font.render(ore_text, True, (150, 150, 150)) # Grey
-        self.screen.blit(ore_surf, (x_offset, y_offset))
+        panel.blit(ore_surf, (x_offset, y_offset))
 
         # Second line for UI
         y_offset += UI_FONT_SIZE + 5
@@ -138,20 +305,33 @@ class UIManager:
         # City Rank
         rank_text = f"Rank: {self.city.current_rank_name} (Val: {self.city.city_value})"
         rank_surf = self.ui_font.render(rank_text, True, WHITE)
-        self.screen.blit(rank_surf, (x_offset, y_offset))
+        panel.blit(rank_surf, (x_offset, y_offset))
         x_offset += rank_surf.get_width() + 20
 
+        # Buildings shut down by a power shortage (an O(1) index lookup)
+        offline = self.city.index.count(operational=False)
+        if offline:
+            offline_surf = self.ui_font.render(f"Offline: {offline}/{self.city.index.count()}", True, RED)
+            panel.blit(offline_surf, (x_offset, y_offset))
+            x_offset += offline_surf.get_width() + 20
+
+        # Simulation speed
+        if self.sim_status:
+            speed_surf = self.ui_font.render(self.sim_status, True, (150, 150, 150))
+            panel.blit(speed_surf, (x_offset, y_offset))
+            x_offset += speed_surf.get_width() + 20
+
         # Build button (placeholder text)
         build_button_text = "[B]uild Menu"
         build_surf = self.ui_font.render(build_button_text, True, WHITE)
-        self.screen.blit(build_surf, (SCREEN_WIDTH - build_surf.get_width() - 10, SCREEN_HEIGHT - ui_panel_height + 5))
+        panel.blit(build_surf, (SCREEN_WIDTH - build_surf.get_width() - 10, 5))
 
         # Message line (for errors or info)
         # self.message_line = "" # This would be set by game logic
         # if hasattr(self, 'message_line') and self.message_line:
         #    msg_surf = self.ui_font.render(self.message_line, True, RED)
-        #    self.screen.blit(msg_surf, (x_offset, y_offset))
-
+        #    panel.blit(msg_surf, (x_offset, y_offset))
+        return panel
 
     def draw_grid(self):
         """Draws the construction grid."""
@@ -162,14 +342,37 @@ class UIManager:
             pg.draw.line(self.screen, (50, 50, 50), (0, y), (SCREEN_WIDTH, y), 1)
 
 
+    def draw_terrain(self):
+        """Draws water and rock tiles from a surface rendered once per terrain."""
+        terrain = self.city.terrain
+        if terrain is None:
+            return
+        if self._terrain_key is not terrain:
+            tiles = pg.surfarray.make_surface(terrain.colors()) # One pixel per tile
+            self._terrain_surf = pg.transform.scale(tiles, (terrain.width * TILE_SIZE, terrain.height * TILE_SIZE))
+            self._terrain_key = terrain
+        self.screen.blit(self._terrain_surf, (-self.camera[0] * TILE_SIZE, -self.camera[1] * TILE_SIZE))
+
     def draw_buildings(self):
-        """Draws wireframe representations of buildings."""
+        """Draws wireframe representations of buildings from a layer re-rendered only when buildings change."""
+        if self._buildings_dirty:
+            self._buildings_surf.fill((0, 0, 0, 0))
+            self._render_buildings(self._buildings_surf)
+            self._buildings_dirty = False
+        self.screen.blit(self._buildings_surf, (0, 0))
+
+    def _render_buildings(self, surface: pg.Surface) -> None:
+        camera_x, camera_y = self.camera
+        view_w, view_h = VIEW_TILES
         for building in self.city.buildings:
+            pos_x, pos_y = building.position[0] - camera_x, building.position[1] - camera_y
+            if pos_x >= view_w or pos_y >= view_h or pos_x + building.size[0] <= 0 or pos_y + building.size[1] <= 0:
+                continue # Outside the view
             rect_color = GREEN if building.is_operational else RED
 
             # Main building rectangle
-            base_x = building.position[0] * TILE_SIZE
-            base_y = building.position[1] * TILE_SIZE
+            base_x = pos_x * TILE_SIZE
+            base_y = pos_y * TILE_SIZE
             width_px = building.size[0] * TILE_SIZE
             height_px = building.size[1] * TILE_SIZE
 
@@ -178,20 +381,20 @@ class UIManager:
             if building.type == "SOLAR_PANEL" and building.size == (1,1) :
                 # Make 1x1 solar panels appear flatter and add a line
                 panel_rect = pg.Rect(base_x, base_y + height_px // 3, width_px, height_px // 3)
-                pg.draw.rect(self.screen, rect_color, panel_rect, 1)
+                pg.draw.rect(surface, rect_color, panel_rect, 1)
                 # Add a diagonal line to suggest a panel surface for 1x1 solar
-                pg.draw.line(self.screen, rect_color,
+                pg.draw.line(surface, rect_color,
                              (panel_rect.left + 2, panel_rect.top + 2),
                              (panel_rect.right - 2, panel_rect.bottom - 2), 1)
             else:
                 # Default wireframe box for other buildings or larger solar panels
-                pg.draw.rect(self.screen, rect_color, building_rect, 1)
+                pg.draw.rect(surface, rect_color, building_rect, 1)
 
             # Draw character in the center of the first tile of the building
             char_surf = self.game_font.render(building.char, True, rect_color)
             # Position character relative to the top-left of the building's first tile
             char_rect = char_surf.get_rect(center=(base_x + TILE_SIZE / 2, base_y + TILE_SIZE / 2))
-            self.screen.blit(char_surf, char_rect)
+            surface.blit(char_surf, char_rect)
 
     def draw_selected_building_ghost(self, mouse_grid_pos, building_spec):
         """Draws a ghost of the building to be placed at the mouse cursor."""
@@ -202,8 +405,8 @@ class UIManager:
         width, height = building_spec["size"]
 
         ghost_rect = pg.Rect(
-            mouse_grid_pos[0] * TILE_SIZE,
-            mouse_grid_pos[1] * TILE_SIZE,
+            (mouse_grid_pos[0] - self.camera[0]) * TILE_SIZE,
+            (mouse_grid_pos[1] - self.camera[1]) * TILE_SIZE,
             width * TILE_SIZE,
             height * TILE_SIZE
         )
@@ -231,6 +434,10 @@ class UIManager:
                 if not can_place:
                     break
 
+        if can_place and self.city.terrain is not None: # Water, or rock for anything but a mine
+            can_place = self.city.terrain.placement_error(mouse_grid_pos, (size_w, size_h),
+                                                          building_spec.get("ore_prod", 0) > 0) is None
+
         ghost_color = BLUE if can_place else RED
 
         # Create a semi-transparent surface for the ghost
@@ -239,15 +446,184 @@ class UIManager:
         self.screen.blit(s, (ghost_rect.left, ghost_rect.top))
         pg.draw.rect(self.screen, ghost_color, ghost_rect, 1) # Outline
 
+        if can_place and self.selected_building_type:
+            self.draw_ghost_preview(mouse_grid_pos, ghost_rect)
+
+    def ghost_preview(self, building_type, grid_pos):
+        """City.preview_add() for the ghost, cached until the ghost moves or the city changes."""
+        key = (building_type, grid_pos, self.city.version, self.city.credits, id(self.city))
+        if key != self._ghost_preview_key:
+            self._ghost_preview_key = key
+            self._ghost_preview = self.city.preview_add(building_type, grid_pos)
+            color = RED if not self._ghost_preview.possible or self._ghost_preview.newly_shed else WHITE
+            self._ghost_preview_surf = self.ui_font.render(str(self._ghost_preview), True, color, (30, 30, 30))
+        return self._ghost_preview
+
+    def draw_ghost_preview(self, grid_pos, ghost_rect):
+        """Projected power/capacity deltas next to the ghost, and outlines around consumers it would shed."""
+        preview = self.ghost_preview(self.selected_building_type, grid_pos)
+        for building in preview.newly_shed:
+            shed_rect = pg.Rect((building.position[0] - self.camera[0]) * TILE_SIZE,
+                                (building.position[1] - self.camera[1]) * TILE_SIZE,
+                                building.size[0] * TILE_SIZE, building.size[1] * TILE_SIZE)
+            pg.draw.rect(self.screen, YELLOW, shed_rect, 2)
+        text_rect = self._ghost_preview_surf.get_rect(topleft=(ghost_rect.right + 4, ghost_rect.top))
+        text_rect.clamp_ip(self.screen.get_rect())
+        self.screen.blit(self._ghost_preview_surf, text_rect)
+
+    @property
+    def overlays_available(self) -> bool:
+        return self._overlays is not None
+
+    def cycle_overlay(self) -> str | None:
+        """Steps through off and each heatmap overlay; returns the new overlay's label (None is off)."""
+        if self._overlays is None:
+            return None
+        order = [None] + list(OVERLAY_NAMES)
+        self.overlay = order[(order.index(self.overlay) + 1) % len(order)]
+        return OVERLAY_LABELS[self.overlay] if self.overlay else None
+
+    def draw_overlay(self):
+        """Draws the selected heatmap over the buildings, from surfaces remade only when its image changed."""
+        if self.overlay is None or self._overlays is None:
+            return
+        image = self._overlays.image(self.overlay)
+        if image is not self._overlay_image:
+            rgb = image.rgb.copy()
+            rgb[~image.covered] = 0 # Colorkeyed out: no LUT entry is pure black
+            tiles = pg.surfarray.make_surface(rgb) # One pixel per tile
+            self._overlay_surf = pg.transform.scale(tiles, (rgb.shape[0] * TILE_SIZE, rgb.shape[1] * TILE_SIZE))
+            self._overlay_surf.set_colorkey((0, 0, 0))
+            self._overlay_surf.set_alpha(150)
+            label = f"{OVERLAY_LABELS[self.overlay]}: {image.low} .. {image.high}"
+            self._overlay_label = self.ui_font.render(label, True, WHITE, (30, 30, 30))
+            self._overlay_image = image
+        self.screen.blit(self._overlay_surf, (-self.camera[0] * TILE_SIZE, -self.camera[1] * TILE_SIZE))
+        self.screen.blit(self._overlay_label, (5, SCREEN_HEIGHT - UI_PANEL_HEIGHT - self._overlay_label.get_height() - 5))
+
+    def screen_to_grid(self, pos) -> Tuple[int, int]:
+        """The world tile under a screen position."""
+        return (pos[0] // TILE_SIZE + self.camera[0], pos[1] // TILE_SIZE + self.camera[1])
+
+    def jump_camera(self, tile) -> bool:
+        """Centers the view on a world tile, clamped to the world. Returns whether the view moved."""
+        view_w, view_h = VIEW_TILES
+        world_w, world_h = len(self.city.grid), len(self.city.grid[0])
+        camera = (min(max(tile[0] - view_w // 2, 0), max(0, world_w - view_w)),
+                  min(max(tile[1] - view_h // 2, 0), max(0, world_h - view_h)))
+        if camera == self.camera:
+            return False
+        self.camera = camera
+        self._buildings_dirty = True
+        return True
+
+    def toggle_minimap(self) -> bool:
+        """Shows or hides the minimap. Returns False if it is unavailable (no numpy)."""
+        if Minimap is None:
+            return False
+        self.minimap_active = not self.minimap_active
+        return True
+
+    def handle_click_minimap(self, mouse_pos) -> bool:
+        """Jumps the camera to the clicked minimap tile. Returns False if the click missed the minimap."""
+        if not self.minimap_active or self.minimap_rect is None or not self.minimap_rect.collidepoint(mouse_pos):
+            return False
+        scale = self.minimap_rect.width // self._minimap.width
+        self.jump_camera(((mouse_pos[0] - self.minimap_rect.left) // scale, (mouse_pos[1] - self.minimap_rect.top) // scale))
+        return True
+
+    def draw_minimap(self):
+        """Draws the minimap in the top left corner with the camera's view outlined."""
+        if not self.minimap_active:
+            return
+        if self._minimap is None: # New city: start from a full refresh
+            self._minimap = Minimap(self.city)
+            width, height = self._minimap.width, self._minimap.height
+            scale = max(1, MINIMAP_SIZE // max(width, height))
+            self._minimap_surf = pg.Surface((width, height), depth=32)
+            self.minimap_rect = pg.Rect(5, 5, width * scale, height * scale)
+        rows = self._minimap.refresh()
+        if rows: # Copy just the changed rows into the surface
+            pixels = pg.surfarray.pixels3d(self._minimap_surf)
+            pixels[:, rows] = self._minimap.pixels[:, rows]
+            del pixels # Unlocks the surface
+            self._minimap_scaled = pg.transform.scale(self._minimap_surf, self.minimap_rect.size)
+        self.screen.blit(self._minimap_scaled, self.minimap_rect)
+        pg.draw.rect(self.screen, WHITE, self.minimap_rect, 1)
+        scale = self.minimap_rect.width // self._minimap.width
+        view_rect = pg.Rect(self.minimap_rect.left + self.camera[0] * scale, self.minimap_rect.top + self.camera[1] * scale,
+                            VIEW_TILES[0] * scale, VIEW_TILES[1] * scale).clip(self.minimap_rect)
+        pg.draw.rect(self.screen, YELLOW, view_rect, 1)
+
+    def cycle_graph_tier(self) -> str | None:
+        """Steps the graph panel through off and each metrics tier; returns the new tier (None is off)."""
+        if self.metrics is None:
+            return None
+        order = [None] + list(self.metrics.tiers)
+        self.graph_tier = order[(order.index(self.graph_tier) + 1) % len(order)]
+        return self.graph_tier
+
+    def _render_graphs(self) -> pg.Surface:
+        """Renders one small line graph per metrics series for the selected tier."""
+        series = (("credits", "Credits", GREEN), ("population", "Pop", YELLOW),
+                  ("net_power", "Power", BLUE), ("ore", "Ore", (150, 150, 150)))
+        graph_w, graph_h = GRAPH_PANEL_WIDTH - 10, 40
+        line_h = self.ui_font.get_linesize()
+        surf = pg.Surface((GRAPH_PANEL_WIDTH, len(series) * (graph_h + line_h + 5) + line_h + 10), pg.SRCALPHA)
+        surf.fill((0, 0, 0, 180))
+        pg.draw.rect(surf, WHITE, surf.get_rect(), 1)
+
+        tier = self.metrics.tiers[self.graph_tier]
+        title = f"History per {tier.name} ({tier.count}/{tier.capacity})"
+        surf.blit(self.ui_font.render(title, True, WHITE), (5, 5))
+        y = line_h + 10
+        for name, label, color in series:
+            points, low, high = self.metrics.polyline(name, self.graph_tier, graph_w, graph_h)
+            latest = self.metrics.series(name, self.graph_tier)[-1:] # Empty before the first sample
+            latest_text = f"{latest[0]:.0f}" if len(latest) else "-"
+            text = f"{label}: {latest_text}  ({low:.0f} .. {high:.0f})"
+            surf.blit(self.ui_font.render(text, True, color), (5, y))
+            y += line_h
+            pg.draw.rect(surf, (60, 60, 60), (5, y, graph_w, graph_h), 1)
+            if len(points) > 1:
+                pg.draw.lines(surf, color, False, [(5 + px, y + py) for px, py in points])
+            y += graph_h + 5
+        return surf
+
+    def draw_graphs(self):
+        """Draws the metrics history panel in the top right corner, if a tier is selected."""
+        if self.metrics is None or self.graph_tier is None:
+            return
+        key = (id(self.metrics), self.graph_tier, self.metrics.tiers[self.graph_tier].version)
+        if key != self._graph_key:
+            self._graph_surf = self._render_graphs()
+            self._graph_key = key
+        self.screen.blit(self._graph_surf, (SCREEN_WIDTH - GRAPH_PANEL_WIDTH - 5, 5))
+
     def draw(self, mouse_grid_pos=None, current_ghost_spec=None):
         """Draws all UI elements."""
+        section = self.profiler.section
         self.screen.fill((0,0,0)) # Clear screen (black)
-        self.draw_grid()
-        self.draw_buildings()
+        self._apply_city_events()
+        with section("draw_terrain"):
+            self.draw_terrain()
+        with section("draw_grid"):
+            self.draw_grid()
+        with section("draw_buildings"):
+            self.draw_buildings()
+        with section("draw_overlay"):
+            self.draw_overlay()
         if self.selected_building_type and current_ghost_spec and mouse_grid_pos:
-            self.draw_selected_building_ghost(mouse_grid_pos, current_ghost_spec)
-        self.draw_main_ui() # Draw this last so it's on top of game elements near bottom
-        self.draw_build_menu() # Drawn on top of everything if active
+            with section("draw_ghost"):
+                self.draw_selected_building_ghost(mouse_grid_pos, current_ghost_spec)
+        with section("draw_main_ui"):
+            self.draw_main_ui() # Draw this last so it's on top of game elements near bottom
+        with section("draw_graphs"):
+            self.draw_graphs()
+        with section("draw_minimap"):
+            self.draw_minimap()
+        with section("draw_build_menu"):
+            self.draw_build_menu() # Drawn on top of everything if active
 
 
 if __name__ == '__main__':
@@ -0,0 +1,164 @@
+# Elite 1984 City Builder - Undo/Redo History
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+
+from city_builder.buildings import Building
+from city_builder.city import City
+
+DEFAULT_UNDO_LIMIT = 500 # Undoable actions (single commands or whole batches) kept
+
+# Command kinds
+PLACED = "placed"
+REMOVED = "removed"
+
+# A command is a flat tuple: (kind, building_id, building_type, x, y, credit_delta, was_operational).
+# credit_delta is the change the action made to the city's credits (-cost for a placement,
+# +refund for a removal); undo applies its negation.
+Command = Tuple[str, int, str, int, int, int, bool]
+
+
+class UndoHistory:
+    """
+    Undo/redo for building placement and removal, kept as small inverse commands rather than
+    city snapshots, so recording costs O(1) whatever the city's size. The undo stack is a ring:
+    past `limit` entries the oldest are forgotten. Commands recorded between begin_batch() and
+    end_batch() (e.g. one drag-build) are undone and redone as a unit.
+    """
+    def __init__(self, limit: int = DEFAULT_UNDO_LIMIT):
+        self._undo: Deque[Tuple[Command, ...]] = deque(maxlen=limit)
+        self._redo: List[Tuple[Command, ...]] = []
+        self._batch: List[Command] | None = None
+
+    def can_undo(self) -> bool:
+        return bool(self._undo) or bool(self._batch)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        """Forgets all history, e.g. after loading a different city."""
+        self._undo.clear()
+        self._redo.clear()
+        self._batch = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The undo and redo stacks (and any open batch) in JSON-compatible form."""
+        return {
+            "undo": [[list(command) for command in entry] for entry in self._undo],
+            "redo": [[list(command) for command in entry] for entry in self._redo],
+            "batch": None if self._batch is None else [list(command) for command in self._batch],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], limit: int = DEFAULT_UNDO_LIMIT) -> 'UndoHistory':
+        history = cls(limit)
+        history._undo.extend(tuple(tuple(command) for command in entry) for entry in data.get("undo", []))
+        history._redo.extend(tuple(tuple(command) for command in entry) for entry in data.get("redo", []))
+        if data.get("batch") is not None:
+            history._batch = [tuple(command) for command in data["batch"]]
+        return history
+
+    def place(self, city: City, building_type: str, position: Tuple[int, int]) -> Tuple[bool, str]:
+        """City.add_building(), recorded for undo."""
+        success, message = city.add_building(building_type, position)
+        if success:
+            building = city.building_at(position)
+            self._record((PLACED, building.building_id, building.type, position[0], position[1],
+                          -building.cost, building.is_operational))
+        return success, message
+
+    def remove(self, city: City, position: Tuple[int, int]) -> Tuple[bool, str]:
+        """City.remove_building(), recorded for undo."""
+        building = city.building_at(position)
+        success, message = city.remove_building(position)
+        if success:
+            x, y = building.position
+            self._record((REMOVED, building.building_id, building.type, x, y,
+                          city.refund_for(building), building.is_operational))
+        return success, message
+
+    def _record(self, command: Command) -> None:
+        if self._batch is not None:
+            self._batch.append(command)
+        else:
+            self._undo.append((command,))
+        self._redo.clear() # A new action invalidates the redo branch
+
+    def begin_batch(self) -> None:
+        """Starts grouping commands; nested calls extend the open batch."""
+        if self._batch is None:
+            self._batch = []
+
+    def end_batch(self) -> None:
+        """Closes the open batch as one undo entry (empty batches are dropped)."""
+        if self._batch:
+            self._undo.append(tuple(self._batch))
+        self._batch = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        self.begin_batch()
+        try:
+            yield
+        finally:
+            self.end_batch()
+
+    @staticmethod
+    def _apply(city: City, command: Command, forward: bool) -> Tuple[bool, str]:
+        """Re-does (forward) or undoes one command."""
+        kind, building_id, building_type, x, y, credit_delta, was_operational = command
+        delta = credit_delta if forward else -credit_delta
+        if (kind == PLACED) == forward: # Redo a placement or undo a removal: the building comes back
+            try:
+                building = Building(building_type, (x, y))
+            except ValueError as e:
+                return False, str(e)
+            building.building_id = building_id
+            building.is_operational = was_operational
+            return city.restore_building(building, delta)
+        return city.withdraw_building(building_id, delta)
+
+    def _replay(self, city: City, entry: Tuple[Command, ...], forward: bool) -> Tuple[bool, str]:
+        """Applies every command of an entry; on failure rolls back the part already applied."""
+        commands = entry if forward else tuple(reversed(entry))
+        for done, command in enumerate(commands):
+            success, message = self._apply(city, command, forward)
+            if not success:
+                for applied in reversed(commands[:done]):
+                    self._apply(city, applied, not forward)
+                return False, message
+        return True, ""
+
+    def undo(self, city: City) -> Tuple[bool, str]:
+        """Reverts the most recent action (or batch). Returns (success, message)."""
+        self.end_batch()
+        if not self._undo:
+            return False, "Nothing to undo."
+        entry = self._undo.pop()
+        success, message = self._replay(city, entry, forward=False)
+        if not success:
+            self._undo.append(entry)
+            return False, f"Cannot undo: {message}"
+        self._redo.append(entry)
+        return True, f"Undid {self._describe(entry)}."
+
+    def redo(self, city: City) -> Tuple[bool, str]:
+        """Re-applies the most recently undone action (or batch). Returns (success, message)."""
+        if not self._redo:
+            return False, "Nothing to redo."
+        entry = self._redo.pop()
+        success, message = self._replay(city, entry, forward=True)
+        if not success:
+            self._redo.append(entry)
+            return False, f"Cannot redo: {message}"
+        self._undo.append(entry)
+        return True, f"Redid {self._describe(entry)}."
+
+    @staticmethod
+    def _describe(entry: Tuple[Command, ...]) -> str:
+        if len(entry) == 1:
+            kind, _, building_type, x, y = entry[0][:5]
+            return f"{'placing' if kind == PLACED else 'removing'} {building_type} at ({x}, {y})"
+        return f"{len(entry)} actions"